@@ -7,3 +7,7 @@ load_dotenv()
 MONGO_URL = os.getenv("MONGO_URL")
 client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URL)
 db = client.aarogya_ai
+
+# "memory" serves the bundled catalogs; "mongo" pushes catalog queries into
+# the collections managed by services/catalog_repository.py
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "memory")
@@ -8,6 +8,9 @@ from routes.medicine_routes import router as medicine_router
 from routes.hospital_routes import router as hospital_router
 from routes.location_routes import router as location_router
 from routes.jan_aushadhi_routes import router as jan_aushadhi_router
+from services.catalog_repository import ensure_catalog_indexes
+from services.http_client import http_clients
+from db import CATALOG_BACKEND
 import firebase_admin
 from firebase_admin import credentials, auth as firebase_auth
 import os
@@ -66,6 +69,21 @@ try:
 except Exception as e:
     logger.warning(f"Firebase initialization failed: {e}")
 
+# Catalog indexes (text, compound and 2dsphere) when serving from MongoDB
+@app.on_event("startup")
+async def create_catalog_indexes():
+    if CATALOG_BACKEND == "mongo":
+        await ensure_catalog_indexes()
+
+# Pooled keep-alive clients for openFDA, RxNorm, WHO, Google and Tavus
+@app.on_event("startup")
+async def open_http_clients():
+    await http_clients.start()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.close()
+
 # Token Verification Dependency
 def verify_token_dependency(request: Request):
     token = request.headers.get("Authorization")
@@ -1,7 +1,19 @@
 from fastapi import APIRouter
+from services.external_apis import external_api_service
+from services.http_client import http_clients
 
 router = APIRouter()
 
 @router.get("/ping")
 async def health_check():
     return {"status": "healthy", "message": "Server is up and running"}
+
+@router.get("/cache")
+async def cache_stats():
+    """Hit/miss counters for the external drug API response cache"""
+    return external_api_service.cache.stats()
+
+@router.get("/upstreams")
+async def upstream_status():
+    """Circuit breaker state, hedging counters and p95 latency per upstream API"""
+    return http_clients.status()
@@ -1,6 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from pydantic import BaseModel
+from db import CATALOG_BACKEND
+from services.catalog_repository import hospital_tool_repository, make_projection, reject_unsupported, streaming_json_response
+from services.catalog_registry import catalog_registry
+from services.prices import MixedPriceUnitsError, PriceTable
+from services.search_index import InvertedIndex
+from services.ranking import BM25Ranker
+import numpy as np
 
 router = APIRouter()
 
@@ -19,6 +26,11 @@ class HospitalTool(BaseModel):
     complexity: str
     training_required: str
 
+class HospitalToolSearchResults(BaseModel):
+    results: List[HospitalTool]
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
 class HospitalEquipment(BaseModel):
     id: str
     name: str
@@ -29,6 +41,8 @@ class HospitalEquipment(BaseModel):
     maintenance_schedule: str
     certification: List[str]
 
+TOOL_PROJECTION = make_projection(HospitalTool.model_fields)
+
 # Mock hospital tools database
 HOSPITAL_TOOLS = [
     {
@@ -78,43 +92,107 @@ HOSPITAL_TOOLS = [
     }
 ]
 
-@router.get("/tools/search", response_model=List[HospitalTool])
+TOOL_CATEGORY_NAMES = {
+    "diagnostic": "Diagnostic Equipment",
+    "surgical": "Surgical Instruments",
+    "monitoring": "Monitoring Systems",
+    "imaging": "Medical Imaging",
+    "laboratory": "Laboratory Equipment",
+    "emergency": "Emergency Equipment"
+}
+
+def _build_price_table(tools):
+    table = PriceTable(tools, {"price": lambda t: t["price_range"]})
+    table.sort_keys["price"] = table.column("price").minimum
+    table.sort_units["price"] = table.column("price").unit_codes
+    return table
+
+# Relative weight of a term match in each field for relevance ranking
+TOOL_FIELD_BOOSTS = {"name": 3.0, "uses": 1.5, "description": 1.0}
+
+catalog_registry.register("hospital_tools", HOSPITAL_TOOLS, facet_fields=[
+    "category", "departments", "complexity", "who_approved"
+], index_builders={
+    "search": lambda tools: InvertedIndex(
+        tools,
+        text_fields=["name", "description", "uses"],
+        filter_fields=["category", "departments", "complexity", "who_approved"]
+    ),
+    "ranking": lambda tools: BM25Ranker(tools, TOOL_FIELD_BOOSTS),
+    "prices": _build_price_table
+})
+
+@router.get("/tools/search", response_model=Union[HospitalToolSearchResults, List[HospitalTool]])
 async def search_hospital_tools(
     query: Optional[str] = Query(None, description="Search term"),
     category: Optional[str] = Query(None, description="Tool category"),
     department: Optional[str] = Query(None, description="Hospital department"),
     complexity: Optional[str] = Query(None, description="Complexity level"),
     who_approved: Optional[bool] = Query(None, description="WHO approved only"),
+    include_facets: bool = Query(False, description="Wrap results with total and per-facet counts"),
+    min_price: Optional[float] = Query(None, ge=0, description="Lowest acceptable price (₹)"),
+    max_price: Optional[float] = Query(None, ge=0, description="Highest acceptable price (₹)"),
+    price_unit: Optional[str] = Query(None, description="Only results priced per this unit, e.g. tablet or course; needed to filter or sort by price when matches mix units"),
+    sort_by: Optional[str] = Query(None, pattern="^price$", description="Sort by lowest price"),
     limit: int = Query(20, description="Maximum results")
 ):
     """
     Search hospital tools and equipment
     """
+    if CATALOG_BACKEND == "mongo":
+        reject_unsupported(
+            include_facets=include_facets,
+            min_price=min_price, max_price=max_price, price_unit=price_unit, sort_by=sort_by
+        )
+    
     try:
-        filtered_tools = []
+        if CATALOG_BACKEND == "mongo":
+            return await streaming_json_response(hospital_tool_repository.search(
+                TOOL_PROJECTION,
+                query=query,
+                category=category,
+                department=department,
+                complexity=complexity,
+                who_approved=who_approved,
+                limit=limit
+            ))
+        
+        tools = catalog_registry.get("hospital_tools")
+        search_index = tools.index("search")
+        positions = search_index.search(query, {
+            "category": category or None,
+            "departments": department or None,
+            "complexity": complexity or None,
+            "who_approved": who_approved
+        })
+        
+        if min_price is not None or max_price is not None or sort_by or price_unit:
+            prices = tools.index("prices")
+            selected = np.asarray(positions, dtype=np.intp)
+            if price_unit:
+                selected = prices.in_unit(selected, "price", price_unit)
+            if min_price is not None or max_price is not None:
+                selected = prices.in_band(selected, "price", min_price, max_price)
+            if sort_by:
+                selected = prices.order_by(selected, sort_by)
+            positions = selected.tolist()
+        
+        if query and not sort_by:
+            top = tools.index("ranking").top_k(query, positions, limit)
+        else:
+            top = positions[:limit]
         
-        for tool in HOSPITAL_TOOLS:
-            # Text search
-            if query:
-                if not (query.lower() in tool["name"].lower() or 
-                       query.lower() in tool["description"].lower() or
-                       any(query.lower() in use.lower() for use in tool["uses"])):
-                    continue
-            
-            # Apply filters
-            if category and tool["category"] != category:
-                continue
-            if department and department not in tool["departments"]:
-                continue
-            if complexity and tool["complexity"] != complexity:
-                continue
-            if who_approved is not None and tool["who_approved"] != who_approved:
-                continue
-            
-            filtered_tools.append(tool)
+        if include_facets:
+            return {
+                "results": search_index.documents_at(top),
+                "total": len(positions),
+                "facets": tools.facets.summarize(search_index.documents_at(positions))
+            }
         
-        return filtered_tools[:limit]
+        return search_index.documents_at(top)
     
+    except MixedPriceUnitsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Tool search failed: {str(e)}")
 
@@ -123,7 +201,7 @@ async def get_tool_details(tool_id: str):
     """
     Get detailed information about a specific hospital tool
     """
-    tool = next((t for t in HOSPITAL_TOOLS if t["id"] == tool_id), None)
+    tool = catalog_registry.get("hospital_tools").get(tool_id)
     if not tool:
         raise HTTPException(status_code=404, detail="Hospital tool not found")
     return tool
@@ -133,14 +211,15 @@ async def get_tool_categories():
     """
     Get all available tool categories
     """
+    facets = catalog_registry.get("hospital_tools").facets
     categories = [
-        {"id": "diagnostic", "name": "Diagnostic Equipment", "count": 45},
-        {"id": "surgical", "name": "Surgical Instruments", "count": 120},
-        {"id": "monitoring", "name": "Monitoring Systems", "count": 35},
-        {"id": "imaging", "name": "Medical Imaging", "count": 25},
-        {"id": "laboratory", "name": "Laboratory Equipment", "count": 60},
-        {"id": "emergency", "name": "Emergency Equipment", "count": 30}
+        {"id": category_id, "name": name, "count": facets.count("category", category_id)}
+        for category_id, name in TOOL_CATEGORY_NAMES.items()
     ]
+    # Categories present in the data but missing a display name
+    for category_id, count in facets.counts("category").items():
+        if category_id not in TOOL_CATEGORY_NAMES:
+            categories.append({"id": category_id, "name": category_id.title(), "count": count})
     return categories
 
 @router.get("/departments")
@@ -160,7 +239,7 @@ async def get_tool_safety_guidelines(tool_id: str):
     """
     Get safety guidelines for a specific tool
     """
-    tool = next((t for t in HOSPITAL_TOOLS if t["id"] == tool_id), None)
+    tool = catalog_registry.get("hospital_tools").get(tool_id)
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
@@ -1,7 +1,18 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
+from datetime import datetime
 from pydantic import BaseModel
 import asyncio
+import numpy as np
+from db import CATALOG_BACKEND
+from services.catalog_repository import jan_aushadhi_store_repository, make_projection, streaming_json_response
+from services.catalog_registry import catalog_registry
+from services.facility_index import facility_directory
+from services.opening_hours import requested_minute
+from services.gazetteer import gazetteer
+from services.inventory import StoreInventory
+from services.prices import PriceTable
+from services.basket import MAX_BASKET_ITEMS, plan_basket
 
 router = APIRouter()
 
@@ -18,16 +29,32 @@ class JanAushadhiStore(BaseModel):
     operating_hours: str
     medicines_available: int
     verified: bool
+    distance_km: Optional[float] = None
+
+class BasketItem(BaseModel):
+    medicine: str
+    quantity: int = 1
+
+class BasketRequest(BaseModel):
+    latitude: float
+    longitude: float
+    items: List[BasketItem]
+    radius_km: float = 5
+    max_stores: int = 3
 
 class JanAushadhiMedicine(BaseModel):
     id: str
     name: str
     generic_name: str
+    category: str
     price: str
+    brand_price: Optional[str] = None
     pack_size: str
     manufacturer: str
     availability: str
 
+STORE_PROJECTION = make_projection(JanAushadhiStore.model_fields)
+
 # Mock Jan Aushadhi stores database
 JAN_AUSHADHI_STORES = [
     {
@@ -74,6 +101,177 @@ JAN_AUSHADHI_STORES = [
     }
 ]
 
+# Mock Jan Aushadhi medicines database
+JAN_AUSHADHI_MEDICINES = [
+    {
+        "id": "jam_001",
+        "name": "Paracetamol",
+        "generic_name": "Acetaminophen",
+        "category": "Analgesic",
+        "price": "₹2.50 per strip",
+        "pack_size": "10 tablets",
+        "manufacturer": "IDPL",
+        "availability": "In Stock"
+    },
+    {
+        "id": "jam_002",
+        "name": "Amoxicillin",
+        "generic_name": "Amoxicillin",
+        "category": "Antibiotic",
+        "price": "₹18.00 per strip",
+        "pack_size": "10 capsules",
+        "manufacturer": "HAL",
+        "availability": "In Stock"
+    },
+    {
+        "id": "jam_003",
+        "name": "Metformin",
+        "generic_name": "Metformin HCl",
+        "category": "Antidiabetic",
+        "price": "₹6.50 per strip",
+        "pack_size": "10 tablets",
+        "manufacturer": "IDPL",
+        "availability": "In Stock"
+    },
+    {
+        "id": "jam_004",
+        "name": "Amlodipine",
+        "generic_name": "Amlodipine Besylate",
+        "category": "Antihypertensive",
+        "price": "₹3.20 per strip",
+        "pack_size": "10 tablets",
+        "manufacturer": "KAPL",
+        "availability": "In Stock"
+    },
+    {
+        "id": "jam_005",
+        "name": "Atorvastatin",
+        "generic_name": "Atorvastatin Calcium",
+        "category": "Cardiovascular",
+        "price": "₹7.80 per strip",
+        "pack_size": "10 tablets",
+        "manufacturer": "IDPL",
+        "availability": "In Stock"
+    },
+    {
+        "id": "jam_006",
+        "name": "Cetirizine",
+        "generic_name": "Cetirizine Hydrochloride",
+        "category": "Antihistamine",
+        "price": "₹1.90 per strip",
+        "pack_size": "10 tablets",
+        "manufacturer": "HAL",
+        "availability": "In Stock"
+    },
+    {
+        "id": "jam_007",
+        "name": "Omeprazole",
+        "generic_name": "Omeprazole",
+        "category": "Gastrointestinal",
+        "price": "₹4.60 per strip",
+        "pack_size": "10 capsules",
+        "manufacturer": "KAPL",
+        "availability": "In Stock"
+    },
+    {
+        "id": "jam_008",
+        "name": "Azithromycin",
+        "generic_name": "Azithromycin",
+        "category": "Antibiotic",
+        "price": "₹21.00 per strip",
+        "pack_size": "3 tablets",
+        "manufacturer": "HAL",
+        "availability": "In Stock"
+    }
+]
+
+# Mock per-store stock (store id -> medicine ids in stock)
+JAN_AUSHADHI_INVENTORY = {
+    "ja_001": ["jam_001", "jam_002", "jam_003", "jam_004", "jam_005", "jam_006"],
+    "ja_002": ["jam_001", "jam_003", "jam_004", "jam_006", "jam_007", "jam_008"],
+    "ja_003": ["jam_001", "jam_002", "jam_006", "jam_007"]
+}
+
+# Spatial candidates considered by the basket planner, nearest first
+MAX_BASKET_CANDIDATES = 200
+
+catalog_registry.register("jan_aushadhi_medicines", JAN_AUSHADHI_MEDICINES, facet_fields=["category"], index_builders={
+    "prices": lambda medicines: PriceTable(medicines, {
+        "jan_aushadhi": lambda m: m["price"],
+        "brand": lambda m: m.get("brand_price")
+    })
+})
+
+def _build_inventory(records):
+    # Rows are keyed by the medicine ids in the stock data, not the medicines
+    # catalog, so the bitmaps only depend on this catalog; ids missing from
+    # either side simply read as not stocked
+    medicine_ids = sorted({medicine_id for stock in JAN_AUSHADHI_INVENTORY.values() for medicine_id in stock})
+    return StoreInventory(
+        [store["id"] for store in records if store is not None],
+        medicine_ids,
+        JAN_AUSHADHI_INVENTORY
+    )
+
+catalog_registry.register("jan_aushadhi_stores", JAN_AUSHADHI_STORES, index_builders={"inventory": _build_inventory})
+
+def _store_as_facility(store):
+    """Location-shaped view of a store for the shared facility geo index"""
+    return {
+        "id": store["id"],
+        "name": store["name"],
+        "type": "jan-aushadhi",
+        "address": store["address"],
+        "city": store["city"],
+        "state": store["state"],
+        "country": "India",
+        "latitude": store["latitude"],
+        "longitude": store["longitude"],
+        "phone": store["phone"],
+        "website": None,
+        "rating": 0.0,
+        "reviews_count": 0,
+        "services": ["Pharmacy", "Generic Medicines"],
+        "operating_hours": store["operating_hours"],
+        "emergency_services": False,
+        "insurance_accepted": []
+    }
+
+facility_directory.register_source("jan_aushadhi_stores", _store_as_facility)
+
+def _matches_area(store, city, state, pincode):
+    if city and store["city"].lower() != city.lower():
+        return False
+    if state and store["state"].lower() != state.lower():
+        return False
+    if pincode and store["pincode"] != pincode:
+        return False
+    return True
+
+def _area_origin(city, state, pincode, radius_km):
+    """Search center and radius for a pincode or city from the offline gazetteer.
+
+    A pincode searches radius_km around its centroid; a city searches far
+    enough from its centroid to cover its bounding box. None when the area
+    is not in the gazetteer, leaving plain equality filtering.
+    """
+    if pincode:
+        place = gazetteer.lookup_pincode(pincode)
+        if place:
+            return place["latitude"], place["longitude"], radius_km
+        return None
+    if city:
+        place = gazetteer.lookup_city(city, state)
+        if place:
+            return place["latitude"], place["longitude"], max(radius_km, place["radius_km"])
+    return None
+
+def _with_distance(store, distance):
+    # Copy so per-request distances never leak into the shared catalog records
+    store_with_distance = store.copy()
+    store_with_distance["distance_km"] = round(float(distance), 2)
+    return store_with_distance
+
 @router.get("/stores/search", response_model=List[JanAushadhiStore])
 async def search_jan_aushadhi_stores(
     city: Optional[str] = Query(None, description="City name"),
@@ -82,47 +280,135 @@ async def search_jan_aushadhi_stores(
     latitude: Optional[float] = Query(None, description="User latitude"),
     longitude: Optional[float] = Query(None, description="User longitude"),
     radius_km: float = Query(10, description="Search radius in kilometers"),
+    open_now: bool = Query(False, description="Show only stores open right now"),
+    open_at: Optional[datetime] = Query(None, description="Show only stores open at this time (IST unless an offset is given)"),
     limit: int = Query(20, description="Maximum number of results")
 ):
     """
     Search for Jan Aushadhi stores by location
     """
+    open_at_minute = requested_minute(open_now, open_at)
+    if latitude is None or longitude is None:
+        origin = _area_origin(city, state, pincode, radius_km)
+        if origin:
+            # Ranked by distance from the area instead of exact name matches
+            latitude, longitude, radius_km = origin
+            city, pincode = None, None
+
     try:
-        filtered_stores = []
+        if CATALOG_BACKEND == "mongo":
+            return await streaming_json_response(jan_aushadhi_store_repository.search(
+                STORE_PROJECTION,
+                city=city,
+                state=state,
+                pincode=pincode,
+                latitude=latitude,
+                longitude=longitude,
+                radius_km=radius_km,
+                limit=limit,
+                open_at_minute=open_at_minute
+            ))
         
-        for store in JAN_AUSHADHI_STORES:
-            # Filter by city/state/pincode
-            if city and store["city"].lower() != city.lower():
-                continue
-            if state and store["state"].lower() != state.lower():
-                continue
-            if pincode and store["pincode"] != pincode:
-                continue
-            
-            # Calculate distance if coordinates provided
-            if latitude and longitude:
-                # Simple distance calculation (in production, use proper geospatial queries)
-                lat_diff = abs(store["latitude"] - latitude)
-                lng_diff = abs(store["longitude"] - longitude)
-                distance = ((lat_diff ** 2) + (lng_diff ** 2)) ** 0.5 * 111  # Rough km conversion
-                
-                if distance <= radius_km:
-                    store["distance_km"] = round(distance, 2)
-                    filtered_stores.append(store)
-            else:
-                filtered_stores.append(store)
+        if latitude is not None and longitude is not None:
+            facilities = facility_directory.get()
+            rows, distances = facilities.query(
+                latitude, longitude, radius_km,
+                types=["jan-aushadhi"],
+                open_at_minute=open_at_minute
+            )
+            filtered_stores = [
+                _with_distance(facilities.sources[row], distance)
+                for row, distance in zip(rows, distances)
+                if _matches_area(facilities.sources[row], city, state, pincode)
+            ]
+        else:
+            filtered_stores = [
+                store for store in catalog_registry.get("jan_aushadhi_stores").live_records()
+                if _matches_area(store, city, state, pincode)
+            ]
+            if open_at_minute is not None:
+                facilities = facility_directory.get()
+                open_mask = facilities.opening_hours.open_mask(open_at_minute)
+                filtered_stores = [store for store in filtered_stores if open_mask[facilities.by_id[store["id"]]]]
         
         return filtered_stores[:limit]
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Store search failed: {str(e)}")
 
+@router.get("/stores/nearest", response_model=List[JanAushadhiStore])
+async def find_nearest_jan_aushadhi_stores(
+    latitude: float = Query(..., description="User latitude"),
+    longitude: float = Query(..., description="User longitude"),
+    k: int = Query(5, ge=1, le=50, description="Number of stores to return"),
+    open_now: bool = Query(False, description="Show only stores open right now"),
+    open_at: Optional[datetime] = Query(None, description="Show only stores open at this time (IST unless an offset is given)")
+):
+    """
+    Find the k nearest Jan Aushadhi stores regardless of distance
+    """
+    try:
+        facilities = facility_directory.get()
+        rows, distances = facilities.nearest(
+            latitude, longitude, k,
+            types=["jan-aushadhi"],
+            open_at_minute=requested_minute(open_now, open_at)
+        )
+        return [
+            _with_distance(facilities.sources[row], distance)
+            for row, distance in zip(rows, distances)
+        ]
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Nearest store search failed: {str(e)}")
+
+def _resolve_jan_aushadhi_medicines(names):
+    """Medicine ids for names or ids; 404 listing any that are unknown"""
+    medicines = catalog_registry.get("jan_aushadhi_medicines")
+    medicine_ids, unknown = [], []
+    for name in names:
+        medicine = medicines.get(name) or medicines.find_by_name(name)
+        if medicine is None:
+            unknown.append(name)
+        else:
+            medicine_ids.append(medicine["id"])
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown Jan Aushadhi medicines: {', '.join(unknown)}")
+    return medicine_ids
+
+@router.get("/stores/stocking", response_model=List[JanAushadhiStore])
+async def find_stores_stocking(
+    latitude: float = Query(..., description="User latitude"),
+    longitude: float = Query(..., description="User longitude"),
+    medicines: List[str] = Query(..., description="Medicine names or IDs; stores must stock all of them"),
+    radius_km: float = Query(5, description="Search radius in kilometers"),
+    limit: int = Query(20, description="Maximum number of results")
+):
+    """
+    Find nearby Jan Aushadhi stores that stock every requested medicine
+    """
+    medicine_ids = _resolve_jan_aushadhi_medicines(medicines)
+    try:
+        facilities = facility_directory.get()
+        inventory = catalog_registry.get("jan_aushadhi_stores").index("inventory")
+        rows, distances = facilities.query(latitude, longitude, radius_km, types=["jan-aushadhi"])
+        # Spatial candidates, nearest first, ANDed with the inventory bitmaps
+        columns = inventory.store_columns(facilities.sources[row]["id"] for row in rows)
+        stocked = inventory.stocks_all(columns, medicine_ids)
+        return [
+            _with_distance(facilities.sources[row], distance)
+            for row, distance in zip(rows[stocked][:limit], distances[stocked][:limit])
+        ]
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Stocking store search failed: {str(e)}")
+
 @router.get("/stores/{store_id}", response_model=JanAushadhiStore)
 async def get_jan_aushadhi_store_details(store_id: str):
     """
     Get detailed information about a specific Jan Aushadhi store
     """
-    store = next((s for s in JAN_AUSHADHI_STORES if s["id"] == store_id), None)
+    store = catalog_registry.get("jan_aushadhi_stores").get(store_id)
     if not store:
         raise HTTPException(status_code=404, detail="Jan Aushadhi store not found")
     return store
@@ -136,38 +422,17 @@ async def get_jan_aushadhi_medicines(
     """
     Get medicines available at Jan Aushadhi stores
     """
-    # Mock Jan Aushadhi medicines data
-    medicines = [
-        {
-            "id": "jam_001",
-            "name": "Paracetamol",
-            "generic_name": "Acetaminophen",
-            "price": "₹2.50 per strip",
-            "pack_size": "10 tablets",
-            "manufacturer": "IDPL",
-            "availability": "In Stock"
-        },
-        {
-            "id": "jam_002",
-            "name": "Amoxicillin",
-            "generic_name": "Amoxicillin",
-            "price": "₹18.00 per strip",
-            "pack_size": "10 capsules",
-            "manufacturer": "HAL",
-            "availability": "In Stock"
-        },
-        {
-            "id": "jam_003",
-            "name": "Metformin",
-            "generic_name": "Metformin HCl",
-            "price": "₹6.50 per strip",
-            "pack_size": "10 tablets",
-            "manufacturer": "IDPL",
-            "availability": "In Stock"
-        }
-    ]
+    medicines = catalog_registry.get("jan_aushadhi_medicines").live_records()
     
     # Apply filters
+    if store_id:
+        stores = catalog_registry.get("jan_aushadhi_stores")
+        if not stores.get(store_id):
+            raise HTTPException(status_code=404, detail="Jan Aushadhi store not found")
+        in_stock = set(stores.index("inventory").medicines_at(store_id))
+        medicines = [m for m in medicines if m["id"] in in_stock]
+    if category:
+        medicines = [m for m in medicines if m["category"].lower() == category.lower()]
     if search:
         medicines = [m for m in medicines if search.lower() in m["name"].lower() or search.lower() in m["generic_name"].lower()]
     
@@ -177,6 +442,123 @@ async def get_jan_aushadhi_medicines(
         "medicines": medicines
     }
 
+def _pack_prices(medicines, medicine):
+    """Jan Aushadhi and brand price per pack from the parsed price table;
+    None where the catalog has no price"""
+    prices = medicines.index("prices")
+    position = medicines.position(medicine["id"])
+    jan_aushadhi_price = prices.column("jan_aushadhi").minimum[position]
+    brand_price = prices.column("brand").minimum[position]
+    return (
+        None if np.isnan(jan_aushadhi_price) else float(jan_aushadhi_price),
+        None if np.isnan(brand_price) else float(brand_price)
+    )
+
+def _add_cost(total, price, quantity):
+    """Running cost that becomes unknown (None) once any price is missing"""
+    if total is None or price is None:
+        return None
+    return total + price * quantity
+
+def _savings_summary(jan_aushadhi_price, brand_price):
+    if jan_aushadhi_price is None or brand_price is None:
+        # No brand reference: report no savings rather than a made-up one
+        return {
+            "jan_aushadhi_price": f"₹{jan_aushadhi_price:.2f}" if jan_aushadhi_price is not None else None,
+            "brand_price": None,
+            "savings_amount": None,
+            "savings_percentage": None,
+            "savings_note": (
+                "No brand price on record to compare against" if brand_price is None
+                else "No Jan Aushadhi price on record"
+            )
+        }
+    savings = brand_price - jan_aushadhi_price
+    savings_percentage = (savings / brand_price) * 100 if brand_price else 0.0
+    return {
+        "jan_aushadhi_price": f"₹{jan_aushadhi_price:.2f}",
+        "brand_price": f"₹{brand_price:.2f}",
+        "savings_amount": f"₹{savings:.2f}",
+        "savings_percentage": f"{savings_percentage:.1f}%"
+    }
+
+@router.post("/basket")
+async def optimize_prescription_basket(basket_request: BasketRequest):
+    """
+    Find the fewest nearby stores that together stock a whole prescription, and its cost
+    """
+    if not basket_request.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(basket_request.items) > MAX_BASKET_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BASKET_ITEMS} items per basket")
+    if basket_request.max_stores < 1:
+        raise HTTPException(status_code=400, detail="max_stores must be at least 1")
+    if any(item.quantity < 1 for item in basket_request.items):
+        raise HTTPException(status_code=400, detail="Quantities must be at least 1")
+    medicine_ids = _resolve_jan_aushadhi_medicines([item.medicine for item in basket_request.items])
+    
+    try:
+        facilities = facility_directory.get()
+        medicines = catalog_registry.get("jan_aushadhi_medicines")
+        inventory = catalog_registry.get("jan_aushadhi_stores").index("inventory")
+        rows, distances = facilities.query(
+            basket_request.latitude, basket_request.longitude, basket_request.radius_km,
+            types=["jan-aushadhi"],
+            limit=MAX_BASKET_CANDIDATES
+        )
+        coverage = inventory.coverage(
+            inventory.store_columns(facilities.sources[row]["id"] for row in rows),
+            medicine_ids
+        )
+        plan = plan_basket(coverage, distances, basket_request.max_stores)
+        
+        items = []
+        store_items = [[] for _ in plan.stores]
+        total_jan_aushadhi = total_brand = 0.0
+        for index, (item, medicine_id) in enumerate(zip(basket_request.items, medicine_ids)):
+            medicine = medicines.get(medicine_id)
+            jan_aushadhi_price, brand_price = _pack_prices(medicines, medicine)
+            assignment = plan.assignments[index]
+            store_id = facilities.sources[rows[plan.stores[assignment]]]["id"] if assignment >= 0 else None
+            if assignment >= 0:
+                store_items[assignment].append(medicine["name"])
+                # Jan Aushadhi MRPs are fixed nationally, so cost does not depend on the store
+                total_jan_aushadhi = _add_cost(total_jan_aushadhi, jan_aushadhi_price, item.quantity)
+                total_brand = _add_cost(total_brand, brand_price, item.quantity)
+            items.append({
+                "medicine_id": medicine_id,
+                "medicine_name": medicine["name"],
+                "quantity": item.quantity,
+                "store_id": store_id,
+                **_savings_summary(_add_cost(0.0, jan_aushadhi_price, item.quantity), _add_cost(0.0, brand_price, item.quantity))
+            })
+        
+        stores = []
+        for store_index, names in zip(plan.stores, store_items):
+            store = _with_distance(facilities.sources[rows[store_index]], distances[store_index])
+            store["items"] = names
+            stores.append(store)
+        complete = np.flatnonzero(coverage.all(axis=1)) if len(coverage) else np.empty(0, dtype=np.intp)
+        nearest_complete_store = (
+            _with_distance(facilities.sources[rows[complete[0]]], distances[complete[0]]) if len(complete) else None
+        )
+        
+        return {
+            "stores": stores,
+            "store_count": len(stores),
+            "optimal": plan.exact,
+            "nearest_complete_store": nearest_complete_store,
+            "items": items,
+            "unavailable_items": [item["medicine_name"] for item in items if item["store_id"] is None],
+            "items_without_brand_price": [
+                item["medicine_name"] for item in items if item["store_id"] is not None and item["brand_price"] is None
+            ],
+            "total": _savings_summary(total_jan_aushadhi, total_brand)
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Basket optimization failed: {str(e)}")
+
 @router.get("/savings-calculator")
 async def calculate_jan_aushadhi_savings(
     medicine_name: str = Query(..., description="Medicine name"),
@@ -185,20 +567,21 @@ async def calculate_jan_aushadhi_savings(
     """
     Calculate potential savings with Jan Aushadhi medicines
     """
-    # Mock calculation - In production, fetch real prices
-    jan_aushadhi_price = 2.50 * quantity
-    brand_price = 12.00 * quantity
-    savings = brand_price - jan_aushadhi_price
-    savings_percentage = (savings / brand_price) * 100
+    medicines = catalog_registry.get("jan_aushadhi_medicines")
+    medicine = medicines.find_by_name(medicine_name)
+    if not medicine:
+        raise HTTPException(status_code=404, detail="Medicine not found in the Jan Aushadhi catalog")
+    jan_aushadhi_price, brand_price = _pack_prices(medicines, medicine)
+    summary = _savings_summary(_add_cost(0.0, jan_aushadhi_price, quantity), _add_cost(0.0, brand_price, quantity))
     
     return {
         "medicine_name": medicine_name,
         "quantity": quantity,
-        "jan_aushadhi_price": f"₹{jan_aushadhi_price:.2f}",
-        "brand_price": f"₹{brand_price:.2f}",
-        "savings_amount": f"₹{savings:.2f}",
-        "savings_percentage": f"{savings_percentage:.1f}%",
-        "recommendation": "Choose Jan Aushadhi for significant savings"
+        **summary,
+        "recommendation": (
+            "Choose Jan Aushadhi for significant savings" if summary["savings_amount"] is not None
+            else "Compare with your current brand's price at the pharmacy"
+        )
     }
 
 @router.get("/statistics")
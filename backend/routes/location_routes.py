@@ -1,7 +1,17 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from datetime import datetime
+import asyncio
+import numpy as np
 from pydantic import BaseModel
-import math
+from db import CATALOG_BACKEND
+from services.catalog_repository import healthcare_location_repository, make_projection, stream_json_array, streaming_json_response
+from services.catalog_registry import catalog_registry
+from services.facility_index import facility_directory
+from services.geo_index import haversine_km
+from services.opening_hours import requested_minute
+from services.reverse_geocoder import reverse_geocoder
 
 router = APIRouter()
 
@@ -30,6 +40,23 @@ class LocationSearchRequest(BaseModel):
     radius_km: float = 10
     location_type: Optional[str] = None
     services: Optional[List[str]] = None
+    open_now: bool = False
+    open_at: Optional[datetime] = None
+
+class Coordinates(BaseModel):
+    latitude: float
+    longitude: float
+
+class DistanceMatrixRequest(BaseModel):
+    origins: List[Coordinates]
+    facility_ids: Optional[List[str]] = None
+    location_type: Optional[str] = None
+    services: Optional[List[str]] = None
+    emergency_only: bool = False
+    radius_km: Optional[float] = None
+    k: Optional[int] = None
+
+LOCATION_PROJECTION = make_projection(HealthcareLocation.model_fields)
 
 # Mock healthcare locations database
 HEALTHCARE_LOCATIONS = [
@@ -92,60 +119,45 @@ HEALTHCARE_LOCATIONS = [
     }
 ]
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """
-    Calculate distance between two points using Haversine formula
-    """
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
+catalog_registry.register("healthcare_locations", HEALTHCARE_LOCATIONS)
+# Locations are already facility-shaped; other catalogs (e.g. Jan Aushadhi
+# stores) register their own views into the same geo index
+facility_directory.register_source("healthcare_locations", lambda location: location)
+
+MAX_MATRIX_ORIGINS = 1000
+# Without k every origin returns every facility, so cap the columns
+MAX_MATRIX_COLUMNS = 1000
+
+def _with_distance(facility, distance):
+    location_with_distance = facility.copy()
+    location_with_distance["distance_km"] = round(float(distance), 2)
+    return location_with_distance
 
 @router.post("/search", response_model=List[HealthcareLocation])
 async def search_healthcare_locations(search_request: LocationSearchRequest):
     """
     Search for healthcare locations near given coordinates
     """
+    open_at_minute = requested_minute(search_request.open_now, search_request.open_at)
     try:
-        results = []
-        
-        for location in HEALTHCARE_LOCATIONS:
-            # Calculate distance
-            distance = calculate_distance(
-                search_request.latitude, search_request.longitude,
-                location["latitude"], location["longitude"]
-            )
-            
-            # Filter by radius
-            if distance <= search_request.radius_km:
-                # Filter by type
-                if search_request.location_type and location["type"] != search_request.location_type:
-                    continue
-                
-                # Filter by services
-                if search_request.services:
-                    if not any(service in location["services"] for service in search_request.services):
-                        continue
-                
-                # Add distance to result
-                location_with_distance = location.copy()
-                location_with_distance["distance_km"] = round(distance, 2)
-                results.append(location_with_distance)
+        if CATALOG_BACKEND == "mongo":
+            return await streaming_json_response(healthcare_location_repository.nearby(
+                search_request.latitude, search_request.longitude, LOCATION_PROJECTION,
+                radius_km=search_request.radius_km,
+                location_type=search_request.location_type,
+                services=search_request.services,
+                limit=None,
+                open_at_minute=open_at_minute
+            ))
         
-        # Sort by distance
-        results.sort(key=lambda x: x["distance_km"])
-        
-        return results
+        facilities = facility_directory.get()
+        rows, distances = facilities.query(
+            search_request.latitude, search_request.longitude, search_request.radius_km,
+            types=[search_request.location_type] if search_request.location_type else None,
+            services=search_request.services,
+            open_at_minute=open_at_minute
+        )
+        return [_with_distance(facilities.facilities[row], distance) for row, distance in zip(rows, distances)]
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Location search failed: {str(e)}")
@@ -157,39 +169,131 @@ async def get_nearby_locations(
     radius_km: float = Query(10, description="Search radius in kilometers"),
     location_type: Optional[str] = Query(None, description="Filter by location type"),
     emergency_only: bool = Query(False, description="Show only emergency services"),
+    open_now: bool = Query(False, description="Show only locations open right now"),
+    open_at: Optional[datetime] = Query(None, description="Show only locations open at this time (IST unless an offset is given)"),
+    same_state_only: bool = Query(False, description="Show only locations in the user's state"),
     limit: int = Query(20, description="Maximum results")
 ):
     """
     Get nearby healthcare locations
     """
+    open_at_minute = requested_minute(open_now, open_at)
+    # Insurance and scheme rules are per state; an unresolved state leaves results unfiltered
+    state = reverse_geocoder.reverse(latitude, longitude)["state"] if same_state_only else None
     try:
-        results = []
-        
-        for location in HEALTHCARE_LOCATIONS:
-            distance = calculate_distance(latitude, longitude, location["latitude"], location["longitude"])
-            
-            if distance <= radius_km:
-                if location_type and location["type"] != location_type:
-                    continue
-                if emergency_only and not location["emergency_services"]:
-                    continue
-                
-                location_with_distance = location.copy()
-                location_with_distance["distance_km"] = round(distance, 2)
-                results.append(location_with_distance)
+        if CATALOG_BACKEND == "mongo":
+            return await streaming_json_response(healthcare_location_repository.nearby(
+                latitude, longitude, LOCATION_PROJECTION,
+                radius_km=radius_km,
+                location_type=location_type,
+                emergency_only=emergency_only,
+                limit=limit,
+                open_at_minute=open_at_minute,
+                state=state
+            ))
         
-        results.sort(key=lambda x: x["distance_km"])
-        return results[:limit]
+        facilities = facility_directory.get()
+        rows, distances = facilities.query(
+            latitude, longitude, radius_km,
+            types=[location_type] if location_type else None,
+            emergency_only=emergency_only,
+            limit=limit,
+            open_at_minute=open_at_minute,
+            states=[state] if state else None
+        )
+        return [_with_distance(facilities.facilities[row], distance) for row, distance in zip(rows, distances)]
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Nearby search failed: {str(e)}")
 
+@router.post("/distance-matrix")
+async def get_distance_matrix(matrix_request: DistanceMatrixRequest):
+    """
+    Distances from many origins to many facilities in one call
+    
+    Facilities are the given facility_ids, or every facility matching the
+    type/service/emergency filters. With k, each origin gets its k nearest
+    facilities; without it, its distance to every facility. One JSON row per
+    origin is streamed back as it is computed.
+    """
+    if not matrix_request.origins:
+        raise HTTPException(status_code=400, detail="At least 1 origin required")
+    if len(matrix_request.origins) > MAX_MATRIX_ORIGINS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_MATRIX_ORIGINS} origins per request")
+    if matrix_request.k is not None and matrix_request.k < 1:
+        raise HTTPException(status_code=400, detail="k must be at least 1")
+    
+    facilities = facility_directory.get()
+    if matrix_request.facility_ids:
+        rows, missing = facilities.rows_for_ids(matrix_request.facility_ids)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Unknown facility ids: {', '.join(missing)}")
+    else:
+        mask = facilities.filter_mask(
+            [matrix_request.location_type] if matrix_request.location_type else None,
+            matrix_request.services,
+            matrix_request.emergency_only
+        )
+        rows = np.arange(len(facilities)) if mask is None else np.flatnonzero(mask)
+    
+    if matrix_request.k is None and len(rows) > MAX_MATRIX_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{len(rows)} facilities match; pass k or at most {MAX_MATRIX_COLUMNS} facility_ids"
+        )
+    
+    origins = np.array(
+        [[origin.latitude, origin.longitude] for origin in matrix_request.origins], dtype=np.float64
+    )
+    
+    async def matrix_rows():
+        distance_rows = facilities.distance_rows(origins, rows, matrix_request.k, matrix_request.radius_km)
+        for origin_index, (origin_rows, distances) in enumerate(distance_rows):
+            yield {
+                "origin_index": origin_index,
+                "latitude": matrix_request.origins[origin_index].latitude,
+                "longitude": matrix_request.origins[origin_index].longitude,
+                "results": [
+                    {
+                        "id": facilities.facilities[row]["id"],
+                        "name": facilities.facilities[row]["name"],
+                        "type": facilities.facilities[row]["type"],
+                        "distance_km": round(float(distance), 2)
+                    }
+                    for row, distance in zip(origin_rows, distances)
+                ]
+            }
+            # Let other requests run between origins on large matrices
+            await asyncio.sleep(0)
+    
+    return StreamingResponse(stream_json_array(matrix_rows()), media_type="application/json")
+
+@router.get("/region")
+async def get_region(
+    latitude: float = Query(..., description="Latitude"),
+    longitude: float = Query(..., description="Longitude")
+):
+    """
+    Reverse geocode coordinates to state, district, city and pincode offline
+    """
+    try:
+        region = reverse_geocoder.reverse(latitude, longitude)
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            **region,
+            "country": "India" if region["state"] else None
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Region lookup failed: {str(e)}")
+
 @router.get("/{location_id}", response_model=HealthcareLocation)
 async def get_location_details(location_id: str):
     """
     Get detailed information about a specific healthcare location
     """
-    location = next((l for l in HEALTHCARE_LOCATIONS if l["id"] == location_id), None)
+    location = facility_directory.get().get(location_id)
     if not location:
         raise HTTPException(status_code=404, detail="Healthcare location not found")
     return location
@@ -230,11 +334,11 @@ async def get_directions(
     """
     Get directions to a healthcare location
     """
-    location = next((l for l in HEALTHCARE_LOCATIONS if l["id"] == location_id), None)
+    location = facility_directory.get().get(location_id)
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
     
-    distance = calculate_distance(
+    distance = haversine_km(
         from_latitude, from_longitude,
         location["latitude"], location["longitude"]
     )
@@ -1,8 +1,19 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from pydantic import BaseModel
 import asyncio
-from db import db
+from db import db, CATALOG_BACKEND
+from services.search_index import InvertedIndex
+from services.fuzzy_search import FuzzyMatcher
+from services.autocomplete import PrefixIndex
+from services.ranking import BM25Ranker
+from services.catalog_repository import medicine_repository, make_projection, reject_unsupported, streaming_json_response
+from services.catalog_registry import catalog_registry
+from services.prices import MixedPriceUnitsError, PriceTable
+from services.interactions import interaction_graph, parse_rxnorm_interactions
+from services.external_apis import external_api_service
+from services.federated_search import FederatedResults, generic_key, fda_entries, rxnorm_entries, gather_within
+import numpy as np
 
 router = APIRouter()
 
@@ -25,12 +36,28 @@ class Medicine(BaseModel):
     prescription_required: bool
     manufacturer: List[str]
 
+class MedicineSearchResults(BaseModel):
+    results: List[Medicine]
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+class MedicineBatchRequest(BaseModel):
+    items: List[str]
+    include_interactions: bool = True
+
 class MedicineSearch(BaseModel):
     query: str
     category: Optional[str] = None
     prescription_required: Optional[bool] = None
     jan_aushadhi_only: Optional[bool] = False
 
+MEDICINE_PROJECTION = make_projection(Medicine.model_fields)
+
+MAX_BATCH_ITEMS = 100
+# Longest the federated search waits for remote sources; those that have
+# not answered by then are reported as timed out
+FEDERATED_DEADLINE_MS = 300
+
 # Mock medicine database - In production, this would be MongoDB
 MEDICINES_DB = [
     {
@@ -92,108 +119,355 @@ MEDICINES_DB = [
     }
 ]
 
-@router.get("/search", response_model=List[Medicine])
+def _autocomplete_entries(medicines):
+    """Yield (text, field, weight); names first so they win on duplicate text"""
+    for field in ("name", "generic_name", "manufacturer"):
+        for medicine in medicines:
+            if medicine is None:
+                continue
+            weight = 1 + medicine.get("popularity", 0)
+            values = medicine[field] if isinstance(medicine[field], list) else [medicine[field]]
+            for value in values:
+                yield value, field, weight
+
+# Lookup maps and search indexes are built once here and rebuilt together
+# whenever the catalog is reloaded
+def _build_price_table(medicines):
+    """Parse Jan Aushadhi and brand prices once; "price" is what the patient
+    pays, i.e. the Jan Aushadhi price where available, else the brand price"""
+    table = PriceTable(medicines, {
+        "jan_aushadhi": lambda m: m["jan_aushadhi_price"] if m["jan_aushadhi_available"] else None,
+        "brand": lambda m: m["brand_price"]
+    })
+    effective = table.with_fallback("price", "jan_aushadhi", "brand")
+    table.sort_keys["price"] = effective.minimum
+    table.sort_units["price"] = effective.unit_codes
+    table.sort_keys["savings"] = table.savings("jan_aushadhi", "brand")
+    return table
+
+MEDICINE_CATEGORY_NAMES = {
+    "analgesic": "Pain Relief",
+    "antibiotic": "Antibiotics",
+    "diabetes": "Diabetes",
+    "cardiovascular": "Heart & Blood",
+    "respiratory": "Respiratory",
+    "gastrointestinal": "Digestive"
+}
+
+# Relative weight of a term match in each field for relevance ranking
+MEDICINE_FIELD_BOOSTS = {"name": 3.0, "generic_name": 2.0, "description": 1.0}
+
+catalog_registry.register("medicines", MEDICINES_DB, facet_fields=[
+    "category", "prescription_required", "jan_aushadhi_available"
+], index_builders={
+    "search": lambda medicines: InvertedIndex(
+        medicines,
+        text_fields=["name", "generic_name", "description"],
+        filter_fields=["category", "prescription_required", "jan_aushadhi_available"]
+    ),
+    "fuzzy": lambda medicines: FuzzyMatcher(medicines, fields=["name", "generic_name"]),
+    "autocomplete": lambda medicines: PrefixIndex(_autocomplete_entries(medicines)),
+    "prices": _build_price_table,
+    "ranking": lambda medicines: BM25Ranker(medicines, MEDICINE_FIELD_BOOSTS)
+})
+
+def _matching_positions(medicines, query, filters, fuzzy):
+    """(positions, ranked): catalog positions matching the query, and whether
+    they are exact term matches for BM25 to order"""
+    search_index = medicines.index("search")
+    positions = search_index.search(query, filters)
+    ranked = bool(positions)
+    
+    # Misspelt or transliterated names miss the substring index entirely;
+    # fuzzy matches come back already ordered by edit distance
+    if not positions and fuzzy:
+        positions = medicines.index("fuzzy").search(
+            query, allowed=search_index.filter_candidates(filters)
+        )
+    return positions, ranked
+
+@router.get("/search", response_model=Union[MedicineSearchResults, List[Medicine]])
 async def search_medicines(
     query: str = Query(..., description="Search term for medicines"),
     category: Optional[str] = Query(None, description="Medicine category filter"),
     prescription_required: Optional[bool] = Query(None, description="Filter by prescription requirement"),
     jan_aushadhi_only: bool = Query(False, description="Show only Jan Aushadhi available medicines"),
+    fuzzy: Optional[bool] = Query(None, description="Fall back to typo-tolerant and Hindi/Hinglish name matching (default: true; in-memory catalog only)"),
+    include_facets: bool = Query(False, description="Wrap results with total and per-facet counts"),
+    min_price: Optional[float] = Query(None, ge=0, description="Lowest acceptable price (₹)"),
+    max_price: Optional[float] = Query(None, ge=0, description="Highest acceptable price (₹)"),
+    price_unit: Optional[str] = Query(None, description="Only results priced per this unit, e.g. tablet or course; needed to filter or sort by price when matches mix units"),
+    sort_by: Optional[str] = Query(None, pattern="^(price|savings)$", description="Sort by lowest price or highest Jan Aushadhi savings"),
     limit: int = Query(20, description="Maximum number of results")
 ):
     """
     Search medicines by name, generic name, or description
     """
+    if CATALOG_BACKEND == "mongo":
+        reject_unsupported(
+            fuzzy=fuzzy, include_facets=include_facets,
+            min_price=min_price, max_price=max_price, price_unit=price_unit, sort_by=sort_by
+        )
+    
     try:
-        # Filter medicines based on search criteria
-        filtered_medicines = []
+        if CATALOG_BACKEND == "mongo":
+            return await streaming_json_response(medicine_repository.search(
+                query, MEDICINE_PROJECTION,
+                category=category,
+                prescription_required=prescription_required,
+                jan_aushadhi_only=jan_aushadhi_only,
+                limit=limit
+            ))
+        
+        medicines = catalog_registry.get("medicines")
+        search_index = medicines.index("search")
+        filters = {
+            "category": category or None,
+            "prescription_required": prescription_required,
+            "jan_aushadhi_available": True if jan_aushadhi_only else None
+        }
+        positions, ranked = _matching_positions(medicines, query, filters, fuzzy is not False)
         
-        for medicine in MEDICINES_DB:
-            # Text search
-            if (query.lower() in medicine["name"].lower() or 
-                query.lower() in medicine["generic_name"].lower() or 
-                query.lower() in medicine["description"].lower()):
-                
-                # Apply filters
-                if category and medicine["category"] != category:
-                    continue
-                if prescription_required is not None and medicine["prescription_required"] != prescription_required:
-                    continue
-                if jan_aushadhi_only and not medicine["jan_aushadhi_available"]:
-                    continue
-                
-                filtered_medicines.append(medicine)
+        if min_price is not None or max_price is not None or sort_by or price_unit:
+            prices = medicines.index("prices")
+            selected = np.asarray(positions, dtype=np.intp)
+            if price_unit:
+                selected = prices.in_unit(selected, "price", price_unit)
+            if min_price is not None or max_price is not None:
+                selected = prices.in_band(selected, "price", min_price, max_price)
+            if sort_by:
+                selected = prices.order_by(selected, sort_by, descending=sort_by == "savings")
+            positions = selected.tolist()
         
-        return filtered_medicines[:limit]
+        if ranked and not sort_by:
+            top = medicines.index("ranking").top_k(query, positions, limit)
+        else:
+            top = positions[:limit]
+        
+        if include_facets:
+            return {
+                "results": search_index.documents_at(top),
+                "total": len(positions),
+                "facets": medicines.facets.summarize(search_index.documents_at(positions))
+            }
+        
+        return search_index.documents_at(top)
     
+    except MixedPriceUnitsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@router.get("/autocomplete")
+async def autocomplete_medicines(
+    prefix: str = Query(..., min_length=1, description="Characters typed so far"),
+    limit: int = Query(10, ge=1, le=10, description="Maximum number of suggestions")
+):
+    """
+    Suggest medicine names, generic names and manufacturers for a prefix
+    """
+    return [
+        {"text": text, "field": field, "score": score}
+        for text, field, score in catalog_registry.get("medicines").index("autocomplete").complete(prefix, limit)
+    ]
+
 @router.get("/categories")
 async def get_medicine_categories():
     """
     Get all available medicine categories
     """
+    facets = catalog_registry.get("medicines").facets
     categories = [
-        {"id": "analgesic", "name": "Pain Relief", "count": 15},
-        {"id": "antibiotic", "name": "Antibiotics", "count": 25},
-        {"id": "diabetes", "name": "Diabetes", "count": 12},
-        {"id": "cardiovascular", "name": "Heart & Blood", "count": 18},
-        {"id": "respiratory", "name": "Respiratory", "count": 10},
-        {"id": "gastrointestinal", "name": "Digestive", "count": 14}
+        {"id": category_id, "name": name, "count": facets.count("category", category_id)}
+        for category_id, name in MEDICINE_CATEGORY_NAMES.items()
     ]
+    # Categories present in the data but missing a display name
+    for category_id, count in facets.counts("category").items():
+        if category_id not in MEDICINE_CATEGORY_NAMES:
+            categories.append({"id": category_id, "name": category_id.title(), "count": count})
     return categories
 
+@router.get("/federated-search")
+async def federated_search_medicines(
+    query: str = Query(..., min_length=2, description="Medicine, brand or generic name"),
+    limit: int = Query(20, ge=1, le=50, description="Maximum number of merged results"),
+    timeout_ms: int = Query(FEDERATED_DEADLINE_MS, ge=50, le=5000, description="Overall deadline for remote sources")
+):
+    """
+    Search the local catalog, openFDA and RxNorm at once, merged by generic name.
+    
+    The response is sent once every remote source has answered or the
+    deadline has passed, whichever comes first, so a slow source delays it
+    by at most ``timeout_ms``. Local results are always included, and a
+    source that failed or missed the deadline is reported as "error" or
+    "timeout" rather than as having no matches.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    # Remote lookups start first so they run while the local catalog is searched
+    remote = {
+        "openfda": asyncio.ensure_future(external_api_service.search_fda_drugs_or_raise(query, limit)),
+        "rxnorm": asyncio.ensure_future(external_api_service.search_rxnorm_drugs_or_raise(query))
+    }
+    
+    try:
+        if CATALOG_BACKEND == "mongo":
+            local = [
+                medicine async for medicine in
+                medicine_repository.search(query, MEDICINE_PROJECTION, limit=limit)
+            ]
+        else:
+            medicines = catalog_registry.get("medicines")
+            positions, ranked = _matching_positions(medicines, query, {}, fuzzy=True)
+            top = medicines.index("ranking").top_k(query, positions, limit) if ranked else positions[:limit]
+            local = medicines.index("search").documents_at(top)
+    except Exception as e:
+        for task in remote.values():
+            task.cancel()
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    
+    merged = FederatedResults()
+    for medicine in local:
+        merged.add("local", {
+            "key": generic_key([medicine["generic_name"]]) or medicine["name"].lower(),
+            "generic_name": medicine["generic_name"],
+            "brand_names": [medicine["name"]],
+            "manufacturers": medicine.get("manufacturer", []),
+            "rxcuis": []
+        }, medicine=medicine)
+    
+    answers, statuses = await gather_within(remote, timeout_ms / 1000 - (loop.time() - started))
+    for entry in fda_entries(answers.get("openfda", [])):
+        merged.add("openfda", entry)
+    for entry in rxnorm_entries(answers.get("rxnorm", [])):
+        merged.add("rxnorm", entry)
+    
+    return {
+        "query": query,
+        "results": merged.results(limit),
+        "sources": {"local": "ok", **statuses},
+        "partial": any(status != "ok" for status in statuses.values()),
+        "elapsed_ms": round((loop.time() - started) * 1000)
+    }
+
 @router.get("/{medicine_id}", response_model=Medicine)
 async def get_medicine_details(medicine_id: str):
     """
     Get detailed information about a specific medicine
     """
-    medicine = next((m for m in MEDICINES_DB if m["id"] == medicine_id), None)
+    medicine = catalog_registry.get("medicines").get(medicine_id)
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
     return medicine
 
+def _price_comparison(medicines, medicine):
+    """Jan Aushadhi vs brand price summary using the parsed price table"""
+    savings = medicines.index("prices").sort_keys["savings"][medicines.position(medicine["id"])]
+    return {
+        "medicine_name": medicine["name"],
+        "jan_aushadhi_price": medicine["jan_aushadhi_price"],
+        "brand_price": medicine["brand_price"],
+        "savings_percentage": f"{savings * 100:.0f}%" if not np.isnan(savings) else None,
+        "availability": "Available at 8000+ Jan Aushadhi stores"
+    }
+
+async def _find_interactions(prescription):
+    """Check (label, ingredients) pairs locally, falling back to RxNorm for
+    ingredients the local graph does not cover"""
+    interactions = interaction_graph.check(prescription)
+    
+    unknown = sorted({
+        ingredient for _, ingredients in prescription for ingredient in ingredients
+        if not interaction_graph.knows(ingredient)
+    })
+    if unknown:
+        all_ingredients = sorted({ingredient for _, ingredients in prescription for ingredient in ingredients})
+        payload = await external_api_service.get_drug_interactions(all_ingredients)
+        for interaction in parse_rxnorm_interactions(payload):
+            # Pairs between known ingredients were already answered locally
+            if (interaction_graph.normalize(interaction["ingredient_1"]) in unknown or
+                    interaction_graph.normalize(interaction["ingredient_2"]) in unknown):
+                interactions.append(interaction)
+    
+    return {
+        "interactions_found": len(interactions),
+        "interactions": interactions,
+        "unrecognized_ingredients": unknown,
+        "safe_to_combine": len(interactions) == 0
+    }
+
 @router.get("/jan-aushadhi/compare/{medicine_name}")
 async def compare_jan_aushadhi_prices(medicine_name: str):
     """
     Compare Jan Aushadhi prices with brand prices
     """
-    medicine = next((m for m in MEDICINES_DB if m["name"].lower() == medicine_name.lower()), None)
+    medicines = catalog_registry.get("medicines")
+    medicine = medicines.find_by_name(medicine_name)
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
     
     if not medicine["jan_aushadhi_available"]:
         raise HTTPException(status_code=404, detail="Medicine not available in Jan Aushadhi")
     
-    return {
-        "medicine_name": medicine["name"],
-        "jan_aushadhi_price": medicine["jan_aushadhi_price"],
-        "brand_price": medicine["brand_price"],
-        "savings_percentage": "60-80%",
-        "availability": "Available at 8000+ Jan Aushadhi stores"
-    }
+    return _price_comparison(medicines, medicine)
 
 @router.post("/interaction-check")
 async def check_drug_interactions(medicine_ids: List[str]):
     """
     Check for potential drug interactions between medicines
+    
+    Accepts catalog medicine IDs or free-text drug names. Pairs are checked
+    against the local interaction graph; RxNorm is only consulted when an
+    ingredient is missing from the local data.
     """
     if len(medicine_ids) < 2:
         raise HTTPException(status_code=400, detail="At least 2 medicines required for interaction check")
     
-    # Mock interaction data - In production, use drug interaction APIs
-    interactions = [
-        {
-            "medicine_1": "Paracetamol",
-            "medicine_2": "Warfarin",
-            "severity": "moderate",
-            "description": "May increase bleeding risk",
-            "recommendation": "Monitor INR levels closely"
-        }
-    ]
+    medicines = catalog_registry.get("medicines")
+    prescription = []
+    for medicine_id in medicine_ids:
+        medicine = medicines.get(medicine_id)
+        if medicine:
+            prescription.append((medicine["name"], interaction_graph.ingredients(medicine["composition"])))
+        else:
+            prescription.append((medicine_id, interaction_graph.ingredients(medicine_id)))
     
-    return {
-        "interactions_found": len(interactions),
-        "interactions": interactions,
-        "safe_to_combine": len(interactions) == 0
-    }
\ No newline at end of file
+    return await _find_interactions(prescription)
+
+@router.post("/batch")
+async def get_medicines_batch(request: MedicineBatchRequest):
+    """
+    Resolve a whole prescription in one call: details, Jan Aushadhi price
+    comparison and interaction flags for each medicine ID or name
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="At least 1 medicine required")
+    if len(request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} medicines per batch")
+    
+    # One catalog snapshot for the whole batch, so a concurrent reload
+    # cannot mix old and new records in a single response
+    medicines = catalog_registry.get("medicines")
+    results = []
+    prescription = []
+    for item in request.items:
+        medicine = medicines.get(item) or medicines.find_by_name(item)
+        if medicine:
+            results.append({
+                "query": item,
+                "found": True,
+                "medicine": medicine,
+                "price_comparison": _price_comparison(medicines, medicine) if medicine["jan_aushadhi_available"] else None
+            })
+            prescription.append((medicine["name"], interaction_graph.ingredients(medicine["composition"])))
+        else:
+            results.append({"query": item, "found": False, "medicine": None, "price_comparison": None})
+            prescription.append((item, interaction_graph.ingredients(item)))
+    
+    response = {
+        "results": results,
+        "not_found": [result["query"] for result in results if not result["found"]]
+    }
+    if request.include_interactions:
+        response["interaction_check"] = await _find_interactions(prescription) if len(prescription) >= 2 else None
+    return response
@@ -0,0 +1,101 @@
+import os
+import random
+import sys
+import time
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.facility_index import FacilityIndex
+from services.inventory import StoreInventory
+from services.basket import plan_basket
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STORE_COUNT = 8_500
+CITY_STORE_FRACTION = 0.3
+MEDICINE_COUNT = 1_500
+ITEMS_PER_PRESCRIPTION = 15
+QUERY_COUNT = 300
+RADIUS_KM = 5
+MAX_CANDIDATES = 200
+MAX_STORES = 3
+BUDGET_MS = 50
+
+CITY = (12.97, 77.59)
+
+def make_stores(rng: random.Random) -> List[Dict]:
+    """Nationwide stores with a dense cluster in one city"""
+    stores = []
+    for index in range(STORE_COUNT):
+        if rng.random() < CITY_STORE_FRACTION:
+            latitude, longitude = CITY[0] + rng.gauss(0, 0.06), CITY[1] + rng.gauss(0, 0.06)
+        else:
+            latitude, longitude = rng.uniform(8, 34), rng.uniform(69, 96)
+        stores.append({
+            "id": f"ja_{index:05d}",
+            "name": f"Store {index}",
+            "type": "jan-aushadhi",
+            "latitude": latitude,
+            "longitude": longitude
+        })
+    return stores
+
+def make_stock(rng: np.random.Generator, store_ids: List[str], medicine_ids: List[str]) -> Dict[str, List[str]]:
+    """Common medicines are stocked almost everywhere, rare ones at few stores"""
+    popularity = rng.uniform(0.2, 0.95, len(medicine_ids))
+    in_stock = rng.random((len(store_ids), len(medicine_ids))) < popularity
+    return {
+        store_id: [medicine_ids[column] for column in np.flatnonzero(row)]
+        for store_id, row in zip(store_ids, in_stock)
+    }
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def main():
+    rng = random.Random(7)
+    stores = make_stores(rng)
+    store_ids = [store["id"] for store in stores]
+    medicine_ids = [f"jam_{index:04d}" for index in range(MEDICINE_COUNT)]
+
+    started = time.perf_counter()
+    facilities = FacilityIndex(stores, stores)
+    inventory = StoreInventory(store_ids, medicine_ids, make_stock(np.random.default_rng(7), store_ids, medicine_ids))
+    logger.info(f"Indexed {STORE_COUNT} stores x {MEDICINE_COUNT} medicines in {time.perf_counter() - started:.2f}s")
+
+    latencies = []
+    store_counts = []
+    candidate_counts = []
+    inexact = 0
+    for _ in range(QUERY_COUNT):
+        latitude, longitude = CITY[0] + rng.gauss(0, 0.03), CITY[1] + rng.gauss(0, 0.03)
+        prescription = rng.sample(medicine_ids, ITEMS_PER_PRESCRIPTION)
+
+        started = time.perf_counter()
+        rows, distances = facilities.query(latitude, longitude, RADIUS_KM, types=["jan-aushadhi"], limit=MAX_CANDIDATES)
+        coverage = inventory.coverage(inventory.store_columns(facilities.sources[row]["id"] for row in rows), prescription)
+        plan = plan_basket(coverage, distances, MAX_STORES)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        store_counts.append(len(plan.stores))
+        candidate_counts.append(len(rows))
+        inexact += not plan.exact
+
+    p50, p95 = percentile(latencies, 0.50), percentile(latencies, 0.95)
+    logger.info(
+        f"{ITEMS_PER_PRESCRIPTION}-item baskets over ~{int(np.mean(candidate_counts))} nearby stores: "
+        f"p50={p50:.2f}ms p95={p95:.2f}ms max={max(latencies):.2f}ms (budget {BUDGET_MS}ms)"
+    )
+    logger.info(
+        f"Stores per plan: { {int(size): int(count) for size, count in zip(*np.unique(store_counts, return_counts=True))} }; "
+        f"{inexact} of {QUERY_COUNT} plans fell back to greedy"
+    )
+
+if __name__ == "__main__":
+    main()
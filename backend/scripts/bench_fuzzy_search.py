@@ -0,0 +1,94 @@
+import os
+import random
+import resource
+import sys
+import time
+import logging
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.fuzzy_search import FuzzyMatcher
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOG_SIZE = 50_000
+GENERIC_COUNT = 2_000
+QUERY_COUNT = 5_000
+
+SYLLABLES = [
+    "par", "ace", "ta", "mol", "amo", "xi", "cil", "lin", "met", "for", "min",
+    "az", "ith", "ro", "my", "cin", "ator", "va", "sta", "tin", "lo", "sar",
+    "tan", "pan", "to", "pra", "zole", "ce", "tri", "zine", "dom", "peri",
+    "done", "ibu", "pro", "fen", "dic", "lo", "fe", "nac", "ome", "gli",
+    "mep", "iride", "am", "lod", "ip", "ine", "cef", "ix", "ime", "hydro"
+]
+
+def make_names(rng: random.Random, count: int) -> List[str]:
+    names = set()
+    while len(names) < count:
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 5))).capitalize())
+    return sorted(names)
+
+def make_catalog(size: int) -> List[Dict]:
+    """Generate unique brand-like SKU names sharing a smaller pool of generics"""
+    rng = random.Random(42)
+    generics = make_names(rng, GENERIC_COUNT)
+    return [
+        {"id": f"med_{index:06d}", "name": name, "generic_name": rng.choice(generics)}
+        for index, name in enumerate(make_names(rng, size))
+    ]
+
+def make_typo(name: str, rng: random.Random) -> str:
+    """Apply one random insertion, deletion, substitution or transposition"""
+    letters = list(name.lower())
+    index = rng.randrange(len(letters) - 1)
+    operation = rng.choice(["insert", "delete", "substitute", "transpose"])
+    if operation == "insert":
+        letters.insert(index, rng.choice("abcdefghijklmnopqrstuvwxyz"))
+    elif operation == "delete":
+        del letters[index]
+    elif operation == "substitute":
+        letters[index] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    else:
+        letters[index], letters[index + 1] = letters[index + 1], letters[index]
+    return "".join(letters)
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def main():
+    catalog = make_catalog(CATALOG_SIZE)
+
+    started = time.perf_counter()
+    matcher = FuzzyMatcher(catalog, fields=["name", "generic_name"])
+    logger.info(f"Indexed {CATALOG_SIZE} medicines in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(7)
+    queries = []
+    for _ in range(QUERY_COUNT):
+        position = rng.randrange(CATALOG_SIZE)
+        queries.append((position, make_typo(catalog[position]["name"], rng)))
+
+    latencies = []
+    hits = 0
+    for position, query in queries:
+        started = time.perf_counter()
+        results = matcher.search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if position in results[:10]:
+            hits += 1
+
+    logger.info(
+        f"{QUERY_COUNT} typo queries over {CATALOG_SIZE} names: "
+        f"p50={percentile(latencies, 0.50):.3f}ms "
+        f"p95={percentile(latencies, 0.95):.3f}ms "
+        f"p99={percentile(latencies, 0.99):.3f}ms "
+        f"recall@10={hits / QUERY_COUNT:.1%} "
+        f"peak_rss={resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024}MB"
+    )
+
+if __name__ == "__main__":
+    main()
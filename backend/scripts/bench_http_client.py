@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+import time
+import logging
+from typing import Awaitable, Callable, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.http_client import HttpClientPool, UPSTREAMS
+from stub_upstream import StubUpstream, self_signed_context
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REQUEST_COUNT = 200
+CONCURRENCY = 10
+# Round trip to a far-away upstream (api.fda.gov and rxnav are in the US)
+RTT_MS = float(os.getenv("BENCH_RTT_MS", "0"))
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def measure(label: str, stub: StubUpstream, request: Callable[[], Awaitable[None]]) -> None:
+    connections_before = stub.connections
+    latencies = []
+
+    async def timed():
+        started = time.perf_counter()
+        await request()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for _ in range(REQUEST_COUNT // CONCURRENCY):
+        await asyncio.gather(*(timed() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"{label}: p50={percentile(latencies, 0.50):.2f}ms p95={percentile(latencies, 0.95):.2f}ms "
+        f"{REQUEST_COUNT / elapsed:.0f} req/s, {stub.connections - connections_before} connections opened"
+    )
+
+async def main():
+    contexts = self_signed_context()
+    if contexts is None:
+        logger.warning("openssl not found; benchmarking plain HTTP, which understates handshake cost")
+    server_tls, client_tls = contexts if contexts else (None, True)
+    stub = await StubUpstream(rtt_ms=RTT_MS, tls=server_tls).start()
+    url = f"{stub.url}/REST/rxcui.json?name=paracetamol&search=2"
+    logger.info(f"Stub upstream at {stub.url}, emulated RTT {RTT_MS:.0f}ms, {CONCURRENCY} concurrent requests")
+
+    async def client_per_call():
+        # What every service method did before the shared pool
+        async with httpx.AsyncClient(verify=client_tls) as client:
+            response = await client.get(url, timeout=10.0)
+            response.raise_for_status()
+
+    pool = HttpClientPool(UPSTREAMS, verify=client_tls)
+    await pool.start()
+
+    async def pooled():
+        response = await pool.get("rxnorm").get(url)
+        response.raise_for_status()
+
+    try:
+        await measure("New client per call", stub, client_per_call)
+        await measure("Shared pooled client", stub, pooled)
+    finally:
+        await pool.close()
+        await stub.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import random
+import sys
+import time
+import logging
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from services.catalog_repository import (
+    HealthcareLocationRepository, MedicineRepository, make_projection
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Runs against a throwaway database on a local mongod, never the app database
+MONGO_URL = os.getenv("BENCH_MONGO_URL", "mongodb://localhost:27017")
+BENCH_DATABASE = "aarogya_ai_bench"
+DOCUMENT_COUNT = 100_000
+QUERY_COUNT = 500
+
+CATEGORIES = ["analgesic", "antibiotic", "diabetes", "cardiovascular", "respiratory", "gastrointestinal"]
+LOCATION_TYPES = ["hospital", "pharmacy", "clinic", "diagnostic"]
+WORDS = [
+    "paracetamol", "amoxicillin", "metformin", "atorvastatin", "amlodipine", "omeprazole",
+    "cetirizine", "azithromycin", "ibuprofen", "losartan", "pantoprazole", "diclofenac",
+    "tablet", "syrup", "capsule", "injection", "relief", "infection", "pressure", "sugar"
+]
+
+def make_medicines(rng: random.Random) -> List[Dict]:
+    return [
+        {
+            "id": f"med_{index:06d}",
+            "name": f"{rng.choice(WORDS).capitalize()} {index}",
+            "generic_name": rng.choice(WORDS).capitalize(),
+            "category": rng.choice(CATEGORIES),
+            "description": " ".join(rng.choices(WORDS, k=8)),
+            "composition": "500mg",
+            "dosage": "Twice daily",
+            "side_effects": ["Nausea"],
+            "benefits": ["Relief"],
+            "contraindications": [],
+            "jan_aushadhi_price": "₹2-5 per tablet",
+            "brand_price": "₹8-15 per tablet",
+            "who_approved": True,
+            "fda_approved": rng.random() < 0.5,
+            "jan_aushadhi_available": rng.random() < 0.6,
+            "prescription_required": rng.random() < 0.5,
+            "manufacturer": ["Cipla"]
+        }
+        for index in range(DOCUMENT_COUNT)
+    ]
+
+def make_locations(rng: random.Random) -> List[Dict]:
+    # Spread over India's bounding box, denser around a few metros
+    metros = [(12.97, 77.59), (19.07, 72.88), (28.61, 77.21), (13.08, 80.27), (22.57, 88.36)]
+    locations = []
+    for index in range(DOCUMENT_COUNT):
+        if rng.random() < 0.7:
+            latitude, longitude = rng.choice(metros)
+            latitude += rng.gauss(0, 0.15)
+            longitude += rng.gauss(0, 0.15)
+        else:
+            latitude, longitude = rng.uniform(8, 34), rng.uniform(69, 96)
+        locations.append({
+            "id": f"loc_{index:06d}",
+            "name": f"Facility {index}",
+            "type": rng.choice(LOCATION_TYPES),
+            "address": "Main Road",
+            "city": "City",
+            "state": "State",
+            "country": "India",
+            "latitude": latitude,
+            "longitude": longitude,
+            "phone": "+91 00 0000 0000",
+            "website": None,
+            "rating": round(rng.uniform(3, 5), 1),
+            "reviews_count": rng.randint(0, 5000),
+            "services": rng.sample(["Emergency", "ICU", "Surgery", "Cardiology", "Pharmacy"], 2),
+            "operating_hours": "24/7",
+            "emergency_services": rng.random() < 0.3,
+            "insurance_accepted": ["Cashless"]
+        })
+    return locations
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def measure(label: str, run: Callable[[int], Awaitable[int]]) -> None:
+    latencies = []
+    returned = 0
+    for iteration in range(QUERY_COUNT):
+        started = time.perf_counter()
+        returned += await run(iteration)
+        latencies.append((time.perf_counter() - started) * 1000)
+    logger.info(
+        f"{label}: p50={percentile(latencies, 0.50):.2f}ms "
+        f"p95={percentile(latencies, 0.95):.2f}ms "
+        f"avg_rows={returned / QUERY_COUNT:.1f}"
+    )
+
+async def drain(documents) -> int:
+    count = 0
+    async for _ in documents:
+        count += 1
+    return count
+
+async def main():
+    client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=5000)
+    database = client[BENCH_DATABASE]
+    medicines_repository = MedicineRepository(database)
+    locations_repository = HealthcareLocationRepository(database)
+    rng = random.Random(42)
+
+    try:
+        medicines = make_medicines(rng)
+        locations = make_locations(rng)
+        started = time.perf_counter()
+        await medicines_repository.load(medicines)
+        await locations_repository.load(locations)
+        await medicines_repository.ensure_indexes()
+        await locations_repository.ensure_indexes()
+        logger.info(f"Seeded and indexed {2 * DOCUMENT_COUNT} documents in {time.perf_counter() - started:.1f}s")
+
+        medicine_projection = make_projection(medicines[0].keys())
+        location_projection = make_projection(locations[0].keys())
+        queries = [rng.choice(WORDS) for _ in range(QUERY_COUNT)]
+        origins = [(rng.choice([12.97, 19.07, 28.61]), rng.choice([77.59, 72.88, 77.21])) for _ in range(QUERY_COUNT)]
+
+        def linear_medicines(iteration: int) -> int:
+            query = queries[iteration]
+            matches = [
+                m for m in medicines
+                if (query in m["name"].lower() or query in m["generic_name"].lower() or query in m["description"].lower())
+                and m["category"] == "diabetes" and m["jan_aushadhi_available"]
+            ]
+            return len(matches[:20])
+
+        async def linear_medicines_async(iteration: int) -> int:
+            return linear_medicines(iteration)
+
+        await measure("medicine search, python linear scan", linear_medicines_async)
+        await measure(
+            "medicine search, mongo substring $regex + compound index",
+            lambda iteration: drain(medicines_repository.search(
+                queries[iteration], medicine_projection,
+                category="diabetes", jan_aushadhi_only=True, limit=20
+            ))
+        )
+        await measure(
+            "nearby 10km, mongo 2dsphere $geoNear",
+            lambda iteration: drain(locations_repository.nearby(
+                origins[iteration][0], origins[iteration][1], location_projection,
+                radius_km=10, emergency_only=True, limit=20
+            ))
+        )
+    finally:
+        await client.drop_database(BENCH_DATABASE)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+import math
+import os
+import random
+import sys
+import time
+import logging
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.facility_index import FacilityIndex
+from services.emergency_grid import EmergencyGrid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FACILITY_COUNT = 100_000
+QUERY_COUNT = 500
+LIMIT = 20
+
+METROS = [(12.97, 77.59), (19.07, 72.88), (28.61, 77.21), (13.08, 80.27), (22.57, 88.36)]
+TYPES = ["hospital", "pharmacy", "clinic", "diagnostic", "jan-aushadhi"]
+SERVICES = ["Emergency", "ICU", "Surgery", "Cardiology", "Pharmacy", "Laboratory", "Radiology"]
+
+def make_facilities(rng: random.Random) -> List[Dict]:
+    """Spread over India's bounding box, denser around a few metros"""
+    facilities = []
+    for index in range(FACILITY_COUNT):
+        if rng.random() < 0.7:
+            latitude, longitude = rng.choice(METROS)
+            latitude += rng.gauss(0, 0.15)
+            longitude += rng.gauss(0, 0.15)
+        else:
+            latitude, longitude = rng.uniform(8, 34), rng.uniform(69, 96)
+        facilities.append({
+            "id": f"loc_{index:06d}",
+            "name": f"Facility {index}",
+            "type": rng.choice(TYPES),
+            "latitude": latitude,
+            "longitude": longitude,
+            "services": rng.sample(SERVICES, 2),
+            "emergency_services": rng.random() < 0.3
+        })
+    return facilities
+
+def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """The scalar haversine the location routes used before the facility index"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371 * 2 * math.asin(math.sqrt(a))
+
+def linear_nearby(facilities, latitude, longitude, radius_km, location_type, emergency_only) -> List[Dict]:
+    results = []
+    for facility in facilities:
+        distance = calculate_distance(latitude, longitude, facility["latitude"], facility["longitude"])
+        if distance <= radius_km:
+            if location_type and facility["type"] != location_type:
+                continue
+            if emergency_only and not facility["emergency_services"]:
+                continue
+            facility_with_distance = facility.copy()
+            facility_with_distance["distance_km"] = round(distance, 2)
+            results.append(facility_with_distance)
+    results.sort(key=lambda x: x["distance_km"])
+    return results[:LIMIT]
+
+def indexed_nearby(index, latitude, longitude, radius_km, location_type, emergency_only) -> List[Dict]:
+    rows, distances = index.query(
+        latitude, longitude, radius_km,
+        types=[location_type] if location_type else None,
+        emergency_only=emergency_only,
+        limit=LIMIT
+    )
+    results = []
+    for row, distance in zip(rows, distances):
+        facility_with_distance = index.facilities[row].copy()
+        facility_with_distance["distance_km"] = round(float(distance), 2)
+        results.append(facility_with_distance)
+    return results
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def measure(label: str, queries: List[Tuple], run: Callable[..., List[Dict]]) -> List[List[float]]:
+    latencies = []
+    answers = []
+    for query in queries:
+        started = time.perf_counter()
+        results = run(*query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        answers.append([result["distance_km"] for result in results])
+    logger.info(f"{label}: p50={percentile(latencies, 0.50):.2f}ms p95={percentile(latencies, 0.95):.2f}ms")
+    return answers
+
+def main():
+    rng = random.Random(42)
+    facilities = make_facilities(rng)
+
+    started = time.perf_counter()
+    emergency_grid = EmergencyGrid()
+    emergency_grid.sync({
+        facility["id"]: (facility["latitude"], facility["longitude"])
+        for facility in facilities if facility["emergency_services"]
+    })
+    index = FacilityIndex(facilities, facilities, emergency_grid)
+    logger.info(f"Indexed {FACILITY_COUNT} facilities in {time.perf_counter() - started:.2f}s")
+
+    scenarios = {
+        "10km, any type": (10, None, False),
+        "50km, any type": (50, None, False),
+        "50km, emergency only (grid)": (50, None, True),
+        "50km, hospitals with emergency": (50, "hospital", True),
+        "500km, jan-aushadhi": (500, "jan-aushadhi", False)
+    }
+    for label, (radius_km, location_type, emergency_only) in scenarios.items():
+        queries = []
+        for _ in range(QUERY_COUNT):
+            latitude, longitude = rng.choice(METROS)
+            queries.append((latitude + rng.gauss(0, 0.05), longitude + rng.gauss(0, 0.05), radius_km, location_type, emergency_only))
+
+        # The linear scan takes ~100ms per query, so time it on a sample
+        sample = queries[:QUERY_COUNT // 10]
+        expected = measure(f"{label}, linear scan", sample, lambda *query: linear_nearby(facilities, *query))
+        answers = measure(f"{label}, facility index", queries, lambda *query: indexed_nearby(index, *query))
+        # The old code sorted by rounded distance, so facilities tied to 10m
+        # can swap; compare the distances returned rather than the ids
+        mismatches = sum(a != e for a, e in zip(answers, expected))
+        logger.info(f"{label}: {mismatches} of {len(sample)} sampled answers differ from the linear scan")
+        if emergency_only and not location_type:
+            # First touches above built the grid cells; repeat to time warm lookups
+            measure(f"{label}, facility index, warm cells", queries, lambda *query: indexed_nearby(index, *query))
+
+if __name__ == "__main__":
+    main()
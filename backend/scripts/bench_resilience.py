@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+import time
+import logging
+from typing import List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.http_client import HttpClientPool, UpstreamConfig
+from services.resilience import BreakerConfig, CircuitOpenError
+from stub_upstream import FaultyUpstream
+
+logging.basicConfig(level=logging.INFO)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+REQUEST_COUNT = 600
+CONCURRENCY = 10
+RTT_MS = float(os.getenv("BENCH_RTT_MS", "20"))
+# One response in fifty stalls, like a GC pause or a cold cache upstream
+SLOW_RATE = 0.02
+SLOW_MS = 500
+BREAKER = BreakerConfig(window=20, min_calls=10, failure_threshold=0.5, open_seconds=2.0)
+UPSTREAM = {"rxnorm": UpstreamConfig(timeout=2.0, hedge=True, breaker=BREAKER)}
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def tail_latency(label: str, pool: HttpClientPool, url: str) -> None:
+    latencies = []
+
+    async def timed():
+        started = time.perf_counter()
+        response = await pool.get("rxnorm").get(url)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    for _ in range(REQUEST_COUNT // CONCURRENCY):
+        await asyncio.gather(*(timed() for _ in range(CONCURRENCY)))
+    status = pool.status()["rxnorm"]
+    logger.info(
+        f"{label}: p50={percentile(latencies, 0.50):.0f}ms p99={percentile(latencies, 0.99):.0f}ms "
+        f"max={max(latencies):.0f}ms, {status['hedges']} hedges ({status['hedge_wins']} won)"
+    )
+
+async def outage(pool: HttpClientPool, stub: FaultyUpstream, url: str) -> None:
+    """Upstream goes down, breaker trips and fails fast, upstream recovers"""
+    client = pool.get("rxnorm")
+
+    async def call() -> str:
+        started = time.perf_counter()
+        try:
+            response = await client.get(url)
+            outcome = str(response.status_code)
+        except CircuitOpenError:
+            outcome = "fast-fail"
+        except httpx.TimeoutException:
+            outcome = "timeout"
+        return f"{outcome}/{(time.perf_counter() - started) * 1000:.0f}ms"
+
+    stub.down = True
+    outcomes = [await call() for _ in range(14)]
+    logger.info(f"Upstream down: {' '.join(outcomes)}; breaker {pool.breakers['rxnorm'].state}")
+    stub.down = False
+    await asyncio.sleep(BREAKER.open_seconds)
+    logger.info(f"Upstream back, breaker {pool.breakers['rxnorm'].state}: {await call()} {await call()}")
+    logger.info(f"Breaker after probe: {pool.status()['rxnorm']}")
+
+async def main():
+    stub = await FaultyUpstream(rtt_ms=RTT_MS, slow_rate=SLOW_RATE, slow_ms=SLOW_MS).start()
+    url = f"{stub.url}/REST/rxcui.json?name=paracetamol&search=2"
+    logger.info(f"Stub at {stub.url}: {RTT_MS:.0f}ms RTT, {SLOW_RATE:.0%} of responses stall {SLOW_MS}ms")
+
+    plain = HttpClientPool(UPSTREAM, hedging=False)
+    hedged = HttpClientPool(UPSTREAM, hedging=True)
+    try:
+        await tail_latency("Without hedging", plain, url)
+        await tail_latency("With hedging", hedged, url)
+        stub.slow_rate, stub.slow_ms = 0.0, 300
+        await outage(plain, stub, url)
+    finally:
+        await plain.close()
+        await hedged.close()
+        await stub.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+import time
+import logging
+import random
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.external_apis import ExternalAPIService
+from services.http_client import http_clients
+from stub_upstream import StubUpstream
+
+logging.basicConfig(level=logging.INFO)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+REQUEST_COUNT = 2_000
+CONCURRENCY = 50
+# Searches follow a long tail: a few popular drugs account for most traffic
+DISTINCT_QUERIES = 300
+ZIPF_EXPONENT = 1.1
+RTT_MS = float(os.getenv("BENCH_RTT_MS", "150"))
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def run(label: str, stub: StubUpstream, search) -> None:
+    rng = random.Random(7)
+    weights = [1 / (rank + 1) ** ZIPF_EXPONENT for rank in range(DISTINCT_QUERIES)]
+    queries = rng.choices([f"drug {rank}" for rank in range(DISTINCT_QUERIES)], weights, k=REQUEST_COUNT)
+    requests_before = stub.requests
+    latencies = []
+
+    async def timed(query: str):
+        started = time.perf_counter()
+        await search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for offset in range(0, REQUEST_COUNT, CONCURRENCY):
+        await asyncio.gather(*(timed(query) for query in queries[offset:offset + CONCURRENCY]))
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"{label}: p50={percentile(latencies, 0.50):.2f}ms p95={percentile(latencies, 0.95):.2f}ms "
+        f"{REQUEST_COUNT / elapsed:.0f} req/s, {stub.requests - requests_before} upstream requests"
+    )
+
+async def main():
+    stub = await StubUpstream(rtt_ms=RTT_MS, body={"drugGroup": {"conceptGroup": [{"tty": "SBD"}]}}).start()
+    service = ExternalAPIService()
+    service.rxnorm_base_url = f"{stub.url}/REST"
+    logger.info(f"Stub RxNorm at {stub.url}, emulated RTT {RTT_MS:.0f}ms, {CONCURRENCY} concurrent searches")
+
+    try:
+        await run("Uncached", stub, service._fetch_rxnorm_drugs)
+        await run("Cached, cold", stub, service.search_rxnorm_drugs)
+        await run("Cached, warm", stub, service.search_rxnorm_drugs)
+        logger.info(f"Cache stats: {service.cache.stats()['namespaces']['rxnorm']}")
+    finally:
+        await http_clients.close()
+        await stub.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
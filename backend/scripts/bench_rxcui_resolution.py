@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import logging
+from typing import Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.external_apis as external_apis
+from services.external_apis import ExternalAPIService
+from services.http_client import http_clients
+from services.rxcui_store import RxCUIStore
+from stub_upstream import StubUpstream
+
+logging.basicConfig(level=logging.INFO)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+PRESCRIPTION = [
+    "warfarin", "aspirin", "metformin", "atorvastatin", "amlodipine",
+    "omeprazole", "clopidogrel", "losartan", "metoprolol", "levothyroxine"
+]
+RTT_MS = float(os.getenv("BENCH_RTT_MS", "150"))
+
+class RxNormStub(StubUpstream):
+    """Answers rxcui.json with a per-name id and interaction/list.json with an empty list"""
+
+    async def respond(self, path: str) -> Tuple[int, bytes]:
+        parts = urlsplit(path)
+        if parts.path.endswith("/rxcui.json"):
+            name = parse_qs(parts.query)["name"][0]
+            return 200, json.dumps({"idGroup": {"rxnormId": [str(PRESCRIPTION.index(name) + 1000)]}}).encode("utf-8")
+        return 200, json.dumps({"fullInteractionTypeGroup": []}).encode("utf-8")
+
+async def check(label: str, service: ExternalAPIService, stub: StubUpstream) -> None:
+    requests_before = stub.requests
+    started = time.perf_counter()
+    await service.get_drug_interactions(PRESCRIPTION)
+    logger.info(
+        f"{label}: {(time.perf_counter() - started) * 1000:.0f}ms, "
+        f"{stub.requests - requests_before} upstream requests"
+    )
+
+async def sequential_resolution(service: ExternalAPIService) -> None:
+    # What get_drug_interactions did before: one lookup after another
+    for drug in PRESCRIPTION:
+        await service._fetch_rxcui(drug)
+
+async def main():
+    stub = await RxNormStub(rtt_ms=RTT_MS).start()
+    service = ExternalAPIService()
+    service.rxnorm_base_url = f"{stub.url}/REST"
+    directory = tempfile.mkdtemp(prefix="rxcui_bench_")
+    logger.info(f"Stub RxNorm at {stub.url}, emulated RTT {RTT_MS:.0f}ms, {len(PRESCRIPTION)}-drug prescription")
+
+    try:
+        started = time.perf_counter()
+        await sequential_resolution(service)
+        logger.info(f"Sequential resolution only: {(time.perf_counter() - started) * 1000:.0f}ms")
+
+        external_apis.rxcui_store = RxCUIStore(os.path.join(directory, "rxcui.sqlite3"))
+        await check("Cold store, concurrent resolution", service, stub)
+        await check("Repeat prescription", service, stub)
+
+        # A restarted process reloads the mappings from disk
+        external_apis.rxcui_store = RxCUIStore(os.path.join(directory, "rxcui.sqlite3"))
+        await check("After restart", service, stub)
+    finally:
+        await http_clients.close()
+        await stub.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
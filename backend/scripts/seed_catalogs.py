@@ -0,0 +1,32 @@
+import asyncio
+import os
+import sys
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routes.medicine_routes import MEDICINES_DB
+from routes.hospital_routes import HOSPITAL_TOOLS
+from routes.location_routes import HEALTHCARE_LOCATIONS
+from routes.jan_aushadhi_routes import JAN_AUSHADHI_STORES
+from services.catalog_repository import CATALOG_REPOSITORIES, ensure_catalog_indexes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOGS = {
+    "medicines": MEDICINES_DB,
+    "hospital_tools": HOSPITAL_TOOLS,
+    "healthcare_locations": HEALTHCARE_LOCATIONS,
+    "jan_aushadhi_stores": JAN_AUSHADHI_STORES
+}
+
+async def main():
+    """Load the bundled catalogs into MongoDB for CATALOG_BACKEND=mongo"""
+    for name, records in CATALOGS.items():
+        inserted = await CATALOG_REPOSITORIES[name].load(records)
+        logger.info(f"Seeded {inserted} documents into {name}")
+    await ensure_catalog_indexes()
+
+if __name__ == "__main__":
+    asyncio.run(main())
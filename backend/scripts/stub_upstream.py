@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BODY = {"idGroup": {"rxnormId": ["161"]}}
+
+def self_signed_context() -> Optional[Tuple[ssl.SSLContext, ssl.SSLContext]]:
+    """(server, client) TLS contexts for a throwaway localhost certificate,
+    or None when the openssl CLI is not available"""
+    if not shutil.which("openssl"):
+        return None
+    directory = tempfile.mkdtemp(prefix="stub_upstream_")
+    certificate, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+            "-keyout", key, "-out", certificate
+        ],
+        check=True, capture_output=True
+    )
+    server = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server.load_cert_chain(certificate, key)
+    client = ssl.create_default_context(cafile=certificate)
+    return server, client
+
+class StubUpstream:
+    """Minimal HTTP/1.1 keep-alive server standing in for openFDA, RxNorm or Tavus.
+
+    ``rtt_ms`` emulates network distance: each response waits one round
+    trip, and a new connection waits two more (TCP and TLS 1.3 handshakes),
+    since handshakes on localhost cost almost nothing. ``connections``
+    counts accepted connections, showing whether clients reuse them.
+    """
+
+    def __init__(self, rtt_ms: float = 0.0, body: Optional[Dict] = None, tls: Optional[ssl.SSLContext] = None):
+        self.rtt = rtt_ms / 1000
+        self.body = json.dumps(body or DEFAULT_BODY).encode("utf-8")
+        self.tls = tls
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"{'https' if self.tls else 'http'}://localhost:{port}"
+
+    async def start(self) -> "StubUpstream":
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0, ssl=self.tls)
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def respond(self, path: str) -> Tuple[int, bytes]:
+        """Status and body for a request; subclasses inject faults here"""
+        return 200, self.body
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        if self.rtt:
+            await asyncio.sleep(2 * self.rtt)
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                self.requests += 1
+                path = request.split(b" ", 2)[1].decode("latin-1")
+                if self.rtt:
+                    await asyncio.sleep(self.rtt)
+                status, body = await self.respond(path)
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+class FaultyUpstream(StubUpstream):
+    """StubUpstream that injects faults, for exercising breakers and hedging.
+
+    ``slow_rate`` of responses take an extra ``slow_ms``, ``error_rate``
+    answer 503, and while ``down`` is set every request fails with 503
+    after ``slow_ms`` (a dependency that is timing out). All knobs can be
+    changed while the server runs.
+    """
+
+    def __init__(
+        self,
+        rtt_ms: float = 0.0,
+        body: Optional[Dict] = None,
+        tls: Optional[ssl.SSLContext] = None,
+        slow_rate: float = 0.0,
+        slow_ms: float = 1000.0,
+        error_rate: float = 0.0,
+        seed: int = 7
+    ):
+        super().__init__(rtt_ms, body, tls)
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.down = False
+        self._random = random.Random(seed)
+
+    async def respond(self, path: str) -> Tuple[int, bytes]:
+        if self.down:
+            await asyncio.sleep(self.slow_ms / 1000)
+            return 503, b'{"error": "unavailable"}'
+        if self._random.random() < self.slow_rate:
+            await asyncio.sleep(self.slow_ms / 1000)
+        if self._random.random() < self.error_rate:
+            return 503, b'{"error": "unavailable"}'
+        return await super().respond(path)
@@ -0,0 +1,130 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PrefixIndex:
+    """Radix trie answering "top-k terms starting with this prefix".
+
+    Terms are stored once in a flat list. Each trie node keeps its outgoing
+    edges (keyed by first character, with path-compressed labels) and a
+    precomputed tuple of its k most popular term ids, so a lookup walks at most
+    len(prefix) characters and returns the node's tuple without visiting the
+    subtree. Every word start within a term is also indexed, so "hydro" finds
+    "Metformin Hydrochloride".
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, float]], max_k: int = 10):
+        """entries are (text, field, weight); repeated texts accumulate weight"""
+        self.max_k = max_k
+        self.terms: List[Tuple[str, str]] = []
+        self.weights: List[float] = []
+        self._edges: List[Dict[str, Tuple[str, int]]] = []
+        self._top: List[Tuple[int, ...]] = []
+
+        term_ids: Dict[str, int] = {}
+        for text, field, weight in entries:
+            text = text.strip()
+            normalized = text.lower()
+            if not normalized:
+                continue
+            term_id = term_ids.get(normalized)
+            if term_id is None:
+                term_id = term_ids[normalized] = len(self.terms)
+                self.terms.append((text, field))
+                self.weights.append(0.0)
+            self.weights[term_id] += weight
+
+        self._build(term_ids)
+        logger.info(f"Built prefix index over {len(self.terms)} terms ({len(self._edges)} nodes)")
+
+    def _build(self, term_ids: Dict[str, int]) -> None:
+        # Insert every word-start suffix straight into radix form: follow
+        # edges whose whole label matches, and split an edge where the
+        # suffix diverges from it
+        self._edges.append({})
+        terminals: List[List[int]] = [[]]
+        for normalized, term_id in term_ids.items():
+            for start in self._word_starts(normalized):
+                node_id = 0
+                position = start
+                while position < len(normalized):
+                    edge = self._edges[node_id].get(normalized[position])
+                    if edge is None:
+                        child_id = len(self._edges)
+                        self._edges.append({})
+                        terminals.append([])
+                        self._edges[node_id][normalized[position]] = (normalized[position:], child_id)
+                        node_id = child_id
+                        break
+                    label, child_id = edge
+                    common = 1
+                    while common < len(label) and position + common < len(normalized) and label[common] == normalized[position + common]:
+                        common += 1
+                    if common < len(label):
+                        split_id = len(self._edges)
+                        self._edges.append({label[common]: (label[common:], child_id)})
+                        terminals.append([])
+                        self._edges[node_id][label[0]] = (label[:common], split_id)
+                        child_id = split_id
+                    node_id = child_id
+                    position += common
+                if term_id not in terminals[node_id]:
+                    terminals[node_id].append(term_id)
+
+        self._rank_subtrees(terminals)
+
+    @staticmethod
+    def _word_starts(text: str) -> List[int]:
+        return [0] + [
+            index + 1 for index, char in enumerate(text[:-1])
+            if (char.isspace() or char in "-/(") and text[index + 1].isalnum()
+        ]
+
+    def _rank(self, term_ids: Iterable[int]) -> Tuple[int, ...]:
+        unique = set(term_ids)
+        best = heapq.nsmallest(self.max_k, unique, key=lambda term_id: (-self.weights[term_id], self.terms[term_id][0]))
+        return tuple(best)
+
+    def _rank_subtrees(self, terminals: List[List[int]]) -> None:
+        """Fill each node's top-k from its terminals and children (iterative post-order)"""
+        self._top = [()] * len(self._edges)
+        stack = [(0, False)]
+        while stack:
+            node_id, expanded = stack.pop()
+            if not expanded:
+                stack.append((node_id, True))
+                for _, child_id in self._edges[node_id].values():
+                    stack.append((child_id, False))
+            else:
+                candidates = list(terminals[node_id])
+                for _, child_id in self._edges[node_id].values():
+                    candidates.extend(self._top[child_id])
+                self._top[node_id] = self._rank(candidates)
+
+    def _find(self, prefix: str) -> Optional[int]:
+        node_id = 0
+        position = 0
+        while position < len(prefix):
+            edge = self._edges[node_id].get(prefix[position])
+            if edge is None:
+                return None
+            label, child_id = edge
+            remaining = prefix[position:position + len(label)]
+            if not label.startswith(remaining):
+                return None
+            position += len(label)
+            node_id = child_id
+        return node_id
+
+    def complete(self, prefix: str, k: Optional[int] = None) -> List[Tuple[str, str, float]]:
+        """Return up to k (text, field, weight) suggestions, most popular first"""
+        k = self.max_k if k is None else min(k, self.max_k)
+        node_id = self._find(prefix.strip().lower())
+        if node_id is None:
+            return []
+        return [
+            (self.terms[term_id][0], self.terms[term_id][1], self.weights[term_id])
+            for term_id in self._top[node_id][:k]
+        ]
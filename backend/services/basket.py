@@ -0,0 +1,108 @@
+from typing import List, NamedTuple, Optional
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Items per basket; coverage is held as one int64 bitmask per store
+MAX_BASKET_ITEMS = 60
+
+# Largest store combination searched exactly, and the most combinations
+# (distinct stores ** size) an exact search may enumerate before the
+# planner falls back to greedy
+EXACT_MAX_STORES = 3
+EXACT_MAX_COMBINATIONS = 1_000_000
+
+class BasketPlan(NamedTuple):
+    stores: List[int]            # Candidate indices, nearest first
+    assignments: List[int]       # Per item: index into ``stores``, or -1 if unavailable
+    exact: bool                  # Whether the store count is proven minimal
+
+def _item_masks(coverage: np.ndarray) -> np.ndarray:
+    weights = np.left_shift(np.int64(1), np.arange(coverage.shape[1], dtype=np.int64))
+    return (coverage.astype(np.int64) * weights).sum(axis=1)
+
+def _undominated(masks: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """Candidates worth considering: the nearest store per distinct item set,
+    minus any whose items are a subset of a nearer (or as near) store's"""
+    _, first = np.unique(masks, return_index=True)
+    first = first[masks[first] != 0]
+    first = first[np.argsort(distances[first], kind="stable")]
+    subset_masks, subset_distances = masks[first], distances[first]
+    covered_by = (subset_masks[:, None] & subset_masks[None, :]) == subset_masks[:, None]
+    nearer = subset_distances[None, :] <= subset_distances[:, None]
+    np.fill_diagonal(covered_by, False)
+    dominated = (covered_by & nearer).any(axis=1)
+    return first[~dominated]
+
+def _exact(masks: np.ndarray, distances: np.ndarray, target: int, size: int) -> Optional[List[int]]:
+    """Cheapest (by total distance) combination of ``size`` candidates covering target"""
+    count = len(masks)
+    if size == 1:
+        full = np.flatnonzero(masks == target)
+        return [int(full[np.argmin(distances[full])])] if len(full) else None
+    if size == 2:
+        unions = masks[:, None] | masks[None, :]
+        costs = distances[:, None] + distances[None, :]
+        order = np.arange(count)[:, None] < np.arange(count)[None, :]
+    else:
+        unions = masks[:, None, None] | masks[None, :, None] | masks[None, None, :]
+        costs = distances[:, None, None] + distances[None, :, None] + distances[None, None, :]
+        index = np.arange(count)
+        order = (index[:, None, None] < index[None, :, None]) & (index[None, :, None] < index[None, None, :])
+    valid = (unions == target) & order
+    if not valid.any():
+        return None
+    best = np.unravel_index(np.argmin(np.where(valid, costs, np.inf)), valid.shape)
+    return [int(candidate) for candidate in best]
+
+def _greedy(masks: np.ndarray, distances: np.ndarray, target: int, max_stores: int) -> List[int]:
+    """Repeatedly take the store adding the most uncovered items, nearest on ties"""
+    chosen: List[int] = []
+    covered = 0
+    while covered != target and len(chosen) < max_stores:
+        gains = np.array([bin(int(mask) & ~covered).count("1") for mask in masks])
+        best_gain = gains.max()
+        if best_gain == 0:
+            break
+        best = int(np.flatnonzero(gains == best_gain)[np.argmin(distances[gains == best_gain])])
+        chosen.append(best)
+        covered |= int(masks[best])
+    return chosen
+
+def plan_basket(coverage: np.ndarray, distances: np.ndarray, max_stores: int = 3) -> BasketPlan:
+    """Fewest candidate stores covering every item any candidate stocks.
+
+    ``coverage`` is a (stores, items) stock matrix and ``distances`` each
+    store's distance. Among covers with the fewest stores the one with the
+    least total distance wins. The search is exact up to
+    ``EXACT_MAX_STORES`` stores over the pruned candidates (one broadcast
+    bitmask OR per size), then greedy. Each item is assigned to the nearest
+    chosen store that stocks it.
+    """
+    masks = _item_masks(coverage)
+    target = int(np.bitwise_or.reduce(masks)) if len(masks) else 0
+    if target == 0:
+        return BasketPlan([], [-1] * coverage.shape[1], True)
+
+    candidates = _undominated(masks, distances)
+    candidate_masks, candidate_distances = masks[candidates], distances[candidates]
+
+    chosen: Optional[List[int]] = None
+    exact = True
+    for size in range(1, min(max_stores, EXACT_MAX_STORES) + 1):
+        if len(candidates) ** size > EXACT_MAX_COMBINATIONS:
+            break
+        chosen = _exact(candidate_masks, candidate_distances, target, size)
+        if chosen is not None:
+            break
+    if chosen is None:
+        chosen = _greedy(candidate_masks, candidate_distances, target, max_stores)
+        exact = False
+
+    stores = sorted((int(candidates[index]) for index in chosen), key=lambda store: distances[store])
+    assignments = []
+    for item in range(coverage.shape[1]):
+        stocking = [position for position, store in enumerate(stores) if coverage[store, item]]
+        assignments.append(stocking[0] if stocking else -1)
+    return BasketPlan(stores, assignments, exact)
@@ -0,0 +1,177 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import re
+import threading
+import logging
+from services.facets import FacetCounter
+
+logger = logging.getLogger(__name__)
+
+IndexBuilder = Callable[[List[Dict[str, Any]]], Any]
+
+WHITESPACE = re.compile(r"\s+")
+
+def normalize_name(name: str) -> str:
+    """Case- and whitespace-insensitive key for name lookups"""
+    return WHITESPACE.sub(" ", name).strip().lower()
+
+class Catalog:
+    """One loaded catalog with hash lookups, facet counts and derived indexes.
+
+    ``by_id`` and ``by_name`` give constant-time detail lookups. Every derived
+    index (search, fuzzy, autocomplete, ...) is built from the same record list
+    when the catalog is created, so positions agree across indexes. Removed
+    records leave a ``None`` slot until the next reload so positions stay
+    stable; builders must skip those slots.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        records: Iterable[Dict[str, Any]],
+        name_field: str = "name",
+        facet_fields: Iterable[str] = (),
+        index_builders: Optional[Dict[str, IndexBuilder]] = None
+    ):
+        self.name = name
+        self.name_field = name_field
+        self.records: List[Optional[Dict[str, Any]]] = list(records)
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        self._positions: Dict[str, int] = {}
+        # Bumped on every in-place change so views derived from several
+        # catalogs can tell when to rebuild
+        self.version = 0
+        self._index_builders = dict(index_builders or {})
+
+        for position, record in enumerate(self.records):
+            self._map(position, record)
+
+        self.facets = FacetCounter(self.records, facet_fields)
+        self.indexes: Dict[str, Any] = {
+            key: builder(self.records) for key, builder in self._index_builders.items()
+        }
+
+    def _map(self, position: int, record: Dict[str, Any]) -> None:
+        self.by_id[record["id"]] = record
+        self._positions[record["id"]] = position
+        # First record wins on duplicate names, matching a linear next() scan
+        self.by_name.setdefault(normalize_name(record[self.name_field]), record)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Append a record, updating maps, facets and indexes in place.
+
+        Indexes exposing add()/remove() are updated incrementally; any other
+        derived index is rebuilt from the current records.
+        """
+        if record["id"] in self.by_id:
+            self.remove(record["id"])
+        position = len(self.records)
+        self.records.append(record)
+        self._map(position, record)
+        self.facets.add(record)
+        self.version += 1
+        for key, index in self.indexes.items():
+            if hasattr(index, "add"):
+                index.add(record)
+            else:
+                self.indexes[key] = self._index_builders[key](self.records)
+
+    def remove(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a record by id, leaving its slot empty; returns the record"""
+        position = self._positions.pop(record_id, None)
+        if position is None:
+            return None
+        record = self.records[position]
+        self.records[position] = None
+        del self.by_id[record_id]
+        name_key = normalize_name(record[self.name_field])
+        if self.by_name.get(name_key) is record:
+            del self.by_name[name_key]
+            replacement = next(
+                (other for other in self.records if other is not None
+                 and normalize_name(other[self.name_field]) == name_key),
+                None
+            )
+            if replacement is not None:
+                self.by_name[name_key] = replacement
+        self.facets.remove(record)
+        self.version += 1
+        for key, index in self.indexes.items():
+            if hasattr(index, "remove"):
+                index.remove(position)
+            else:
+                self.indexes[key] = self._index_builders[key](self.records)
+        return record
+
+    def live_records(self) -> List[Dict[str, Any]]:
+        return [record for record in self.records if record is not None]
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(record_id)
+
+    def find_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.by_name.get(normalize_name(name))
+
+    def position(self, record_id: str) -> Optional[int]:
+        """Slot of a record in ``records`` and in every derived index"""
+        return self._positions.get(record_id)
+
+    def index(self, key: str) -> Any:
+        return self.indexes[key]
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+class CatalogRegistry:
+    """Process-wide registry of catalogs.
+
+    Reloading builds a complete new Catalog (lookup maps and every derived
+    index) before swapping it in with a single reference assignment, so
+    concurrent requests see either the old catalog or the new one, never a
+    half-built mix. Handlers should fetch the catalog once per request.
+    Single-record add/remove updates the current catalog in place under the
+    registry lock instead of rebuilding it.
+    """
+
+    def __init__(self):
+        self._catalogs: Dict[str, Catalog] = {}
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        records: Iterable[Dict[str, Any]],
+        name_field: str = "name",
+        facet_fields: Iterable[str] = (),
+        index_builders: Optional[Dict[str, IndexBuilder]] = None
+    ) -> Catalog:
+        with self._lock:
+            self._specs[name] = {
+                "name_field": name_field,
+                "facet_fields": list(facet_fields),
+                "index_builders": dict(index_builders or {})
+            }
+        return self.reload(name, records)
+
+    def reload(self, name: str, records: Iterable[Dict[str, Any]]) -> Catalog:
+        spec = self._specs[name]
+        catalog = Catalog(name, [record for record in records if record is not None], **spec)
+        with self._lock:
+            self._catalogs[name] = catalog
+        logger.info(f"Loaded catalog {name} with {len(catalog)} records")
+        return catalog
+
+    def get(self, name: str) -> Catalog:
+        return self._catalogs[name]
+
+    def add_record(self, name: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._catalogs[name].add(record)
+
+    def remove_record(self, name: str, record_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._catalogs[name].remove(record_id)
+
+# Global instance
+catalog_registry = CatalogRegistry()
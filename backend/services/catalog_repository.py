@@ -0,0 +1,373 @@
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence
+from abc import ABC, abstractmethod
+import json
+import re
+import logging
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pymongo import ASCENDING, GEOSPHERE
+from pymongo.errors import PyMongoError
+from db import db
+from services.opening_hours import parse_opening_hours
+
+logger = logging.getLogger(__name__)
+
+# Case-insensitive equality for city/state filters that can still use an index
+CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+
+def make_projection(fields: Iterable[str]) -> Dict[str, int]:
+    """Mongo projection returning only the given fields and never _id"""
+    projection = {field: 1 for field in fields}
+    projection["_id"] = 0
+    return projection
+
+def geo_point(latitude: float, longitude: float) -> Dict[str, Any]:
+    """GeoJSON point as stored in the 2dsphere-indexed ``location`` field"""
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+def open_at_query(minute: int) -> Dict[str, Any]:
+    """Match documents whose compiled ``open_intervals`` cover the minute of the week"""
+    return {"open_intervals": {"$elemMatch": {"start": {"$lte": minute}, "end": {"$gt": minute}}}}
+
+def substring_query(query: str, fields: Sequence[str]) -> Dict[str, Any]:
+    """Match documents containing the query, case-insensitively, in any of
+    the fields: the same test the in-memory InvertedIndex applies. The query
+    is escaped, so it is matched literally rather than as a pattern."""
+    pattern = {"$regex": re.escape(query.lower()), "$options": "i"}
+    return {"$or": [{field: pattern} for field in fields]}
+
+def field_rank(query: str, fields: Sequence[str]) -> Dict[str, Any]:
+    """Index of the first string field containing the query, len(fields)
+    if none does; sorts name matches ahead of description-only ones"""
+    pattern = re.escape(query.lower())
+    return {"$switch": {
+        "branches": [
+            {
+                "case": {"$regexMatch": {"input": {"$ifNull": [f"${field}", ""]}, "regex": pattern, "options": "i"}},
+                "then": rank
+            }
+            for rank, field in enumerate(fields)
+        ],
+        "default": len(fields)
+    }}
+
+async def stream_json_array(documents: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode documents as a JSON array chunk by chunk while the cursor drains"""
+    yield b"["
+    first = True
+    async for document in documents:
+        yield (b"" if first else b",") + json.dumps(document, ensure_ascii=False, default=str).encode("utf-8")
+        first = False
+    yield b"]"
+
+async def streaming_json_response(documents: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Stream documents as a JSON array once the first one has arrived.
+
+    Awaiting the first batch here means query and connection errors are
+    raised inside the route's own error handling, before a 200 status has
+    been sent, instead of cutting the body short mid-stream.
+    """
+    iterator = documents.__aiter__()
+    try:
+        first = await iterator.__anext__()
+    except StopAsyncIteration:
+        return StreamingResponse(iter([b"[]"]), media_type="application/json")
+
+    async def remaining():
+        yield first
+        async for document in iterator:
+            yield document
+
+    return StreamingResponse(stream_json_array(remaining()), media_type="application/json")
+
+def reject_unsupported(**parameters: Any) -> None:
+    """400 for query parameters the Mongo repositories do not implement, so
+    the response never silently changes with CATALOG_BACKEND"""
+    used = [name for name, value in parameters.items() if value is not None and value is not False]
+    if used:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{', '.join(used)} not supported when catalogs are served from MongoDB"
+        )
+
+class CatalogRepository(ABC):
+    """Base class for Mongo-backed catalog collections.
+
+    Query methods return async iterators over the driver cursor, so callers
+    can stream documents out as Mongo produces them instead of materializing
+    the full result list.
+    """
+
+    collection_name = ""
+
+    def __init__(self, database):
+        self.collection = database[self.collection_name]
+
+    @abstractmethod
+    async def ensure_indexes(self) -> None:
+        """Create the indexes the repository's queries rely on"""
+
+    def prepare(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a catalog record into the stored document"""
+        return dict(record)
+
+    async def load(self, records: Iterable[Dict[str, Any]], batch_size: int = 5000) -> int:
+        """Replace the collection contents with records, inserting in batches"""
+        await self.collection.delete_many({})
+        batch: List[Dict[str, Any]] = []
+        inserted = 0
+        for record in records:
+            batch.append(self.prepare(record))
+            if len(batch) >= batch_size:
+                await self.collection.insert_many(batch, ordered=False)
+                inserted += len(batch)
+                batch = []
+        if batch:
+            await self.collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+        return inserted
+
+    async def _stream(self, cursor) -> AsyncIterator[Dict[str, Any]]:
+        async for document in cursor:
+            yield document
+
+class MedicineRepository(CatalogRepository):
+    collection_name = "medicines"
+
+    # Matched as substrings like the in-memory index, in ranking order
+    text_fields = ["name", "generic_name", "description"]
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("id", ASCENDING)], unique=True, name="medicine_id")
+        # A substring $regex cannot use an index, so the filters index narrows
+        # the documents it has to scan
+        await self.collection.create_index(
+            [("category", ASCENDING), ("prescription_required", ASCENDING), ("jan_aushadhi_available", ASCENDING)],
+            name="medicine_filters"
+        )
+
+    def search(
+        self,
+        query: str,
+        projection: Dict[str, int],
+        category: Optional[str] = None,
+        prescription_required: Optional[bool] = None,
+        jan_aushadhi_only: bool = False,
+        limit: int = 20
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Substring search with filters pushed into Mongo; name matches
+        first, then generic name, then description, each by name"""
+        mongo_query: Dict[str, Any] = substring_query(query, self.text_fields)
+        if category:
+            mongo_query["category"] = category
+        if prescription_required is not None:
+            mongo_query["prescription_required"] = prescription_required
+        if jan_aushadhi_only:
+            mongo_query["jan_aushadhi_available"] = True
+
+        pipeline = [
+            {"$match": mongo_query},
+            {"$addFields": {"match_rank": field_rank(query, self.text_fields)}},
+            {"$sort": {"match_rank": ASCENDING, "name": ASCENDING}},
+            {"$limit": limit},
+            {"$project": projection}
+        ]
+        return self._stream(self.collection.aggregate(pipeline))
+
+class HospitalToolRepository(CatalogRepository):
+    collection_name = "hospital_tools"
+
+    text_fields = ["name", "description", "uses"]
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("id", ASCENDING)], unique=True, name="tool_id")
+        await self.collection.create_index(
+            [("category", ASCENDING), ("complexity", ASCENDING), ("who_approved", ASCENDING)],
+            name="tool_filters"
+        )
+        await self.collection.create_index([("departments", ASCENDING)], name="tool_departments")
+
+    def search(
+        self,
+        projection: Dict[str, int],
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        department: Optional[str] = None,
+        complexity: Optional[str] = None,
+        who_approved: Optional[bool] = None,
+        limit: int = 20
+    ) -> AsyncIterator[Dict[str, Any]]:
+        mongo_query: Dict[str, Any] = substring_query(query, self.text_fields) if query else {}
+        if category:
+            mongo_query["category"] = category
+        if department:
+            mongo_query["departments"] = department
+        if complexity:
+            mongo_query["complexity"] = complexity
+        if who_approved is not None:
+            mongo_query["who_approved"] = who_approved
+
+        if not query:
+            return self._stream(self.collection.find(mongo_query, projection).limit(limit))
+        # uses is a list, so only name is ranked; the rest sort by name
+        pipeline = [
+            {"$match": mongo_query},
+            {"$addFields": {"match_rank": field_rank(query, ["name"])}},
+            {"$sort": {"match_rank": ASCENDING, "name": ASCENDING}},
+            {"$limit": limit},
+            {"$project": projection}
+        ]
+        return self._stream(self.collection.aggregate(pipeline))
+
+class GeoCatalogRepository(CatalogRepository):
+    """Catalog whose records carry latitude/longitude and opening hours"""
+
+    def prepare(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        document = dict(record)
+        document["location"] = geo_point(record["latitude"], record["longitude"])
+        # Hours are parsed once on load; unparseable hours never match open filters
+        intervals = parse_opening_hours(record.get("operating_hours")) or []
+        document["open_intervals"] = [{"start": start, "end": end} for start, end in intervals]
+        return document
+
+    async def _geo_near(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: Optional[float],
+        query: Dict[str, Any],
+        projection: Dict[str, int],
+        limit: Optional[int],
+        collation: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Nearest-first documents via $geoNear, with distance_km attached"""
+        geo_near: Dict[str, Any] = {
+            "near": geo_point(latitude, longitude),
+            "distanceField": "distance_km",
+            "distanceMultiplier": 0.001,
+            "spherical": True,
+            "query": query
+        }
+        if radius_km is not None:
+            geo_near["maxDistance"] = radius_km * 1000
+
+        pipeline: List[Dict[str, Any]] = [{"$geoNear": geo_near}]
+        if limit is not None:
+            pipeline.append({"$limit": limit})
+        pipeline.append({"$project": {**projection, "distance_km": {"$round": ["$distance_km", 2]}}})
+        options = {"collation": collation} if collation else {}
+        async for document in self.collection.aggregate(pipeline, **options):
+            yield document
+
+class HealthcareLocationRepository(GeoCatalogRepository):
+    collection_name = "healthcare_locations"
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("id", ASCENDING)], unique=True, name="location_id")
+        await self.collection.create_index(
+            [("location", GEOSPHERE), ("type", ASCENDING), ("emergency_services", ASCENDING)],
+            name="location_geo_type"
+        )
+        await self.collection.create_index([("services", ASCENDING)], name="location_services")
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        projection: Dict[str, int],
+        radius_km: float = 10,
+        location_type: Optional[str] = None,
+        services: Optional[List[str]] = None,
+        emergency_only: bool = False,
+        limit: Optional[int] = 20,
+        open_at_minute: Optional[int] = None,
+        state: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        mongo_query: Dict[str, Any] = {}
+        if location_type:
+            mongo_query["type"] = location_type
+        if services:
+            mongo_query["services"] = {"$in": services}
+        if emergency_only:
+            mongo_query["emergency_services"] = True
+        if open_at_minute is not None:
+            mongo_query.update(open_at_query(open_at_minute))
+        if state:
+            mongo_query["state"] = state
+        return self._geo_near(
+            latitude, longitude, radius_km, mongo_query, projection, limit,
+            collation=CASE_INSENSITIVE if state else None
+        )
+
+class JanAushadhiStoreRepository(GeoCatalogRepository):
+    collection_name = "jan_aushadhi_stores"
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("id", ASCENDING)], unique=True, name="store_id")
+        await self.collection.create_index([("location", GEOSPHERE)], name="store_geo")
+        await self.collection.create_index(
+            [("state", ASCENDING), ("city", ASCENDING)],
+            collation=CASE_INSENSITIVE,
+            name="store_state_city"
+        )
+        await self.collection.create_index([("pincode", ASCENDING)], name="store_pincode")
+
+    def search(
+        self,
+        projection: Dict[str, int],
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        pincode: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: float = 10,
+        limit: int = 20,
+        open_at_minute: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        mongo_query: Dict[str, Any] = {}
+        # Plain equality under a case-insensitive collation instead of a regex,
+        # so the state/city index stays usable
+        if city:
+            mongo_query["city"] = city
+        if state:
+            mongo_query["state"] = state
+        if pincode:
+            mongo_query["pincode"] = pincode
+        if open_at_minute is not None:
+            mongo_query.update(open_at_query(open_at_minute))
+
+        if latitude is not None and longitude is not None:
+            return self._geo_near(
+                latitude, longitude, radius_km, mongo_query, projection, limit,
+                collation=CASE_INSENSITIVE
+            )
+
+        cursor = (
+            self.collection
+            .find(mongo_query, projection)
+            .collation(CASE_INSENSITIVE)
+            .limit(limit)
+        )
+        return self._stream(cursor)
+
+# Global instances
+medicine_repository = MedicineRepository(db)
+hospital_tool_repository = HospitalToolRepository(db)
+healthcare_location_repository = HealthcareLocationRepository(db)
+jan_aushadhi_store_repository = JanAushadhiStoreRepository(db)
+
+CATALOG_REPOSITORIES = {
+    "medicines": medicine_repository,
+    "hospital_tools": hospital_tool_repository,
+    "healthcare_locations": healthcare_location_repository,
+    "jan_aushadhi_stores": jan_aushadhi_store_repository
+}
+
+async def ensure_catalog_indexes() -> None:
+    """Create every catalog index; failures are logged so startup continues"""
+    for name, repository in CATALOG_REPOSITORIES.items():
+        try:
+            await repository.ensure_indexes()
+            logger.info(f"Ensured indexes for {name}")
+        except PyMongoError as e:
+            logger.warning(f"Index creation failed for {name}: {e}")
@@ -0,0 +1,213 @@
+from typing import Dict, List, Optional, Tuple
+import math
+import threading
+import logging
+import numpy as np
+from services.geo_index import EARTH_RADIUS_KM, haversine_km, haversine_km_many, nearest_first
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+class EmergencyGrid:
+    """Nearest-emergency-facility lookup over ~1 km grid cells.
+
+    Each cell caches the emergency facilities that can be among the ``k``
+    nearest to any point inside it: everything within d_k(center) + 2h of the
+    cell center, where d_k is the k-th nearest distance and h the cell's
+    half-diagonal (by the triangle inequality no facility outside that
+    radius can beat the k-th nearest for a point in the cell). A lookup is a
+    dict fetch plus a vectorized refine over those few candidates.
+
+    Cells are filled on first use rather than for all of India up front
+    (~9M cells), and the cache is bounded by ``max_cells``. Facilities are
+    tracked by id in their own slots, so the grid survives facility index
+    rebuilds: ``sync`` applies only the changed emergency flags and
+    coordinates, extending or invalidating just the affected cells.
+    """
+
+    def __init__(self, k: int = 20, cell_km: float = 1.0, max_cells: int = 200_000):
+        self.k = k
+        self.cell_km = cell_km
+        self.max_cells = max_cells
+        self._cell_degrees = cell_km / KM_PER_DEGREE
+
+        # Facility slots; dead slots have NaN coordinates and no id
+        self._slot_ids: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._coordinates: Dict[str, Tuple[float, float]] = {}
+        self._latitudes = np.empty(0)
+        self._longitudes = np.empty(0)
+        self._cos_latitudes = np.empty(0)
+        self._free_slots: List[int] = []
+
+        # Cell cache: key -> cache slot, with per-slot center/radius rows so
+        # updates can test every cached cell in one vectorized pass
+        self._cells: Dict[Tuple[int, int], int] = {}
+        self._cell_keys: List[Optional[Tuple[int, int]]] = []
+        self._cell_candidates: List[Optional[np.ndarray]] = []
+        # Columns: center latitude, center longitude (radians), cos latitude, radius
+        self._cell_geometry = np.empty((0, 4))
+
+        self._lock = threading.Lock()
+
+    # Facility maintenance
+
+    def sync(self, emergency_facilities: Dict[str, Tuple[float, float]]) -> None:
+        """Bring the grid in line with the current emergency facilities
+        (id -> latitude/longitude), touching only what changed"""
+        with self._lock:
+            for facility_id in [facility_id for facility_id in self._slots if facility_id not in emergency_facilities]:
+                self._remove(facility_id)
+            for facility_id, coordinates in emergency_facilities.items():
+                current = self._coordinates.get(facility_id)
+                if current == coordinates:
+                    continue
+                if current is not None:
+                    self._remove(facility_id)
+                self._add(facility_id, coordinates)
+
+    def _add(self, facility_id: str, coordinates: Tuple[float, float]) -> None:
+        latitude, longitude = coordinates
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = facility_id
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(facility_id)
+            if slot == len(self._latitudes):
+                # Grow by doubling so bulk loads stay linear
+                grow = np.full(max(slot, 64), np.nan)
+                self._latitudes = np.concatenate([self._latitudes, grow])
+                self._longitudes = np.concatenate([self._longitudes, grow])
+                self._cos_latitudes = np.concatenate([self._cos_latitudes, grow])
+        self._latitudes[slot] = math.radians(latitude)
+        self._longitudes[slot] = math.radians(longitude)
+        self._cos_latitudes[slot] = math.cos(self._latitudes[slot])
+        self._slots[facility_id] = slot
+        self._coordinates[facility_id] = coordinates
+
+        # A new facility can only shrink each cell's k-th distance, so cached
+        # candidate sets stay valid once it is added where it may qualify
+        for cache_slot in self._cells_reaching(latitude, longitude):
+            self._cell_candidates[cache_slot] = np.append(self._cell_candidates[cache_slot], slot)
+
+    def _remove(self, facility_id: str) -> None:
+        slot = self._slots.pop(facility_id)
+        latitude, longitude = self._coordinates.pop(facility_id)
+        self._slot_ids[slot] = None
+        self._latitudes[slot] = np.nan
+        self._longitudes[slot] = np.nan
+        self._cos_latitudes[slot] = np.nan
+        self._free_slots.append(slot)
+
+        # Losing a candidate can grow a cell's k-th distance, so those cells
+        # are recomputed on their next lookup
+        for cache_slot in self._cells_reaching(latitude, longitude):
+            if slot in self._cell_candidates[cache_slot]:
+                self._drop_cell(cache_slot)
+
+    def _cells_reaching(self, latitude: float, longitude: float) -> np.ndarray:
+        geometry = self._cell_geometry[:len(self._cell_candidates)]
+        if not len(geometry):
+            return np.empty(0, dtype=np.intp)
+        distances = haversine_km_many(latitude, longitude, geometry[:, 0], geometry[:, 1], geometry[:, 2])
+        return np.flatnonzero(distances <= geometry[:, 3])
+
+    # Cells
+
+    def _cell_key(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        row = math.floor(latitude / self._cell_degrees)
+        # Cells stay ~cell_km wide by widening in longitude away from the equator
+        band_center = (row + 0.5) * self._cell_degrees
+        longitude_degrees = self._cell_degrees / max(math.cos(math.radians(band_center)), 1e-6)
+        return row, math.floor(longitude / longitude_degrees)
+
+    def _cell_bounds(self, key: Tuple[int, int]) -> Tuple[float, float, float, float]:
+        row, column = key
+        band_center = (row + 0.5) * self._cell_degrees
+        longitude_degrees = self._cell_degrees / max(math.cos(math.radians(band_center)), 1e-6)
+        return (
+            row * self._cell_degrees, (row + 1) * self._cell_degrees,
+            column * longitude_degrees, (column + 1) * longitude_degrees
+        )
+
+    def _build_cell(self, key: Tuple[int, int]) -> int:
+        south, north, west, east = self._cell_bounds(key)
+        center_latitude, center_longitude = (south + north) / 2, (west + east) / 2
+        half_diagonal = max(
+            haversine_km(center_latitude, center_longitude, corner_latitude, corner_longitude)
+            for corner_latitude in (south, north) for corner_longitude in (west, east)
+        )
+
+        live = np.flatnonzero(~np.isnan(self._latitudes))
+        distances = haversine_km_many(
+            center_latitude, center_longitude,
+            self._latitudes[live], self._longitudes[live], self._cos_latitudes[live]
+        )
+        if len(live) > self.k:
+            kth_distance = np.partition(distances, self.k - 1)[self.k - 1]
+            radius = kth_distance + 2 * half_diagonal
+        else:
+            radius = np.inf
+        candidates = live[distances <= radius]
+
+        if len(self._cell_candidates) >= self.max_cells:
+            self._clear_cells()
+        cache_slot = len(self._cell_candidates)
+        if cache_slot == len(self._cell_geometry):
+            self._cell_geometry = np.concatenate([self._cell_geometry, np.empty((max(cache_slot, 64), 4))])
+        center_radians = math.radians(center_latitude)
+        self._cell_geometry[cache_slot] = (center_radians, math.radians(center_longitude), math.cos(center_radians), radius)
+        self._cell_keys.append(key)
+        self._cell_candidates.append(candidates)
+        self._cells[key] = cache_slot
+        return cache_slot
+
+    def _drop_cell(self, cache_slot: int) -> None:
+        # Leave the slot in place (positions stay stable) but unreachable;
+        # dead slots count toward max_cells and go when the cache is cleared
+        self._cell_candidates[cache_slot] = np.empty(0, dtype=np.intp)
+        self._cell_geometry[cache_slot, 3] = -1.0
+        del self._cells[self._cell_keys[cache_slot]]
+        self._cell_keys[cache_slot] = None
+
+    def _clear_cells(self) -> None:
+        self._cells = {}
+        self._cell_keys = []
+        self._cell_candidates = []
+        self._cell_geometry = np.empty((0, 4))
+
+    # Lookups
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        limit: Optional[int] = None,
+        radius_km: Optional[float] = None
+    ) -> Tuple[List[str], np.ndarray]:
+        """Ids and distances of the nearest emergency facilities, nearest first.
+
+        ``limit`` may not exceed the grid's ``k``.
+        """
+        limit = self.k if limit is None else min(limit, self.k)
+        with self._lock:
+            key = self._cell_key(latitude, longitude)
+            cache_slot = self._cells.get(key)
+            if cache_slot is None:
+                cache_slot = self._build_cell(key)
+            candidates = self._cell_candidates[cache_slot]
+            distances = haversine_km_many(
+                latitude, longitude,
+                self._latitudes[candidates], self._longitudes[candidates], self._cos_latitudes[candidates]
+            )
+            order = nearest_first(distances, limit)
+            candidates, distances = candidates[order], distances[order]
+            if radius_km is not None:
+                inside = distances <= radius_km
+                candidates, distances = candidates[inside], distances[inside]
+            return [self._slot_ids[slot] for slot in candidates], distances
+
+    def __len__(self) -> int:
+        return len(self._slots)
@@ -1,12 +1,33 @@
-import httpx
 import asyncio
 from typing import Dict, List, Optional, Any
 import os
 from fastapi import HTTPException
 import logging
+from services.gazetteer import gazetteer
+from services.http_client import http_clients, UpstreamError
+from services.response_cache import ResponseCache, CachePolicy
+from services.rxcui_store import rxcui_store
 
 logger = logging.getLogger(__name__)
 
+HOUR = 3600
+
+# Label and concept data change on the order of days, WHO indicators yearly.
+# Stale entries are served while a refresh runs, or if the upstream is down.
+EXTERNAL_CACHE_POLICIES = {
+    "fda": CachePolicy(ttl=6 * HOUR, stale_ttl=24 * HOUR),
+    "rxnorm": CachePolicy(ttl=24 * HOUR, stale_ttl=7 * 24 * HOUR),
+    "who": CachePolicy(ttl=24 * HOUR, stale_ttl=7 * 24 * HOUR)
+}
+EXTERNAL_CACHE_SIZE = int(os.getenv("EXTERNAL_API_CACHE_SIZE", "2048"))
+# Parallel name → RxCUI lookups per interaction check, kept well under the
+# rxnorm connection pool and NLM's 20 requests/second guideline
+RXCUI_CONCURRENCY = 8
+
+def _cache_term(query: str) -> str:
+    """Searches differing only in case or spacing share a cache entry"""
+    return " ".join(query.lower().split())
+
 class ExternalAPIService:
     """Service for integrating with external healthcare APIs"""
     
@@ -15,78 +36,129 @@ class ExternalAPIService:
         self.rxnorm_base_url = "https://rxnav.nlm.nih.gov/REST"
         self.who_base_url = "https://apps.who.int/gho/athena/api"
         self.google_maps_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
+        self.cache = ResponseCache(EXTERNAL_CACHE_POLICIES, max_entries=EXTERNAL_CACHE_SIZE)
         
     async def search_fda_drugs(self, query: str, limit: int = 10) -> List[Dict]:
         """Search FDA drug database"""
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.openfda_base_url}/drug/label.json"
-                params = {
-                    "search": f"openfda.brand_name:{query}",
-                    "limit": limit
-                }
-                
-                response = await client.get(url, params=params, timeout=10.0)
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("results", [])
-                else:
-                    logger.warning(f"FDA API returned status {response.status_code}")
-                    return []
-                    
+            return await self.search_fda_drugs_or_raise(query, limit)
         except Exception as e:
             logger.error(f"FDA API error: {e}")
             return []
+
+    async def search_fda_drugs_or_raise(self, query: str, limit: int = 10) -> List[Dict]:
+        """Cached FDA search that raises on upstream failure instead of
+        returning [], for callers that must tell failures from no matches"""
+        return await self.cache.get_or_fetch(
+            "fda", (_cache_term(query), limit), lambda: self._fetch_fda_drugs(query, limit)
+        )
+
+    async def _fetch_fda_drugs(self, query: str, limit: int) -> List[Dict]:
+        client = http_clients.get("openfda")
+        url = f"{self.openfda_base_url}/drug/label.json"
+        params = {
+            "search": f"openfda.brand_name:{query}",
+            "limit": limit
+        }
+        
+        response = await client.get(url, params=params)
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("results", [])
+        elif response.status_code == 404:
+            # openFDA answers 404 when nothing matches
+            return []
+        else:
+            raise UpstreamError(f"FDA API returned status {response.status_code}")
     
     async def search_rxnorm_drugs(self, query: str) -> List[Dict]:
         """Search RxNorm drug database"""
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.rxnorm_base_url}/drugs.json"
-                params = {"name": query}
-                
-                response = await client.get(url, params=params, timeout=10.0)
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("drugGroup", {}).get("conceptGroup", [])
-                else:
-                    return []
-                    
+            return await self.search_rxnorm_drugs_or_raise(query)
         except Exception as e:
             logger.error(f"RxNorm API error: {e}")
             return []
+
+    async def search_rxnorm_drugs_or_raise(self, query: str) -> List[Dict]:
+        """Cached RxNorm search that raises on upstream failure instead of
+        returning []"""
+        return await self.cache.get_or_fetch(
+            "rxnorm", _cache_term(query), lambda: self._fetch_rxnorm_drugs(query)
+        )
+
+    async def _fetch_rxnorm_drugs(self, query: str) -> List[Dict]:
+        client = http_clients.get("rxnorm")
+        url = f"{self.rxnorm_base_url}/drugs.json"
+        params = {"name": query}
+        
+        response = await client.get(url, params=params)
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("drugGroup", {}).get("conceptGroup", [])
+        else:
+            raise UpstreamError(f"RxNorm API returned status {response.status_code}")
     
     async def get_drug_interactions(self, drug_list: List[str]) -> Dict:
         """Check drug interactions using RxNorm"""
         try:
-            async with httpx.AsyncClient() as client:
-                # Convert drug names to RxCUI codes first
-                rxcui_list = []
-                for drug in drug_list:
-                    url = f"{self.rxnorm_base_url}/rxcui.json"
-                    params = {"name": drug, "search": "2"}
-                    
-                    response = await client.get(url, params=params, timeout=10.0)
-                    if response.status_code == 200:
-                        data = response.json()
-                        rxcui = data.get("idGroup", {}).get("rxnormId", [])
-                        if rxcui:
-                            rxcui_list.append(rxcui[0])
-                
-                # Check interactions
-                if len(rxcui_list) >= 2:
-                    url = f"{self.rxnorm_base_url}/interaction/list.json"
-                    params = {"rxcuis": "+".join(rxcui_list)}
-                    
-                    response = await client.get(url, params=params, timeout=10.0)
-                    if response.status_code == 200:
-                        return response.json()
-                
-                return {"interactionTypeGroup": []}
+            client = http_clients.get("rxnorm")
+            # Convert drug names to RxCUI codes first
+            rxcuis = await self.resolve_rxcuis(drug_list)
+            rxcui_list = list(dict.fromkeys(rxcuis[drug] for drug in drug_list if rxcuis.get(drug)))
+            
+            # Check interactions
+            if len(rxcui_list) >= 2:
+                url = f"{self.rxnorm_base_url}/interaction/list.json"
+                params = {"rxcuis": "+".join(rxcui_list)}
                 
+                response = await client.get(url, params=params)
+                if response.status_code == 200:
+                    return response.json()
+            
+            return {"interactionTypeGroup": []}
+            
         except Exception as e:
             logger.error(f"Drug interaction API error: {e}")
             return {"interactionTypeGroup": []}
+
+    async def resolve_rxcuis(self, drug_list: List[str]) -> Dict[str, Optional[str]]:
+        """Map drug names to RxCUIs, from the persistent store where possible.
+
+        Names the store does not know are resolved concurrently, at most
+        ``RXCUI_CONCURRENCY`` at a time. Names whose lookup failed are left
+        out, so they are retried next time.
+        """
+        # The store may read or write SQLite, so keep it off the event loop
+        known, unresolved = await asyncio.to_thread(rxcui_store.lookup, list(dict.fromkeys(drug_list)))
+        if not unresolved:
+            return known
+        
+        semaphore = asyncio.Semaphore(RXCUI_CONCURRENCY)
+        
+        async def resolve(drug: str) -> Optional[str]:
+            async with semaphore:
+                return await self._fetch_rxcui(drug)
+        
+        results = await asyncio.gather(*(resolve(drug) for drug in unresolved), return_exceptions=True)
+        resolved = {}
+        for drug, result in zip(unresolved, results):
+            if isinstance(result, Exception):
+                logger.warning(f"RxCUI lookup for {drug} failed: {result}")
+            else:
+                resolved[drug] = result
+        await asyncio.to_thread(rxcui_store.save, resolved)
+        return {**known, **resolved}
+
+    async def _fetch_rxcui(self, drug: str) -> Optional[str]:
+        client = http_clients.get("rxnorm")
+        url = f"{self.rxnorm_base_url}/rxcui.json"
+        params = {"name": drug, "search": "2"}
+        
+        response = await client.get(url, params=params)
+        if response.status_code != 200:
+            raise UpstreamError(f"RxNorm API returned status {response.status_code}")
+        rxcui = response.json().get("idGroup", {}).get("rxnormId", [])
+        return rxcui[0] if rxcui else None
     
     async def search_google_places(self, query: str, location: str, place_type: str = "hospital") -> List[Dict]:
         """Search Google Places for healthcare facilities"""
@@ -95,22 +167,22 @@ class ExternalAPIService:
             return []
             
         try:
-            async with httpx.AsyncClient() as client:
-                url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-                params = {
-                    "query": f"{query} {place_type} {location}",
-                    "type": place_type,
-                    "key": self.google_maps_api_key
-                }
+            client = http_clients.get("google")
+            url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+            params = {
+                "query": f"{query} {place_type} {location}",
+                "type": place_type,
+                "key": self.google_maps_api_key
+            }
+            
+            response = await client.get(url, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("results", [])
+            else:
+                logger.warning(f"Google Places API returned status {response.status_code}")
+                return []
                 
-                response = await client.get(url, params=params, timeout=10.0)
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("results", [])
-                else:
-                    logger.warning(f"Google Places API returned status {response.status_code}")
-                    return []
-                    
         except Exception as e:
             logger.error(f"Google Places API error: {e}")
             return []
@@ -121,74 +193,99 @@ class ExternalAPIService:
             return {}
             
         try:
-            async with httpx.AsyncClient() as client:
-                url = "https://maps.googleapis.com/maps/api/place/details/json"
-                params = {
-                    "place_id": place_id,
-                    "fields": "name,formatted_address,formatted_phone_number,website,rating,reviews,opening_hours,geometry",
-                    "key": self.google_maps_api_key
-                }
+            client = http_clients.get("google")
+            url = "https://maps.googleapis.com/maps/api/place/details/json"
+            params = {
+                "place_id": place_id,
+                "fields": "name,formatted_address,formatted_phone_number,website,rating,reviews,opening_hours,geometry",
+                "key": self.google_maps_api_key
+            }
+            
+            response = await client.get(url, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("result", {})
+            else:
+                return {}
                 
-                response = await client.get(url, params=params, timeout=10.0)
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("result", {})
-                else:
-                    return {}
-                    
         except Exception as e:
             logger.error(f"Google Place Details API error: {e}")
             return {}
     
     async def geocode_address(self, address: str) -> Dict:
-        """Convert address to coordinates"""
+        """Convert address to coordinates.
+
+        Bare pincodes and city names are answered from the offline gazetteer;
+        Google is only called for free-form addresses, and the gazetteer's
+        pincode/city match is used if Google is unavailable.
+        """
+        if gazetteer.is_structured(address):
+            return self._gazetteer_result(address)
         if not self.google_maps_api_key:
-            return {}
+            return self._gazetteer_result(address)
             
         try:
-            async with httpx.AsyncClient() as client:
-                url = "https://maps.googleapis.com/maps/api/geocode/json"
-                params = {
-                    "address": address,
-                    "key": self.google_maps_api_key
-                }
-                
-                response = await client.get(url, params=params, timeout=10.0)
-                if response.status_code == 200:
-                    data = response.json()
-                    results = data.get("results", [])
-                    if results:
-                        location = results[0]["geometry"]["location"]
-                        return {
-                            "latitude": location["lat"],
-                            "longitude": location["lng"],
-                            "formatted_address": results[0]["formatted_address"]
-                        }
-                return {}
-                
+            client = http_clients.get("google")
+            url = "https://maps.googleapis.com/maps/api/geocode/json"
+            params = {
+                "address": address,
+                "key": self.google_maps_api_key
+            }
+            
+            response = await client.get(url, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                results = data.get("results", [])
+                if results:
+                    location = results[0]["geometry"]["location"]
+                    return {
+                        "latitude": location["lat"],
+                        "longitude": location["lng"],
+                        "formatted_address": results[0]["formatted_address"]
+                    }
+            return self._gazetteer_result(address)
+            
         except Exception as e:
             logger.error(f"Geocoding API error: {e}")
+            return self._gazetteer_result(address)
+    
+    def _gazetteer_result(self, address: str) -> Dict:
+        place = gazetteer.geocode(address)
+        if not place:
             return {}
+        formatted_address = ", ".join(
+            part for part in (place["city"], place["state"], place.get("pincode")) if part
+        )
+        return {
+            "latitude": place["latitude"],
+            "longitude": place["longitude"],
+            "formatted_address": formatted_address,
+            "precision": place["precision"]
+        }
     
     async def get_who_health_data(self, indicator: str, country: str = "IND") -> Dict:
         """Get health data from WHO Global Health Observatory"""
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.who_base_url}/GHO/{indicator}.json"
-                params = {
-                    "filter": f"COUNTRY:{country}",
-                    "format": "json"
-                }
-                
-                response = await client.get(url, params=params, timeout=10.0)
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    return {}
-                    
+            return await self.cache.get_or_fetch(
+                "who", (indicator, country.upper()), lambda: self._fetch_who_health_data(indicator, country)
+            )
         except Exception as e:
             logger.error(f"WHO API error: {e}")
             return {}
 
+    async def _fetch_who_health_data(self, indicator: str, country: str) -> Dict:
+        client = http_clients.get("who")
+        url = f"{self.who_base_url}/GHO/{indicator}.json"
+        params = {
+            "filter": f"COUNTRY:{country}",
+            "format": "json"
+        }
+        
+        response = await client.get(url, params=params)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise UpstreamError(f"WHO API returned status {response.status_code}")
+
 # Global instance
 external_api_service = ExternalAPIService()
\ No newline at end of file
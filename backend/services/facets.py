@@ -0,0 +1,61 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from collections import Counter
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _facet_values(value: Any) -> List[Any]:
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+def _json_key(value: Any) -> str:
+    # Booleans become "true"/"false" so facet keys survive JSON round-trips
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+class FacetCounter:
+    """Per-field value counts over a catalog, kept current incrementally.
+
+    ``add`` and ``remove`` adjust the counters for one record, so the
+    /categories endpoints read live counts without rescanning the catalog.
+    ``summarize`` counts the same fields over an arbitrary result set, which
+    lets search responses carry their facet counts in one round-trip.
+    """
+
+    def __init__(self, records: Iterable[Optional[Dict[str, Any]]], fields: Sequence[str]):
+        self.fields = list(fields)
+        self._counts: Dict[str, Counter] = {field: Counter() for field in self.fields}
+        for record in records:
+            if record is not None:
+                self.add(record)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        for field in self.fields:
+            self._counts[field].update(_facet_values(record.get(field)))
+
+    def remove(self, record: Dict[str, Any]) -> None:
+        for field in self.fields:
+            counts = self._counts[field]
+            for value in _facet_values(record.get(field)):
+                counts[value] -= 1
+                if counts[value] <= 0:
+                    del counts[value]
+
+    def count(self, field: str, value: Any) -> int:
+        return self._counts[field].get(value, 0)
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        return dict(self._counts[field])
+
+    def summarize(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+        """Facet counts for a result set, most frequent values first"""
+        counts: Dict[str, Counter] = {field: Counter() for field in self.fields}
+        for record in records:
+            for field in self.fields:
+                counts[field].update(_facet_values(record.get(field)))
+        return {
+            field: {_json_key(value): count for value, count in counter.most_common()}
+            for field, counter in counts.items()
+        }
@@ -0,0 +1,291 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import threading
+import logging
+import numpy as np
+from services.catalog_registry import CatalogRegistry, catalog_registry
+from services.geo_index import GeoIndex, haversine_km_matrix, nearest_first
+from services.emergency_grid import EmergencyGrid
+from services.opening_hours import OpeningHoursTable
+
+logger = logging.getLogger(__name__)
+
+FacilityView = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# When filters leave at most this fraction of facilities, computing their
+# distances directly beats walking the tree and discarding most hits
+SELECTIVE_FILTER_FRACTION = 0.1
+
+# Distance-matrix cells computed per block, bounding peak memory (~16MB of
+# float64) however many origins and facilities a request spans
+MATRIX_BLOCK_CELLS = 2_000_000
+
+class FacilityIndex:
+    """One geo index over every facility type.
+
+    ``facilities`` are location-shaped views (hospitals, pharmacies, clinics,
+    Jan Aushadhi stores, ...) and ``sources`` the original catalog records
+    they were built from, aligned by row. A single haversine BallTree answers
+    the radius/nearest part of a query; type, service and emergency filters
+    are boolean masks over rows. Selective filters are applied first and the
+    distances of the surviving rows computed in one vectorized haversine;
+    otherwise the tree's hits are masked. Either way only the returned rows
+    are sorted (argpartition top-k). Opening hours are compiled into interval
+    arrays so "open at minute t" is one more mask. Plain nearest-emergency
+    lookups are answered from the precomputed ``emergency_grid`` when one is
+    attached.
+    """
+
+    def __init__(
+        self,
+        facilities: Sequence[Dict[str, Any]],
+        sources: Sequence[Dict[str, Any]],
+        emergency_grid: Optional[EmergencyGrid] = None
+    ):
+        self.facilities = list(facilities)
+        self.sources = list(sources)
+        self.emergency_grid = emergency_grid
+        self.by_id: Dict[str, int] = {facility["id"]: row for row, facility in enumerate(self.facilities)}
+        self.geo = GeoIndex(self.facilities)
+        self.type_masks = self._masks(lambda facility: [facility["type"]])
+        self.service_masks = self._masks(lambda facility: facility.get("services", []))
+        self.state_masks = self._masks(lambda facility: [facility["state"].lower()] if facility.get("state") else [])
+        self.emergency_mask = np.array(
+            [bool(facility.get("emergency_services")) for facility in self.facilities], dtype=bool
+        )
+        self.opening_hours = OpeningHoursTable(self.facilities)
+        logger.info(
+            f"Built facility index over {len(self.facilities)} facilities "
+            f"({len(self.type_masks)} types, {len(self.service_masks)} services)"
+        )
+
+    def _masks(self, values_of: Callable[[Dict[str, Any]], Iterable[str]]) -> Dict[str, np.ndarray]:
+        masks: Dict[str, np.ndarray] = {}
+        for row, facility in enumerate(self.facilities):
+            for value in values_of(facility):
+                if value not in masks:
+                    masks[value] = np.zeros(len(self.facilities), dtype=bool)
+                masks[value][row] = True
+        return masks
+
+    def _any_of(self, masks: Dict[str, np.ndarray], values: Iterable[str]) -> np.ndarray:
+        keep = np.zeros(len(self.facilities), dtype=bool)
+        for value in values:
+            mask = masks.get(value)
+            if mask is not None:
+                keep |= mask
+        return keep
+
+    def filter_mask(
+        self,
+        types: Optional[Iterable[str]] = None,
+        services: Optional[Iterable[str]] = None,
+        emergency_only: bool = False,
+        open_at_minute: Optional[int] = None,
+        states: Optional[Iterable[str]] = None
+    ) -> Optional[np.ndarray]:
+        """Rows passing every filter, or None when no filter is active.
+
+        ``types``, ``services`` and ``states`` match if the facility has any
+        of the given values (states case-insensitively); ``open_at_minute`` (minute of the week, IST) keeps only
+        facilities known to be open then.
+        """
+        mask: Optional[np.ndarray] = None
+        if types:
+            mask = self._any_of(self.type_masks, types)
+        if services:
+            services_mask = self._any_of(self.service_masks, services)
+            mask = services_mask if mask is None else mask & services_mask
+        if emergency_only:
+            mask = self.emergency_mask.copy() if mask is None else mask & self.emergency_mask
+        if open_at_minute is not None:
+            open_mask = self.opening_hours.open_mask(open_at_minute)
+            mask = open_mask if mask is None else mask & open_mask
+        if states:
+            states_mask = self._any_of(self.state_masks, [state.lower() for state in states])
+            mask = states_mask if mask is None else mask & states_mask
+        return mask
+
+    def query(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        types: Optional[Iterable[str]] = None,
+        services: Optional[Iterable[str]] = None,
+        emergency_only: bool = False,
+        limit: Optional[int] = None,
+        open_at_minute: Optional[int] = None,
+        states: Optional[Iterable[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows within radius_km matching every filter, nearest first"""
+        grid = self.emergency_grid
+        if (emergency_only and not types and not services and open_at_minute is None and not states
+                and grid is not None and limit is not None and limit <= grid.k):
+            facility_ids, distances = grid.nearest(latitude, longitude, limit, radius_km)
+            return np.array([self.by_id[facility_id] for facility_id in facility_ids], dtype=np.intp), distances
+
+        mask = self.filter_mask(types, services, emergency_only, open_at_minute, states)
+        if mask is not None and np.count_nonzero(mask) <= SELECTIVE_FILTER_FRACTION * len(self.facilities):
+            rows = np.flatnonzero(mask)
+            distances = self.geo.distances_to(latitude, longitude, rows)
+            inside = distances <= radius_km
+            rows, distances = rows[inside], distances[inside]
+        else:
+            rows, distances = self.geo.within(latitude, longitude, radius_km, sort=False)
+            if mask is not None:
+                keep = mask[rows]
+                rows, distances = rows[keep], distances[keep]
+
+        order = nearest_first(distances, limit)
+        return rows[order], distances[order]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        types: Optional[Iterable[str]] = None,
+        open_at_minute: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The k nearest rows of the given types, nearest first"""
+        mask = self.filter_mask(types, open_at_minute=open_at_minute)
+        if mask is not None and np.count_nonzero(mask) <= SELECTIVE_FILTER_FRACTION * len(self.facilities):
+            rows = np.flatnonzero(mask)
+            distances = self.geo.distances_to(latitude, longitude, rows)
+            order = nearest_first(distances, k)
+            return rows[order], distances[order]
+
+        fetch = k
+        while True:
+            rows, distances = self.geo.nearest(latitude, longitude, fetch)
+            if mask is not None:
+                keep = mask[rows]
+                rows, distances = rows[keep], distances[keep]
+            # Widen the search until k rows survive the filters
+            if len(rows) >= k or fetch >= len(self.facilities):
+                return rows[:k], distances[:k]
+            fetch *= 4
+
+    def distance_rows(
+        self,
+        origins: np.ndarray,
+        rows: np.ndarray,
+        k: Optional[int] = None,
+        radius_km: Optional[float] = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Per-origin (rows, distances) over an M×N distance matrix.
+
+        ``origins`` is an (M, 2) array of latitude/longitude degrees and
+        ``rows`` the N candidate facility rows. The matrix is computed in
+        blocks of origins with one vectorized haversine each. With ``k`` every
+        origin yields its k nearest rows, nearest first (argpartition along
+        the block); without it, all N rows in the given order. Rows farther
+        than ``radius_km`` are dropped. A k-nearest query over every facility
+        goes to the tree in one batched call instead.
+        """
+        if k is not None and len(rows) == len(self.facilities):
+            nearest_rows, nearest_distances = self.geo.nearest_many(origins, k)
+            for origin_rows, origin_distances in zip(nearest_rows, nearest_distances):
+                if radius_km is not None:
+                    inside = origin_distances <= radius_km
+                    origin_rows, origin_distances = origin_rows[inside], origin_distances[inside]
+                yield origin_rows, origin_distances
+            return
+
+        latitudes = self.geo.latitudes[rows]
+        longitudes = self.geo.longitudes[rows]
+        cos_latitudes = self.geo.cos_latitudes[rows]
+        block_size = max(1, MATRIX_BLOCK_CELLS // max(1, len(rows)))
+
+        for start in range(0, len(origins), block_size):
+            block = origins[start:start + block_size]
+            distances = haversine_km_matrix(block[:, 0], block[:, 1], latitudes, longitudes, cos_latitudes)
+            if radius_km is not None:
+                distances[distances > radius_km] = np.inf
+
+            if k is not None and k < len(rows):
+                columns = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                selected = np.take_along_axis(distances, columns, axis=1)
+                order = np.argsort(selected, axis=1, kind="stable")
+                columns = np.take_along_axis(columns, order, axis=1)
+            elif k is not None:
+                columns = np.argsort(distances, axis=1, kind="stable")
+            else:
+                columns = np.broadcast_to(np.arange(len(rows)), distances.shape)
+
+            for origin_columns, origin_distances in zip(columns, distances):
+                origin_distances = origin_distances[origin_columns]
+                finite = np.isfinite(origin_distances)
+                yield rows[origin_columns[finite]], origin_distances[finite]
+
+    def rows_for_ids(self, facility_ids: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+        """Rows of the given facility ids, plus any ids that are unknown"""
+        rows, missing = [], []
+        for facility_id in facility_ids:
+            row = self.by_id.get(facility_id)
+            if row is None:
+                missing.append(facility_id)
+            else:
+                rows.append(row)
+        return np.array(rows, dtype=np.intp), missing
+
+    def get(self, facility_id: str) -> Optional[Dict[str, Any]]:
+        row = self.by_id.get(facility_id)
+        return self.facilities[row] if row is not None else None
+
+    def __len__(self) -> int:
+        return len(self.facilities)
+
+class FacilityDirectory:
+    """Keeps a FacilityIndex in step with the catalogs it is built from.
+
+    Each route module registers its catalog with a function turning a record
+    into a location-shaped view. The index is rebuilt lazily on the first
+    query after any source catalog is reloaded or changed in place, then
+    swapped in with a single assignment like the registry's catalogs. The
+    emergency grid is kept across rebuilds and synced incrementally.
+    """
+
+    def __init__(self, registry: CatalogRegistry):
+        self._registry = registry
+        self._sources: Dict[str, FacilityView] = {}
+        self._index: Optional[FacilityIndex] = None
+        self._built_from: Tuple = ()
+        self._emergency_grid = EmergencyGrid()
+        self._lock = threading.Lock()
+
+    def register_source(self, catalog_name: str, to_facility: FacilityView) -> None:
+        with self._lock:
+            self._sources[catalog_name] = to_facility
+            self._index = None
+
+    def _state(self) -> Tuple:
+        catalogs = [self._registry.get(name) for name in self._sources]
+        return tuple((catalog, catalog.version) for catalog in catalogs)
+
+    def get(self) -> FacilityIndex:
+        state = self._state()
+        index = self._index
+        if index is not None and state == self._built_from:
+            return index
+        with self._lock:
+            state = self._state()
+            if self._index is None or state != self._built_from:
+                facilities: List[Dict[str, Any]] = []
+                sources: List[Dict[str, Any]] = []
+                for name, to_facility in self._sources.items():
+                    for record in self._registry.get(name).live_records():
+                        facilities.append(to_facility(record))
+                        sources.append(record)
+                # The grid outlives each index; only changed emergency
+                # facilities touch its cells
+                self._emergency_grid.sync({
+                    facility["id"]: (facility["latitude"], facility["longitude"])
+                    for facility in facilities if facility.get("emergency_services")
+                })
+                self._index = FacilityIndex(facilities, sources, self._emergency_grid)
+                self._built_from = state
+            return self._index
+
+# Global instance
+facility_directory = FacilityDirectory(catalog_registry)
@@ -0,0 +1,125 @@
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import re
+import logging
+from services.interactions import interaction_graph
+
+logger = logging.getLogger(__name__)
+
+# RxNorm clinical/branded drug names: "acetaminophen 325 MG / oxycodone
+# hydrochloride 5 MG Oral Tablet [Percocet]"
+RXNORM_BRAND = re.compile(r"\[(.+?)\]\s*$")
+RXNORM_STRENGTH = re.compile(r"\s\d.*$")
+# Concept types naming a single drug product or ingredient; packs are skipped
+RXNORM_DRUG_TYPES = {"IN", "MIN", "SCD", "SBD"}
+
+def generic_key(names: Iterable[str]) -> str:
+    """Normalized generic name: synonym-resolved ingredients, sorted, joined.
+
+    "Paracetamol", "ACETAMINOPHEN" and "acetaminophen 500 MG Oral Tablet"
+    all become "paracetamol".
+    """
+    ingredients = set()
+    for name in names:
+        ingredients |= interaction_graph.ingredients(name)
+    return " + ".join(sorted(ingredients))
+
+def fda_entries(results: List[Dict]) -> List[Dict[str, Any]]:
+    """openFDA drug label results as merge entries"""
+    entries = []
+    for label in results:
+        openfda = label.get("openfda", {})
+        generic_names = openfda.get("generic_name", [])
+        if not generic_names:
+            continue
+        entries.append({
+            "key": generic_key(generic_names),
+            "generic_name": generic_names[0].title(),
+            "brand_names": [name.title() for name in openfda.get("brand_name", [])],
+            "manufacturers": openfda.get("manufacturer_name", []),
+            "rxcuis": openfda.get("rxcui", [])
+        })
+    return entries
+
+def rxnorm_entries(concept_groups: List[Dict]) -> List[Dict[str, Any]]:
+    """RxNorm drugs.json concept groups as merge entries"""
+    entries = []
+    for group in concept_groups:
+        if group.get("tty") not in RXNORM_DRUG_TYPES:
+            continue
+        for concept in group.get("conceptProperties", []):
+            name = concept.get("name", "")
+            brand = RXNORM_BRAND.search(name)
+            components = [
+                RXNORM_STRENGTH.sub("", component).strip()
+                for component in RXNORM_BRAND.sub("", name).split(" / ")
+            ]
+            key = generic_key(components)
+            if not key:
+                continue
+            entries.append({
+                "key": key,
+                "generic_name": " / ".join(components),
+                "brand_names": [brand.group(1)] if brand else [],
+                "manufacturers": [],
+                "rxcuis": [concept["rxcui"]] if concept.get("rxcui") else []
+            })
+    return entries
+
+class FederatedResults:
+    """Results from several sources merged by normalized generic name.
+
+    The first source to report a generic name fixes its position and
+    display name; later sources add themselves to ``sources`` and union
+    their brand names, manufacturers and RxCUIs into the same result.
+    """
+
+    def __init__(self):
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, source: str, entry: Dict[str, Any], medicine: Optional[Dict] = None) -> None:
+        result = self._results.get(entry["key"])
+        if result is None:
+            result = self._results[entry["key"]] = {
+                "generic_name": entry["generic_name"],
+                "sources": [],
+                "medicine": None,
+                "brand_names": [],
+                "manufacturers": [],
+                "rxcuis": []
+            }
+        if source not in result["sources"]:
+            result["sources"].append(source)
+        if medicine is not None and result["medicine"] is None:
+            result["medicine"] = medicine
+        for field in ("brand_names", "manufacturers", "rxcuis"):
+            for value in entry[field]:
+                if value not in result[field]:
+                    result[field].append(value)
+
+    def results(self, limit: int) -> List[Dict[str, Any]]:
+        return list(self._results.values())[:limit]
+
+async def gather_within(calls: Dict[str, Awaitable], timeout: float) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Run calls concurrently for at most ``timeout`` seconds.
+
+    Returns (results, statuses) keyed by call name, with status "ok",
+    "error" or "timeout". Calls still running at the deadline are
+    cancelled; the shared upstream fetch behind a cached lookup keeps going
+    and fills the cache for the next search.
+    """
+    tasks = {name: asyncio.ensure_future(call) for name, call in calls.items()}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=max(timeout, 0))
+    results, statuses = {}, {}
+    for name, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            statuses[name] = "timeout"
+        elif task.exception() is not None:
+            logger.warning(f"Federated search source {name} failed: {task.exception()}")
+            statuses[name] = "error"
+        else:
+            results[name] = task.result()
+            statuses[name] = "ok"
+    return results, statuses
@@ -0,0 +1,364 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Any
+from array import array
+from itertools import combinations
+import re
+import unicodedata
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Devanagari -> Latin, enough to turn Hindi spellings of drug names into
+# something the phonetic folding below can line up with the English catalog
+DEVANAGARI_VOWELS = {
+    "अ": "a", "आ": "aa", "इ": "i", "ई": "ee", "उ": "u", "ऊ": "oo", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o", "ऍ": "e"
+}
+DEVANAGARI_MATRAS = {
+    "ा": "aa", "ि": "i", "ी": "ee", "ु": "u", "ू": "oo", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o", "ॅ": "e"
+}
+DEVANAGARI_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "f", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v", "श": "sh",
+    "ष": "sh", "स": "s", "ह": "h", "ळ": "l",
+    "क़": "q", "ख़": "kh", "ग़": "g", "ज़": "z", "ड़": "d", "ढ़": "dh", "फ़": "f"
+}
+DEVANAGARI_SIGNS = {"ं": "n", "ँ": "n", "ः": "h"}
+VIRAMA = "्"
+NUKTA = "़"
+
+# Ordered phonetic folding rules applied after transliteration. They collapse
+# the spelling variants users actually type (amoxycillin, paracitamol,
+# sefixime) onto one key; order matters, e.g. "ph" must fold before "h" drops.
+PHONETIC_RULES = [
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"ck"), "k"),
+    (re.compile(r"q"), "k"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"c(?=[eiy])"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"([bdgkt])h"), r"\1"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"y"), "i"),
+    (re.compile(r"ee|e"), "i"),
+    (re.compile(r"oo|o"), "u"),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+def transliterate(text: str) -> str:
+    """Transliterate Devanagari characters to Latin; other text passes through"""
+    output = []
+    pending_consonant = False
+
+    for char in unicodedata.normalize("NFC", text):
+        if char in DEVANAGARI_CONSONANTS:
+            if pending_consonant:
+                output.append("a")
+            output.append(DEVANAGARI_CONSONANTS[char])
+            pending_consonant = True
+            continue
+
+        if char == NUKTA:
+            continue
+        if char in DEVANAGARI_MATRAS:
+            output.append(DEVANAGARI_MATRAS[char])
+        elif char == VIRAMA:
+            pass
+        elif char in DEVANAGARI_VOWELS:
+            if pending_consonant:
+                output.append("a")
+            output.append(DEVANAGARI_VOWELS[char])
+        elif char in DEVANAGARI_SIGNS:
+            if pending_consonant:
+                output.append("a")
+            output.append(DEVANAGARI_SIGNS[char])
+        else:
+            # Anything else ends the word, and a word-final inherent vowel is
+            # silent in Hindi (schwa deletion), so no "a" is emitted here
+            output.append(char)
+        pending_consonant = False
+
+    return "".join(output)
+
+def phonetic_key(text: str) -> str:
+    """Normalize a (possibly Hindi or Hinglish) drug name to a matching key"""
+    key = NON_ALPHANUMERIC.sub("", transliterate(text).lower())
+    for pattern, replacement in PHONETIC_RULES:
+        key = pattern.sub(replacement, key)
+    return key
+
+def max_edits_for(key: str) -> int:
+    """Edit budget grows with key length so short queries stay precise"""
+    if len(key) <= 4:
+        return 0
+    if len(key) <= 7:
+        return 1
+    return 2
+
+def bounded_edit_distance(source: str, target: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or max_distance + 1 once exceeded.
+
+    Common prefixes and suffixes are stripped first. The rest uses Hyyrö's
+    bit-parallel algorithm: each column of the DP matrix is a pair of
+    bit vectors, so a target character costs a handful of integer
+    operations instead of a Python loop over the band. It stops as soon as
+    the characters left cannot bring the distance back under the bound.
+    """
+    if source == target:
+        return 0
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    start = 0
+    shortest = min(len(source), len(target))
+    while start < shortest and source[start] == target[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and source[-1 - end] == target[-1 - end]:
+        end += 1
+    source = source[start:len(source) - end]
+    target = target[start:len(target) - end]
+    if not source or not target:
+        return max(len(source), len(target))
+
+    over = max_distance + 1
+    full = (1 << len(source)) - 1
+    last = 1 << (len(source) - 1)
+    match_masks: Dict[str, int] = {}
+    for index, char in enumerate(source):
+        match_masks[char] = match_masks.get(char, 0) | (1 << index)
+
+    # Vertical deltas (+1 / -1) between adjacent rows of the current column
+    positive, negative = full, 0
+    previous_diagonal, previous_match = 0, 0
+    distance = len(source)
+    remaining = len(target)
+    for char in target:
+        match = match_masks.get(char, 0)
+        transposition = (((~previous_diagonal) & match) << 1) & previous_match
+        diagonal = (((match & positive) + positive) ^ positive) | match | negative | transposition
+        horizontal_positive = negative | (~(diagonal | positive) & full)
+        horizontal_negative = diagonal & positive
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(diagonal | horizontal_positive) & full)
+        negative = horizontal_positive & diagonal
+        previous_diagonal, previous_match = diagonal, match
+        remaining -= 1
+        if distance - remaining > max_distance:
+            return over
+
+    return distance if distance <= max_distance else over
+
+def _deletes(fragment: str, max_distance: int) -> Set[str]:
+    """All strings reachable from fragment by up to max_distance deletions,
+    never shorter than one character"""
+    shortest = max(len(fragment) - max_distance, min(len(fragment), 1))
+    variants = {fragment}
+    for length in range(shortest, len(fragment)):
+        variants.update(map("".join, combinations(fragment, length)))
+    return variants
+
+class _DeletionTable:
+    """Multimap from deletion variant to key id, packed into numpy arrays.
+
+    Variants are stored by 64-bit string hash in CSR form: sorted unique
+    hashes, and offsets into a flat array of key ids. That costs about 16
+    bytes per variant instead of a Python string, list and dict slot each.
+    A lookup is one vectorized ``searchsorted``. Hash collisions only add
+    candidates, and the edit-distance check discards them anyway. Variants
+    added after the build wait in a small dict and are merged in bulk.
+    """
+
+    MERGE_THRESHOLD = 4096
+
+    def __init__(self):
+        self._hashes = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._ids = np.empty(0, dtype=np.int32)
+        self._pending_hashes = array("q")
+        self._pending_ids = array("i")
+        self._recent: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids) + len(self._pending_ids)
+
+    def add(self, variants: Iterable[str], key_id: int, bulk: bool = False) -> None:
+        for variant in variants:
+            variant_hash = hash(variant)
+            self._pending_hashes.append(variant_hash)
+            self._pending_ids.append(key_id)
+            if not bulk:
+                self._recent.setdefault(variant_hash, []).append(key_id)
+        if not bulk and len(self._pending_hashes) > self.MERGE_THRESHOLD:
+            self.merge()
+
+    def merge(self) -> None:
+        """Fold pending variants into the packed arrays"""
+        if not self._pending_hashes:
+            return
+        hashes = np.concatenate([
+            np.repeat(self._hashes, np.diff(self._offsets)),
+            np.frombuffer(self._pending_hashes, dtype=np.int64)
+        ])
+        ids = np.concatenate([self._ids, np.frombuffer(self._pending_ids, dtype=np.int32)])
+        order = np.argsort(hashes, kind="stable")
+        hashes, self._ids = hashes[order], ids[order]
+        starts = np.flatnonzero(np.r_[True, hashes[1:] != hashes[:-1]])
+        self._hashes = hashes[starts]
+        self._offsets = np.append(starts, len(hashes))
+        self._pending_hashes, self._pending_ids = array("q"), array("i")
+        self._recent = {}
+
+    def lookup(self, variants: Iterable[str]) -> np.ndarray:
+        """Ids of every key sharing at least one variant (may repeat)"""
+        # Sorted probes walk the table in order, which is far kinder to the cache
+        query = np.array(sorted({hash(variant) for variant in variants}), dtype=np.int64)
+        slots = np.searchsorted(self._hashes, query)
+        slots[slots == len(self._hashes)] = 0
+        hit = self._hashes[slots] == query if len(self._hashes) else np.zeros(len(query), dtype=bool)
+        starts = self._offsets[slots[hit]]
+        lengths = self._offsets[slots[hit] + 1] - starts
+        # Gather every hit's id run in one shot: run start repeated per
+        # element, plus the element's offset within its run
+        run_offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        found = self._ids[np.repeat(starts, lengths) + run_offsets]
+        if self._recent:
+            recent = [key_id for variant_hash in query.tolist() for key_id in self._recent.get(variant_hash, ())]
+            if recent:
+                found = np.concatenate([found, np.array(recent, dtype=np.int32)])
+        return found
+
+class FuzzyMatcher:
+    """Typo-tolerant name lookup using symmetric deletion over phonetic keys.
+
+    Each name is reduced to a phonetic key, then every variant of the key's
+    prefix and suffix with up to ``max_distance`` deletions is mapped to the
+    keys it came from (in packed ``_DeletionTable``s). A query generates the same deletion variants, so
+    candidate lookup is a few dozen dictionary probes regardless of catalog
+    size. Keys must be reachable from both ends, which keeps the candidate set
+    small even when many names share a stem, and the survivors are confirmed
+    with a banded edit distance on the full key.
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[Dict[str, Any]],
+        fields: Sequence[str],
+        max_distance: int = 2,
+        prefix_length: int = 8
+    ):
+        self.fields = list(fields)
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.documents: List[Optional[Dict[str, Any]]] = []
+        self._key_positions: Dict[str, Set[int]] = {}
+        self._keys: List[str] = []
+        self._prefix_deletes = _DeletionTable()
+        self._suffix_deletes = _DeletionTable()
+
+        for document in documents:
+            if document is None:
+                # Keep positions aligned with a catalog that has removed slots
+                self.documents.append(None)
+            else:
+                self._add(document, bulk=True)
+        self._prefix_deletes.merge()
+        self._suffix_deletes.merge()
+
+        logger.info(
+            f"Built fuzzy matcher over {len(self._key_positions)} keys "
+            f"({len(self._prefix_deletes) + len(self._suffix_deletes)} deletion variants)"
+        )
+
+    def _document_keys(self, document: Dict[str, Any]) -> Set[str]:
+        keys = set()
+        for field in self.fields:
+            value = document.get(field)
+            if value:
+                key = phonetic_key(str(value))
+                if key:
+                    keys.add(key)
+        return keys
+
+    def add(self, document: Dict[str, Any]) -> int:
+        return self._add(document, bulk=False)
+
+    def _add(self, document: Dict[str, Any], bulk: bool) -> int:
+        position = len(self.documents)
+        self.documents.append(document)
+        for key in self._document_keys(document):
+            positions = self._key_positions.get(key)
+            if positions is None:
+                self._key_positions[key] = {position}
+                key_id = len(self._keys)
+                self._keys.append(key)
+                self._prefix_deletes.add(_deletes(key[:self.prefix_length], self.max_distance), key_id, bulk)
+                self._suffix_deletes.add(_deletes(key[-self.prefix_length:], self.max_distance), key_id, bulk)
+            else:
+                positions.add(position)
+        return position
+
+    def remove(self, position: int) -> None:
+        document = self.documents[position]
+        if document is None:
+            return
+        for key in self._document_keys(document):
+            positions = self._key_positions.get(key)
+            if positions is None:
+                continue
+            positions.discard(position)
+            if not positions:
+                # Stale deletion entries are harmless: lookups skip unknown keys
+                del self._key_positions[key]
+        self.documents[position] = None
+
+    def lookup(self, query: str, max_distance: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Return (position, distance) pairs ordered by distance then position"""
+        key = phonetic_key(query)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = max_edits_for(key)
+        max_distance = min(max_distance, self.max_distance)
+
+        reachable = np.zeros(len(self._keys), dtype=bool)
+        reachable[self._prefix_deletes.lookup(_deletes(key[:self.prefix_length], max_distance))] = True
+        suffix_ids = self._suffix_deletes.lookup(_deletes(key[-self.prefix_length:], max_distance))
+        candidate_ids = set(suffix_ids[reachable[suffix_ids]].tolist())
+
+        best: Dict[int, int] = {}
+        for candidate_id in candidate_ids:
+            candidate = self._keys[candidate_id]
+            positions = self._key_positions.get(candidate)
+            if not positions:
+                continue
+            distance = bounded_edit_distance(key, candidate, max_distance)
+            if distance > max_distance:
+                continue
+            for position in positions:
+                if distance < best.get(position, max_distance + 1):
+                    best[position] = distance
+
+        return sorted(best.items(), key=lambda item: (item[1], item[0]))
+
+    def search(self, query: str, allowed: Optional[Iterable[int]] = None,
+               max_distance: Optional[int] = None) -> List[int]:
+        """Positions of fuzzy matches, optionally restricted to an allowed set"""
+        matches = self.lookup(query, max_distance)
+        if allowed is not None:
+            allowed = allowed if isinstance(allowed, (set, frozenset)) else set(allowed)
+            matches = [(position, distance) for position, distance in matches if position in allowed]
+        return [position for position, _ in matches]
@@ -0,0 +1,127 @@
+from typing import Any, Dict, Iterable, List, Optional
+import csv
+import os
+import re
+import logging
+import numpy as np
+from services.geo_index import haversine_km
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+# The bundled files cover the metros the app serves today; point these at the
+# full India Post pincode directory / census town list for nationwide coverage
+PINCODES_PATH = os.getenv("GAZETTEER_PINCODES_PATH", os.path.join(DATA_DIR, "pincodes.csv"))
+CITIES_PATH = os.getenv("GAZETTEER_CITIES_PATH", os.path.join(DATA_DIR, "cities.csv"))
+
+PINCODE_PATTERN = re.compile(r"\b([1-9]\d{2})\s?(\d{3})\b")
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().replace(".", " ").split())
+
+class Gazetteer:
+    """Offline pincode and city geocoding over array-backed tables.
+
+    Pincodes are kept as a sorted int32 array with centroid arrays alongside,
+    so a lookup is a binary search (``np.searchsorted``) rather than a dict of
+    per-pincode objects. Cities carry a centroid and bounding box and are
+    reached by name or alias, optionally narrowed by state.
+    """
+
+    def __init__(self, pincode_rows: Iterable[Dict[str, str]], city_rows: Iterable[Dict[str, str]]):
+        pincode_rows = sorted(pincode_rows, key=lambda row: int(row["pincode"]))
+        self.pincodes = np.array([int(row["pincode"]) for row in pincode_rows], dtype=np.int32)
+        self.pincode_coordinates = np.array(
+            [[float(row["latitude"]), float(row["longitude"])] for row in pincode_rows], dtype=np.float64
+        ).reshape(-1, 2)
+        self.pincode_cities = [row["city"] for row in pincode_rows]
+        self.pincode_districts = [row["district"] for row in pincode_rows]
+        self.pincode_states = [row["state"] for row in pincode_rows]
+
+        city_rows = list(city_rows)
+        self.city_names = [row["city"] for row in city_rows]
+        self.city_states = [row["state"] for row in city_rows]
+        self.city_coordinates = np.array(
+            [[float(row["latitude"]), float(row["longitude"])] for row in city_rows], dtype=np.float64
+        ).reshape(-1, 2)
+        # Columns: south, west, north, east
+        self.city_bounds = np.array(
+            [[float(row[edge]) for edge in ("south", "west", "north", "east")] for row in city_rows], dtype=np.float64
+        ).reshape(-1, 4)
+        self._cities_by_name: Dict[str, List[int]] = {}
+        for row_index, row in enumerate(city_rows):
+            aliases = [alias for alias in (row.get("aliases") or "").split("|") if alias]
+            for name in [row["city"]] + aliases:
+                self._cities_by_name.setdefault(_normalize(name), []).append(row_index)
+
+        logger.info(f"Loaded gazetteer with {len(self.pincodes)} pincodes and {len(self.city_names)} cities")
+
+    @classmethod
+    def from_files(cls, pincodes_path: str = PINCODES_PATH, cities_path: str = CITIES_PATH) -> "Gazetteer":
+        with open(pincodes_path, newline="", encoding="utf-8") as pincodes, \
+                open(cities_path, newline="", encoding="utf-8") as cities:
+            return cls(csv.DictReader(pincodes), csv.DictReader(cities))
+
+    def lookup_pincode(self, pincode: str) -> Optional[Dict[str, Any]]:
+        """Centroid and administrative names of a six-digit pincode"""
+        digits = pincode.replace(" ", "")
+        if not digits.isdigit():
+            return None
+        code = int(digits)
+        row = int(np.searchsorted(self.pincodes, code))
+        if row >= len(self.pincodes) or self.pincodes[row] != code:
+            return None
+        latitude, longitude = self.pincode_coordinates[row]
+        return {
+            "pincode": digits,
+            "latitude": float(latitude),
+            "longitude": float(longitude),
+            "city": self.pincode_cities[row],
+            "district": self.pincode_districts[row],
+            "state": self.pincode_states[row]
+        }
+
+    def lookup_city(self, name: str, state: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Centroid, bounding box and covering radius of a city or its alias"""
+        rows = self._cities_by_name.get(_normalize(name), [])
+        if state:
+            rows = [row for row in rows if self.city_states[row].lower() == state.lower()]
+        if not rows:
+            return None
+        row = rows[0]
+        latitude, longitude = self.city_coordinates[row]
+        south, west, north, east = self.city_bounds[row]
+        return {
+            "city": self.city_names[row],
+            "state": self.city_states[row],
+            "latitude": float(latitude),
+            "longitude": float(longitude),
+            "bounds": {"south": float(south), "west": float(west), "north": float(north), "east": float(east)},
+            # Farthest bounding-box corner, so a radius search covers the whole city
+            "radius_km": max(
+                haversine_km(latitude, longitude, corner_latitude, corner_longitude)
+                for corner_latitude in (south, north) for corner_longitude in (west, east)
+            )
+        }
+
+    def geocode(self, text: str) -> Optional[Dict[str, Any]]:
+        """Best-effort coordinates for an address from its pincode or city name"""
+        match = PINCODE_PATTERN.search(text)
+        if match:
+            place = self.lookup_pincode(match.group(1) + match.group(2))
+            if place:
+                return {**place, "precision": "pincode"}
+        # Addresses end with the locality, so try the last parts first
+        for part in reversed(re.split(r"[,\n]", text)):
+            place = self.lookup_city(part.strip()) if part.strip() else None
+            if place:
+                return {**place, "precision": "city"}
+        return None
+
+    def is_structured(self, text: str) -> bool:
+        """Whether the text is just a pincode or a known city name"""
+        stripped = text.strip()
+        return bool(PINCODE_PATTERN.fullmatch(stripped)) or _normalize(stripped) in self._cities_by_name
+
+# Global instance
+gazetteer = Gazetteer.from_files()
@@ -0,0 +1,146 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+import math
+import logging
+import numpy as np
+from sklearn.neighbors import BallTree
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def haversine_km_many(
+    latitude: float,
+    longitude: float,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    cos_latitudes: np.ndarray
+) -> np.ndarray:
+    """Vectorized great-circle distances from one point to arrays of points.
+
+    ``latitudes``/``longitudes`` are in radians and ``cos_latitudes`` is their
+    precomputed cosine, so a query is a handful of whole-array operations.
+    """
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    a = np.sin((latitudes - latitude) / 2) ** 2 + math.cos(latitude) * cos_latitudes * np.sin((longitudes - longitude) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+def haversine_km_matrix(
+    origin_latitudes: np.ndarray,
+    origin_longitudes: np.ndarray,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    cos_latitudes: np.ndarray
+) -> np.ndarray:
+    """M×N great-circle distances from M origins (degrees) to N points (radians)"""
+    origin_latitudes = np.radians(origin_latitudes)[:, None]
+    origin_longitudes = np.radians(origin_longitudes)[:, None]
+    a = (
+        np.sin((latitudes - origin_latitudes) / 2) ** 2
+        + np.cos(origin_latitudes) * cos_latitudes * np.sin((longitudes - origin_longitudes) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+def nearest_first(distances: np.ndarray, limit: Optional[int] = None) -> np.ndarray:
+    """Indices of the ``limit`` smallest distances in ascending order.
+
+    argpartition selects the winners in linear time, so only ``limit``
+    values are ever sorted however many candidates there are.
+    """
+    if limit is not None and limit < len(distances):
+        if limit <= 0:
+            return np.empty(0, dtype=np.intp)
+        selected = np.argpartition(distances, limit - 1)[:limit]
+        return selected[np.argsort(distances[selected], kind="stable")]
+    return np.argsort(distances, kind="stable")
+
+class GeoIndex:
+    """Haversine BallTree over record coordinates.
+
+    Radius and k-nearest queries run in logarithmic time and return catalog
+    positions with great-circle distances in kilometers. The tree is
+    immutable, so a catalog rebuilds it when records change; empty (removed)
+    slots are simply left out of the tree. Coordinates are also kept as
+    contiguous float64 arrays by position for vectorized distances to an
+    arbitrary subset of records.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[Optional[Dict[str, Any]]],
+        latitude_field: str = "latitude",
+        longitude_field: str = "longitude"
+    ):
+        self._positions = np.array(
+            [position for position, record in enumerate(records) if record is not None],
+            dtype=np.intp
+        )
+        coordinates = np.array(
+            [[records[position][latitude_field], records[position][longitude_field]] for position in self._positions],
+            dtype=np.float64
+        ).reshape(-1, 2)
+        radians = np.radians(coordinates)
+        self._tree = BallTree(radians, metric="haversine") if len(coordinates) else None
+
+        self.latitudes = np.full(len(records), np.nan)
+        self.longitudes = np.full(len(records), np.nan)
+        self.latitudes[self._positions] = radians[:, 0]
+        self.longitudes[self._positions] = radians[:, 1]
+        self.cos_latitudes = np.cos(self.latitudes)
+        logger.info(f"Built geo index over {len(self._positions)} records")
+
+    @staticmethod
+    def _point(latitude: float, longitude: float) -> np.ndarray:
+        return np.radians([[latitude, longitude]])
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        sort: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions within radius_km of the point and their distances.
+
+        Nearest first unless ``sort`` is False, for callers that filter
+        further and select their own top-k.
+        """
+        if self._tree is None:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        rows, distances = self._tree.query_radius(
+            self._point(latitude, longitude), r=radius_km / EARTH_RADIUS_KM,
+            return_distance=True, sort_results=sort
+        )
+        return self._positions[rows[0]], distances[0] * EARTH_RADIUS_KM
+
+    def nearest_many(self, origins: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(M, k) positions and distances of the k nearest records to each of
+        M latitude/longitude origins (degrees), nearest first"""
+        k = min(k, len(self._positions))
+        if k <= 0:
+            return np.empty((len(origins), 0), dtype=np.intp), np.empty((len(origins), 0))
+        distances, rows = self._tree.query(np.radians(origins), k=k)
+        return self._positions[rows], distances * EARTH_RADIUS_KM
+
+    def distances_to(self, latitude: float, longitude: float, positions: np.ndarray) -> np.ndarray:
+        """Vectorized great-circle distances from the point to the given positions"""
+        return haversine_km_many(
+            latitude, longitude,
+            self.latitudes[positions], self.longitudes[positions], self.cos_latitudes[positions]
+        )
+
+    def nearest(self, latitude: float, longitude: float, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The k nearest positions and their distances, nearest first"""
+        k = min(k, len(self._positions))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        distances, rows = self._tree.query(self._point(latitude, longitude), k=k)
+        return self._positions[rows[0]], distances[0] * EARTH_RADIUS_KM
+
+    def __len__(self) -> int:
+        return len(self._positions)
@@ -0,0 +1,131 @@
+from typing import Any, Dict, NamedTuple, Optional, Union
+import os
+import ssl
+import logging
+import httpx
+from services.resilience import BreakerConfig, CircuitBreaker, HedgeConfig, LatencyTracker, ResilientTransport
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 multiplexes requests over one connection per host but needs the
+# optional ``h2`` package (pip install "httpx[http2]")
+HTTP2_ENABLED = os.getenv("HTTP_CLIENT_HTTP2", "false").lower() == "true"
+# Hedged GETs trade a little extra upstream load for a shorter latency tail
+HEDGING_ENABLED = os.getenv("HTTP_CLIENT_HEDGING", "false").lower() == "true"
+
+class UpstreamConfig(NamedTuple):
+    timeout: float                    # Seconds for the whole read/write/pool wait
+    connect_timeout: float = 5.0
+    max_connections: int = 20         # Per upstream host
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    breaker: BreakerConfig = BreakerConfig()
+    hedge: bool = False               # Idempotent lookups only; never hedge writes
+
+# One pooled client per upstream host, so each gets its own connection cap
+UPSTREAMS: Dict[str, UpstreamConfig] = {
+    "openfda": UpstreamConfig(timeout=10.0, hedge=True),
+    "rxnorm": UpstreamConfig(timeout=10.0, max_connections=30, max_keepalive_connections=20, hedge=True),
+    "who": UpstreamConfig(timeout=10.0, max_connections=10, max_keepalive_connections=5, hedge=True),
+    "google": UpstreamConfig(timeout=10.0),
+    "tavus": UpstreamConfig(
+        timeout=30.0, max_connections=10, max_keepalive_connections=5,
+        breaker=BreakerConfig(window=10, min_calls=5, open_seconds=60.0)
+    )
+}
+
+class UpstreamError(Exception):
+    """An upstream answered, but with a status the caller cannot use"""
+
+class HttpClientPool:
+    """Long-lived httpx clients shared by the external service wrappers.
+
+    Opening an ``httpx.AsyncClient`` per call pays a TCP and TLS handshake
+    on every request; a shared client keeps connections alive and reuses
+    them. Clients are opened on application startup and closed on shutdown.
+    ``get`` also opens one lazily, so scripts that never run the app's
+    startup hooks still work. Each client's transport carries the
+    upstream's circuit breaker and, if enabled, request hedging (see
+    ``services.resilience``). Breakers and latency samples outlive the
+    clients, so reopening a client does not reset them.
+    """
+
+    def __init__(
+        self,
+        upstreams: Dict[str, UpstreamConfig],
+        http2: bool = HTTP2_ENABLED,
+        verify: Union[bool, ssl.SSLContext] = True,
+        hedging: bool = HEDGING_ENABLED,
+        hedge_config: HedgeConfig = HedgeConfig()
+    ):
+        self.upstreams = dict(upstreams)
+        self.verify = verify
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, ResilientTransport] = {}
+        self.breakers = {name: CircuitBreaker(name, config.breaker) for name, config in self.upstreams.items()}
+        self._latencies = {name: LatencyTracker(hedge_config.samples) for name in self.upstreams}
+        self.hedging = hedging
+        self.hedge_config = hedge_config
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not self.http2:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+
+    def _open(self, name: str) -> httpx.AsyncClient:
+        config = self.upstreams[name]
+        # With an explicit transport, httpx takes pool settings from it, not the client
+        transport = ResilientTransport(
+            httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                verify=self.verify,
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections,
+                    keepalive_expiry=config.keepalive_expiry
+                )
+            ),
+            self.breakers[name],
+            hedge=self.hedge_config if self.hedging and config.hedge else None,
+            latencies=self._latencies[name]
+        )
+        self._transports[name] = transport
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout)
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._open(name)
+        return client
+
+    async def start(self) -> None:
+        for name in self.upstreams:
+            self.get(name)
+        logger.info(
+            f"Opened HTTP clients for {', '.join(self.upstreams)} "
+            f"(HTTP/2 {'on' if self.http2 else 'off'}, hedging {'on' if self.hedging else 'off'})"
+        )
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+        logger.info("Closed HTTP clients")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Breaker state, hedging counters and p95 latency per upstream"""
+        status = {}
+        for name in self.upstreams:
+            transport: Optional[ResilientTransport] = self._transports.get(name)
+            status[name] = transport.status() if transport else {**self.breakers[name].status(), "requests": 0}
+        return status
+
+# Global instance
+http_clients = HttpClientPool(UPSTREAMS)
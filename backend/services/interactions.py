@@ -0,0 +1,164 @@
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from functools import lru_cache
+import csv
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+INTERACTIONS_PATH = os.getenv("DRUG_INTERACTIONS_PATH", os.path.join(DATA_DIR, "drug_interactions.csv"))
+SYNONYMS_PATH = os.getenv("INGREDIENT_SYNONYMS_PATH", os.path.join(DATA_DIR, "ingredient_synonyms.csv"))
+
+# "Paracetamol 500mg + Caffeine 65 mg", "Amoxicillin, Clavulanic Acid"
+COMPONENT_SEPARATOR = re.compile(r"\s*(?:\+|,|/|&|\(|\)|\band\b|\bwith\b)\s*", re.IGNORECASE)
+STRENGTH_PATTERN = re.compile(r"\d+(?:\.\d+)?\s*(?:mg|mcg|µg|g|ml|iu|%|units?)?\b", re.IGNORECASE)
+# Salt and dosage-form words that do not change the active ingredient
+SALT_WORDS = {
+    "hcl", "hydrochloride", "sodium", "potassium", "calcium", "maleate", "besylate",
+    "besilate", "mesylate", "citrate", "succinate", "tartrate", "phosphate", "trihydrate",
+    "dihydrate", "monohydrate", "tablet", "tablets", "capsule", "capsules", "syrup",
+    "injection", "ip", "bp", "usp", "sr", "er", "xr"
+}
+NON_WORD = re.compile(r"[^a-z0-9\- ]+")
+SEVERITY_RANK = {"major": 0, "moderate": 1, "minor": 2}
+
+class Interaction(NamedTuple):
+    ingredient_1: str
+    ingredient_2: str
+    severity: str
+    description: str
+    recommendation: str
+
+def _clean(name: str) -> str:
+    words = NON_WORD.sub(" ", STRENGTH_PATTERN.sub(" ", name.lower())).split()
+    # Only trailing salt words go, so "Diclofenac Sodium" is diclofenac but
+    # "Calcium Carbonate" stays intact
+    while len(words) > 1 and words[-1] in SALT_WORDS:
+        words.pop()
+    return " ".join(words)
+
+class InteractionGraph:
+    """Pairwise drug-interaction graph keyed by normalized ingredient.
+
+    Loaded once from a bulk CSV of ingredient pairs. ``adjacency`` maps each
+    ingredient to the set of ingredients it interacts with, so checking a
+    k-drug prescription is k² set-membership tests with no I/O; pair details
+    sit in a dict keyed by the sorted pair.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, str]], synonyms: Optional[Dict[str, str]] = None):
+        self.synonyms: Dict[str, str] = {}
+        self.adjacency: Dict[str, Set[str]] = {}
+        self.pairs: Dict[Tuple[str, str], Interaction] = {}
+
+        for alias, ingredient in (synonyms or {}).items():
+            self.synonyms[_clean(alias)] = _clean(ingredient)
+
+        for row in rows:
+            first = self.normalize(row["ingredient_1"])
+            second = self.normalize(row["ingredient_2"])
+            if not first or not second or first == second:
+                continue
+            self.adjacency.setdefault(first, set()).add(second)
+            self.adjacency.setdefault(second, set()).add(first)
+            self.pairs[self._key(first, second)] = Interaction(
+                first, second, row["severity"].strip().lower(),
+                row["description"].strip(), row["recommendation"].strip()
+            )
+
+        # Every ingredient the bulk data names, including synonym targets that
+        # have no recorded interaction
+        self.vocabulary: Set[str] = set(self.adjacency) | set(self.synonyms.values())
+
+        self._ingredients_for = lru_cache(maxsize=4096)(self._split_ingredients)
+        logger.info(f"Loaded {len(self.pairs)} interactions over {len(self.adjacency)} ingredients")
+
+    @classmethod
+    def from_files(cls, interactions_path: str = INTERACTIONS_PATH, synonyms_path: str = SYNONYMS_PATH) -> "InteractionGraph":
+        synonyms = {}
+        if os.path.exists(synonyms_path):
+            with open(synonyms_path, newline="", encoding="utf-8") as handle:
+                synonyms = {row["alias"]: row["ingredient"] for row in csv.DictReader(handle)}
+        with open(interactions_path, newline="", encoding="utf-8") as handle:
+            return cls(csv.DictReader(handle), synonyms)
+
+    @staticmethod
+    def _key(first: str, second: str) -> Tuple[str, str]:
+        return (first, second) if first < second else (second, first)
+
+    def normalize(self, name: str) -> str:
+        cleaned = _clean(name)
+        return self.synonyms.get(cleaned, cleaned)
+
+    def _split_ingredients(self, composition: str) -> FrozenSet[str]:
+        parts = (self.normalize(part) for part in COMPONENT_SEPARATOR.split(composition))
+        return frozenset(part for part in parts if part)
+
+    def ingredients(self, composition: str) -> FrozenSet[str]:
+        """Normalized active ingredients of a composition string (cached)"""
+        return self._ingredients_for(composition)
+
+    def knows(self, ingredient: str) -> bool:
+        """Whether the bulk data names this ingredient, with or without any
+        recorded interaction"""
+        return ingredient in self.vocabulary
+
+    def check(self, prescription: Sequence[Tuple[str, FrozenSet[str]]]) -> List[Dict[str, str]]:
+        """Interactions between every pair of (label, ingredients) entries.
+
+        Ingredients shared by two entries are not reported against each other
+        (that is a duplicate, not an interaction). Results are ordered most
+        severe first.
+        """
+        found = []
+        for i in range(len(prescription)):
+            label_1, ingredients_1 = prescription[i]
+            for j in range(i + 1, len(prescription)):
+                label_2, ingredients_2 = prescription[j]
+                for first in ingredients_1:
+                    neighbours = self.adjacency.get(first)
+                    if not neighbours:
+                        continue
+                    for second in ingredients_2:
+                        if second in neighbours:
+                            interaction = self.pairs[self._key(first, second)]
+                            found.append({
+                                "medicine_1": label_1,
+                                "medicine_2": label_2,
+                                "ingredient_1": first,
+                                "ingredient_2": second,
+                                "severity": interaction.severity,
+                                "description": interaction.description,
+                                "recommendation": interaction.recommendation,
+                                "source": "local"
+                            })
+        found.sort(key=lambda item: SEVERITY_RANK.get(item["severity"], len(SEVERITY_RANK)))
+        return found
+
+def parse_rxnorm_interactions(payload: Dict) -> List[Dict[str, str]]:
+    """Flatten an RxNav interaction/list.json payload into our response shape"""
+    found = []
+    for group in payload.get("fullInteractionTypeGroup", payload.get("interactionTypeGroup", [])):
+        for interaction_type in group.get("fullInteractionType", group.get("interactionType", [])):
+            for pair in interaction_type.get("interactionPair", []):
+                concepts = pair.get("interactionConcept", [])
+                if len(concepts) < 2:
+                    continue
+                names = [concept.get("minConceptItem", {}).get("name", "") for concept in concepts[:2]]
+                severity = (pair.get("severity") or "").lower()
+                found.append({
+                    "medicine_1": names[0],
+                    "medicine_2": names[1],
+                    "ingredient_1": names[0].lower(),
+                    "ingredient_2": names[1].lower(),
+                    "severity": severity if severity in SEVERITY_RANK else "unknown",
+                    "description": pair.get("description", ""),
+                    "recommendation": "Consult a pharmacist or physician",
+                    "source": "rxnorm"
+                })
+    return found
+
+# Global instance
+interaction_graph = InteractionGraph.from_files()
@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, List, Sequence
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class StoreInventory:
+    """Store x medicine stock as packed bitmaps.
+
+    Row ``m`` of ``bits`` is medicine m's stock across every store, one bit
+    per store column (``np.packbits`` layout, most significant bit first).
+    Checking a set of candidate stores is a gather of their bits, and
+    medicines the inventory does not know read as not stocked. 1,500
+    medicines over 8,500 stores take ~1.6MB, against tens of MB for
+    per-store id lists.
+    """
+
+    def __init__(
+        self,
+        store_ids: Sequence[str],
+        medicine_ids: Sequence[str],
+        stock: Dict[str, Iterable[str]]
+    ):
+        self.store_ids = list(store_ids)
+        self.medicine_ids = list(medicine_ids)
+        self._store_columns: Dict[str, int] = {store_id: column for column, store_id in enumerate(self.store_ids)}
+        self._medicine_rows: Dict[str, int] = {medicine_id: row for row, medicine_id in enumerate(self.medicine_ids)}
+
+        in_stock = np.zeros((len(self.medicine_ids), len(self.store_ids)), dtype=bool)
+        for store_id, medicine_ids_in_stock in stock.items():
+            column = self._store_columns.get(store_id)
+            if column is None:
+                continue
+            rows = [self._medicine_rows[medicine_id] for medicine_id in medicine_ids_in_stock if medicine_id in self._medicine_rows]
+            in_stock[rows, column] = True
+        self.bits = np.packbits(in_stock, axis=1)
+        logger.info(
+            f"Built inventory bitmaps for {len(self.medicine_ids)} medicines "
+            f"across {len(self.store_ids)} stores ({self.bits.nbytes} bytes)"
+        )
+
+    def _rows(self, medicine_ids: Iterable[str]) -> List[int]:
+        return [self._medicine_rows.get(medicine_id, -1) for medicine_id in medicine_ids]
+
+    def store_columns(self, store_ids: Iterable[str]) -> np.ndarray:
+        """Columns of the given stores; -1 for stores without inventory"""
+        return np.array([self._store_columns.get(store_id, -1) for store_id in store_ids], dtype=np.intp)
+
+    def coverage(self, columns: np.ndarray, medicine_ids: Sequence[str]) -> np.ndarray:
+        """(len(columns), len(medicine_ids)) boolean stock matrix for the given
+        store columns; stores without inventory and unknown medicines are False.
+
+        Only the candidates' bits are read, so a small spatial candidate set
+        never touches the rest of the bitmap.
+        """
+        rows = self._rows(medicine_ids)
+        matrix = np.zeros((len(columns), len(rows)), dtype=bool)
+        known = columns >= 0
+        safe_columns = np.where(known, columns, 0)
+        byte_columns = safe_columns >> 3
+        shifts = (7 - (safe_columns & 7)).astype(np.uint8)
+        for item, row in enumerate(rows):
+            if row >= 0:
+                matrix[:, item] = known & ((self.bits[row, byte_columns] >> shifts) & 1).astype(bool)
+        return matrix
+
+    def stocks_all(self, columns: np.ndarray, medicine_ids: Sequence[str]) -> np.ndarray:
+        """For each store column, whether it stocks every medicine"""
+        return self.coverage(columns, list(medicine_ids)).all(axis=1)
+
+    def medicines_at(self, store_id: str) -> List[str]:
+        """Ids of the medicines a store stocks"""
+        column = self._store_columns.get(store_id)
+        if column is None:
+            return []
+        stocked = (self.bits[:, column >> 3] >> (7 - (column & 7))) & 1
+        return [self.medicine_ids[row] for row in np.flatnonzero(stocked)]
+
+    def in_stock(self, store_id: str, medicine_id: str) -> bool:
+        column = self._store_columns.get(store_id)
+        row = self._medicine_rows.get(medicine_id)
+        if column is None or row is None:
+            return False
+        return bool((self.bits[row, column >> 3] >> (7 - (column & 7))) & 1)
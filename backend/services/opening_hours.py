@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+import re
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Facilities are all in India; opening hours are local (IST, no DST)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+DAY = r"(mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?"
+DAY_RANGE_PATTERN = re.compile(rf"{DAY}(?:\s*(?:-|–|to)\s*{DAY})?", re.IGNORECASE)
+TIME = r"(\d{1,2})(?:[:.](\d{2}))?\s*([ap]\.?m\.?)?"
+TIME_RANGE_PATTERN = re.compile(rf"{TIME}\s*(?:-|–|to)\s*{TIME}", re.IGNORECASE)
+ALWAYS_OPEN_PATTERN = re.compile(r"24\s*/\s*7|24\s*x\s*7|24\s*hours|open\s+all\s+day|round\s+the\s+clock", re.IGNORECASE)
+SEGMENT_SEPARATOR = re.compile(r"[;,\n]|\band\b", re.IGNORECASE)
+
+Interval = Tuple[int, int]
+
+def _minutes(hour: str, minute: Optional[str], meridiem: Optional[str]) -> int:
+    hours = int(hour)
+    if meridiem:
+        meridiem = meridiem.lower()
+        if hours == 12:
+            hours = 0
+        if meridiem.startswith("p"):
+            hours += 12
+    return hours * 60 + int(minute or 0)
+
+def _day_span(match: re.Match) -> List[int]:
+    first = DAYS.index(match.group(1).lower()[:3])
+    last = DAYS.index(match.group(2).lower()[:3]) if match.group(2) else first
+    return [(first + offset) % 7 for offset in range((last - first) % 7 + 1)]
+
+def parse_opening_hours(text: Optional[str]) -> Optional[List[Interval]]:
+    """Parse free-text hours into weekly [start, end) minute intervals.
+
+    Minute 0 is Monday 00:00. Handles "24/7", "9:00 AM - 9:00 PM",
+    "09:00-21:00", bare 12-hour ranges ("9-5" is 9 AM to 5 PM), day
+    prefixes ("Mon-Sat 9 AM - 8 PM; Sun closed") and overnight ranges
+    ("10 PM - 6 AM", "22:00-06:00"). Returns None when the text cannot be
+    understood, so callers can tell "unknown" from "never open".
+    """
+    if not text:
+        return None
+    if ALWAYS_OPEN_PATTERN.search(text):
+        return [(0, MINUTES_PER_WEEK)]
+
+    intervals: List[Interval] = []
+    pending_days: List[int] = []
+    understood = False
+    for segment in SEGMENT_SEPARATOR.split(text):
+        days = [day for match in DAY_RANGE_PATTERN.finditer(segment) for day in _day_span(match)]
+        time_range = TIME_RANGE_PATTERN.search(segment)
+        if "closed" in segment.lower():
+            understood = True
+            pending_days = []
+            continue
+        if not time_range:
+            # "Mon, Wed, Fri 9-5" lists days across separators
+            pending_days.extend(days)
+            continue
+
+        start_hour, start_minute, start_meridiem, end_hour, end_minute, end_meridiem = time_range.groups()
+        # "9 - 5 PM": an unmarked side borrows the other side's meridiem
+        start = _minutes(start_hour, start_minute, start_meridiem or end_meridiem)
+        end = _minutes(end_hour, end_minute, end_meridiem or start_meridiem)
+        if start_meridiem is None and end_meridiem and start > end:
+            start = _minutes(start_hour, start_minute, "am")
+        if end_meridiem is None and start_meridiem and start > end:
+            end = _minutes(end_hour, end_minute, "pm")
+        if start_meridiem is None and end_meridiem is None and end < start and start < 13 * 60:
+            # "9-5" is 9 AM to 5 PM; 24-hour overnight ranges start after noon
+            end += 12 * 60
+        if end <= start:
+            end += MINUTES_PER_DAY  # Closes after midnight
+
+        for day in pending_days + days or range(7):
+            day_start = day * MINUTES_PER_DAY + start
+            day_end = day * MINUTES_PER_DAY + end
+            if day_end <= MINUTES_PER_WEEK:
+                intervals.append((day_start, day_end))
+            else:
+                # Sunday night into Monday morning wraps around the week
+                intervals.append((day_start, MINUTES_PER_WEEK))
+                intervals.append((0, day_end - MINUTES_PER_WEEK))
+        pending_days = []
+        understood = True
+
+    return sorted(intervals) if understood else None
+
+def minute_of_week(moment: datetime) -> int:
+    """Minute since Monday 00:00 IST; naive datetimes are taken as IST"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=IST)
+    moment = moment.astimezone(IST)
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def requested_minute(open_now: bool, open_at: Optional[datetime]) -> Optional[int]:
+    """Minute of week to filter on for the open_now/open_at parameters"""
+    if open_at is not None:
+        return minute_of_week(open_at)
+    if open_now:
+        return minute_of_week(datetime.now(IST))
+    return None
+
+class OpeningHoursTable:
+    """Opening hours compiled once into padded (N, M) start/end minute arrays.
+
+    Row i holds record i's weekly intervals, padded with empty [0, 0)
+    intervals, so "which records are open at minute t" is a single
+    vectorized comparison over the whole table. Records whose hours could
+    not be parsed are never reported open.
+    """
+
+    def __init__(self, records: Sequence[Optional[Dict[str, Any]]], field: str = "operating_hours"):
+        parsed = [
+            parse_opening_hours(record.get(field)) if record is not None else None
+            for record in records
+        ]
+        width = max((len(intervals) for intervals in parsed if intervals), default=1)
+        self.starts = np.zeros((len(records), width), dtype=np.int16)
+        self.ends = np.zeros((len(records), width), dtype=np.int16)
+        self.known = np.zeros(len(records), dtype=bool)
+        for row, intervals in enumerate(parsed):
+            if intervals is None:
+                continue
+            self.known[row] = True
+            for column, (start, end) in enumerate(intervals):
+                self.starts[row, column] = start
+                self.ends[row, column] = end
+
+        unknown = len(records) - int(self.known.sum())
+        if unknown:
+            logger.info(f"Could not parse opening hours for {unknown} of {len(records)} records")
+
+    def open_mask(self, minute: int) -> np.ndarray:
+        """Boolean mask of records open at the given minute of the week"""
+        return ((self.starts <= minute) & (minute < self.ends)).any(axis=1)
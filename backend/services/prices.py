@@ -0,0 +1,157 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+import re
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Amounts like "2", "2.50", "15,000" or lakh-grouped "15,00,000"
+AMOUNT_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+UNIT_PATTERN = re.compile(r"\bper\s+([a-z]+)", re.IGNORECASE)
+
+class MixedPriceUnitsError(ValueError):
+    """Raised instead of comparing prices quoted in different units"""
+
+class ParsedPrice(NamedTuple):
+    minimum: float
+    maximum: float
+    unit: Optional[str]
+
+def parse_price(text: Optional[str]) -> Optional[ParsedPrice]:
+    """Parse "₹2-5 per tablet" or "₹2,00,000 - ₹15,00,000" into numbers.
+
+    Commas are digit-group separators in both Western and lakh notation, so
+    they are simply dropped. A single amount gives a zero-width range.
+    """
+    if not text:
+        return None
+    amounts = [float(amount.replace(",", "")) for amount in AMOUNT_PATTERN.findall(text)]
+    if not amounts:
+        return None
+    unit = UNIT_PATTERN.search(text)
+    return ParsedPrice(
+        minimum=min(amounts[:2]),
+        maximum=max(amounts[:2]),
+        unit=unit.group(1).lower() if unit else None
+    )
+
+class PriceColumn:
+    """Parsed prices for one field as contiguous arrays aligned to positions"""
+
+    def __init__(self, minimum: np.ndarray, maximum: np.ndarray, unit_codes: np.ndarray):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.unit_codes = unit_codes
+
+    @property
+    def midpoint(self) -> np.ndarray:
+        return (self.minimum + self.maximum) / 2
+
+class PriceTable:
+    """Price strings parsed once at load into float64 min/max and unit columns.
+
+    ``extractors`` map a column name to a function returning the raw price
+    string for a record (or None when the record has no such price). Missing
+    prices are NaN, so range filters drop them and sorts push them last.
+    ``sort_keys`` holds precomputed per-position arrays that searches can
+    order by; keys that are prices also have their unit codes in
+    ``sort_units``. "₹5 per tablet" and "₹20 per course" cannot be
+    converted without pack sizes, so prices are only ever compared within
+    one unit.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[Optional[Dict[str, Any]]],
+        extractors: Dict[str, Callable[[Dict[str, Any]], Optional[str]]]
+    ):
+        self.units: List[Optional[str]] = [None]
+        self._unit_codes: Dict[Optional[str], int] = {None: 0}
+        self.columns: Dict[str, PriceColumn] = {}
+        self.sort_keys: Dict[str, np.ndarray] = {}
+        self.sort_units: Dict[str, np.ndarray] = {}
+
+        for name, extract in extractors.items():
+            minimum = np.full(len(records), np.nan)
+            maximum = np.full(len(records), np.nan)
+            codes = np.zeros(len(records), dtype=np.int16)
+            for position, record in enumerate(records):
+                parsed = parse_price(extract(record)) if record is not None else None
+                if parsed is None:
+                    continue
+                minimum[position] = parsed.minimum
+                maximum[position] = parsed.maximum
+                if parsed.unit not in self._unit_codes:
+                    self._unit_codes[parsed.unit] = len(self.units)
+                    self.units.append(parsed.unit)
+                codes[position] = self._unit_codes[parsed.unit]
+            self.columns[name] = PriceColumn(minimum, maximum, codes)
+
+        logger.info(f"Parsed {len(extractors)} price columns for {len(records)} records")
+
+    def column(self, name: str) -> PriceColumn:
+        return self.columns[name]
+
+    def with_fallback(self, name: str, primary: str, fallback: str) -> PriceColumn:
+        """Derive a column that uses ``fallback`` wherever ``primary`` is missing"""
+        first, second = self.columns[primary], self.columns[fallback]
+        missing = np.isnan(first.minimum)
+        column = PriceColumn(
+            np.where(missing, second.minimum, first.minimum),
+            np.where(missing, second.maximum, first.maximum),
+            np.where(missing, second.unit_codes, first.unit_codes)
+        )
+        self.columns[name] = column
+        return column
+
+    def savings(self, generic: str, brand: str) -> np.ndarray:
+        """Fraction saved by the generic price versus the brand price; NaN
+        where the two are quoted in different units"""
+        generic_column, brand_column = self.columns[generic], self.columns[brand]
+        generic_mid = generic_column.midpoint
+        brand_mid = brand_column.midpoint
+        comparable = (brand_mid > 0) & (generic_column.unit_codes == brand_column.unit_codes)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(comparable, 1 - generic_mid / brand_mid, np.nan)
+
+    def in_unit(self, positions: np.ndarray, column: str, unit: str) -> np.ndarray:
+        """Keep positions whose price is quoted per ``unit`` ("tablet", "course")"""
+        code = self._unit_codes.get(unit.strip().lower())
+        if code is None:
+            return positions[:0]
+        return positions[self.columns[column].unit_codes[positions] == code]
+
+    def _require_one_unit(self, positions: np.ndarray, values: np.ndarray, unit_codes: np.ndarray) -> None:
+        priced = positions[~np.isnan(values[positions])]
+        codes = np.unique(unit_codes[priced])
+        if len(codes) > 1:
+            quoted = ", ".join(f"per {self.units[code]}" if self.units[code] else "without a unit" for code in codes)
+            raise MixedPriceUnitsError(f"Prices of the matching results are quoted {quoted}; pass price_unit to compare one of them")
+
+    def in_band(
+        self,
+        positions: np.ndarray,
+        column: str,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None
+    ) -> np.ndarray:
+        """Keep positions whose price range overlaps [min_price, max_price];
+        raises MixedPriceUnitsError if their prices are in several units"""
+        prices = self.columns[column]
+        self._require_one_unit(positions, prices.minimum, prices.unit_codes)
+        keep = np.ones(len(positions), dtype=bool)
+        if min_price is not None:
+            keep &= prices.maximum[positions] >= min_price
+        if max_price is not None:
+            keep &= prices.minimum[positions] <= max_price
+        return positions[keep]
+
+    def order_by(self, positions: np.ndarray, sort_key: str, descending: bool = False) -> np.ndarray:
+        """Stable sort of positions by a precomputed key; NaN always sorts last.
+        Raises MixedPriceUnitsError for a price key over several units"""
+        if sort_key in self.sort_units:
+            self._require_one_unit(positions, self.sort_keys[sort_key], self.sort_units[sort_key])
+        keys = self.sort_keys[sort_key][positions]
+        if descending:
+            keys = -keys
+        return positions[np.argsort(keys, kind="stable")]
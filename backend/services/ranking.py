@@ -0,0 +1,155 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+import math
+import logging
+import numpy as np
+from services.search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Cap on index terms a partial query word expands to, so "a" stays cheap
+MAX_PREFIX_EXPANSIONS = 50
+
+class BM25Ranker:
+    """BM25F relevance scoring over weighted document fields.
+
+    Term frequencies are kept per field, so each field gets its own length
+    normalization before the boosted frequencies are combined and saturated.
+    Query words that are not whole index terms (a user still typing "parac")
+    are expanded to the index terms they prefix. Each term's per-document
+    contributions are computed once into arrays and cached until the index
+    changes, so a query is a few vectorized adds plus a partial top-k
+    selection; the full candidate set is never sorted.
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[Optional[Dict[str, Any]]],
+        field_boosts: Dict[str, float],
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.fields = list(field_boosts)
+        self.boosts = [field_boosts[field] for field in self.fields]
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._lengths: List[Optional[List[int]]] = []
+        self._terms: List[Optional[List[str]]] = []
+        self._total_lengths = [0] * len(self.fields)
+        self._live = 0
+        self._vocabulary: Optional[List[str]] = None
+        self._cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        for document in documents:
+            if document is None:
+                self._lengths.append(None)
+                self._terms.append(None)
+            else:
+                self.add(document)
+
+        logger.info(f"Built BM25 ranker over {self._live} documents ({len(self._postings)} terms)")
+
+    def _field_tokens(self, document: Dict[str, Any]) -> List[List[str]]:
+        tokens = []
+        for field in self.fields:
+            value = document.get(field) or ""
+            if isinstance(value, (list, tuple)):
+                value = " ".join(str(item) for item in value)
+            tokens.append(tokenize(str(value)))
+        return tokens
+
+    def add(self, document: Dict[str, Any]) -> int:
+        position = len(self._lengths)
+        field_tokens = self._field_tokens(document)
+        for field_index, tokens in enumerate(field_tokens):
+            for token in tokens:
+                frequencies = self._postings.setdefault(token, {}).setdefault(position, [0] * len(self.fields))
+                frequencies[field_index] += 1
+            self._total_lengths[field_index] += len(tokens)
+        self._lengths.append([len(tokens) for tokens in field_tokens])
+        self._terms.append(list({token for tokens in field_tokens for token in tokens}))
+        self._live += 1
+        self._vocabulary = None
+        self._cache = {}
+        return position
+
+    def remove(self, position: int) -> None:
+        lengths = self._lengths[position]
+        if lengths is None:
+            return
+        for token in self._terms[position]:
+            del self._postings[token][position]
+            if not self._postings[token]:
+                del self._postings[token]
+        for field_index, length in enumerate(lengths):
+            self._total_lengths[field_index] -= length
+        self._lengths[position] = None
+        self._terms[position] = None
+        self._live -= 1
+        self._vocabulary = None
+        self._cache = {}
+
+    def _expand(self, word: str) -> List[str]:
+        if word in self._postings:
+            return [word]
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        terms = []
+        index = bisect_left(self._vocabulary, word)
+        while (index < len(self._vocabulary) and len(terms) < MAX_PREFIX_EXPANSIONS
+               and self._vocabulary[index].startswith(word)):
+            terms.append(self._vocabulary[index])
+            index += 1
+        return terms
+
+    def _contributions(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, BM25 contribution) of one term, cached until the next change"""
+        cached = self._cache.get(term)
+        if cached is not None:
+            return cached
+        postings = self._postings[term]
+        idf = math.log(1 + (self._live - len(postings) + 0.5) / (len(postings) + 0.5))
+        averages = [(total / self._live) or 1.0 for total in self._total_lengths]
+        positions = np.fromiter(postings.keys(), dtype=np.intp, count=len(postings))
+        values = np.empty(len(postings))
+        for index, (position, frequencies) in enumerate(postings.items()):
+            lengths = self._lengths[position]
+            weighted = 0.0
+            for field_index, frequency in enumerate(frequencies):
+                if frequency:
+                    norm = 1 - self.b + self.b * lengths[field_index] / averages[field_index]
+                    weighted += self.boosts[field_index] * frequency / norm
+            values[index] = idf * weighted / (self.k1 + weighted)
+        self._cache[term] = (positions, values)
+        return positions, values
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every position for a query (0 where nothing matches)"""
+        scores = np.zeros(len(self._lengths))
+        for word in dict.fromkeys(tokenize(query)):
+            for term in self._expand(word):
+                positions, values = self._contributions(term)
+                scores[positions] += values
+        return scores
+
+    def top_k(self, query: str, positions: Sequence[int], k: int) -> List[int]:
+        """The k best-scoring positions, best first; ties keep the given order.
+
+        Uses a partial selection (argpartition) so only the k winners are
+        ever sorted.
+        """
+        candidates = np.asarray(positions, dtype=np.intp)
+        if k <= 0 or not len(candidates):
+            return []
+        candidate_scores = self.scores(query)[candidates]
+        order = np.arange(len(candidates))
+        if len(candidates) > k:
+            # Everything strictly above the k-th best score, then ties at
+            # that score in their original order
+            threshold = np.partition(candidate_scores, len(candidates) - k)[len(candidates) - k]
+            above = order[candidate_scores > threshold]
+            tied = order[candidate_scores == threshold][:k - len(above)]
+            order = np.concatenate([above, tied])
+        order = order[np.lexsort((order, -candidate_scores[order]))]
+        return candidates[order].tolist()
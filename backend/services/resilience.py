@@ -0,0 +1,254 @@
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from collections import deque
+import asyncio
+import time
+import logging
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Upstream errors worth a second attempt; others (501, 505) are final
+RETRYABLE_STATUS = {500, 502, 503, 504}
+
+class BreakerConfig(NamedTuple):
+    window: int = 20                # Most recent calls the failure rate is taken over
+    min_calls: int = 10             # Calls needed in the window before it can trip
+    failure_threshold: float = 0.5  # Failure rate that opens the breaker
+    open_seconds: float = 30.0      # Time spent failing fast before probing again
+    half_open_probes: int = 1       # Concurrent trial calls while half-open
+
+class HedgeConfig(NamedTuple):
+    percentile: float = 95.0        # Latency after which the second attempt fires
+    min_samples: int = 20           # Latencies needed before hedging starts
+    min_delay: float = 0.02         # Never hedge sooner than this (seconds)
+    budget: float = 0.1             # Hedges allowed per request sent
+    samples: int = 200              # Recent latencies the percentile is taken over
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one upstream.
+
+    Closed: calls go through and their outcomes fill a sliding window of
+    the last ``window`` calls. Once that holds ``min_calls`` and the failure
+    rate reaches ``failure_threshold`` the breaker opens: calls fail
+    immediately for ``open_seconds``. After that it is half-open: up to
+    ``half_open_probes`` trial calls go through, and the first outcome
+    closes the breaker (with a fresh window) or opens it again.
+    """
+
+    def __init__(self, name: str, config: BreakerConfig = BreakerConfig(), clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.config = config
+        self._clock = clock
+        self._outcomes: deque = deque(maxlen=config.window)
+        self._opened_at: Optional[float] = None
+        self._probes = 0
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self.config.open_seconds:
+            return "open"
+        return "half_open"
+
+    @property
+    def failure_rate(self) -> Optional[float]:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else None
+
+    def acquire(self) -> Optional[str]:
+        """Permission for one call: "call" while closed, "probe" while
+        half-open, or None to fail fast. Each permit must be followed by
+        ``record`` or ``release``."""
+        state = self.state
+        if state == "closed":
+            return "call"
+        if state == "half_open" and self._probes < self.config.half_open_probes:
+            self._probes += 1
+            return "probe"
+        self.rejected += 1
+        return None
+
+    def release(self, permit: str) -> None:
+        """Give back a permit whose call ended without an outcome (cancelled)"""
+        if permit == "probe":
+            self._probes = max(0, self._probes - 1)
+
+    def record(self, permit: str, success: bool) -> None:
+        if permit == "probe":
+            self._probes = max(0, self._probes - 1)
+            if self._opened_at is None:
+                return
+            if success:
+                logger.info(f"Circuit for {self.name} closed after a successful probe")
+                self._opened_at = None
+                self._outcomes.clear()
+            else:
+                self._opened_at = self._clock()
+            return
+        if self._opened_at is not None:
+            # Call started before the breaker opened; its outcome is stale
+            return
+
+        self._outcomes.append(not success)
+        if len(self._outcomes) >= self.config.min_calls and self.failure_rate >= self.config.failure_threshold:
+            logger.warning(
+                f"Circuit for {self.name} opened: {self.failure_rate:.0%} of the last "
+                f"{len(self._outcomes)} calls failed"
+            )
+            self._opened_at = self._clock()
+            self.trips += 1
+
+    def status(self) -> Dict[str, Any]:
+        failure_rate = self.failure_rate
+        return {
+            "state": self.state,
+            "failure_rate": round(failure_rate, 3) if failure_rate is not None else None,
+            "window_calls": len(self._outcomes),
+            "trips": self.trips,
+            "rejected": self.rejected
+        }
+
+class LatencyTracker:
+    """Recent successful-call latencies for picking the hedge delay"""
+
+    def __init__(self, size: int):
+        self._samples = np.zeros(size, dtype=np.float64)
+        self._count = 0
+
+    def add(self, seconds: float) -> None:
+        self._samples[self._count % len(self._samples)] = seconds
+        self._count += 1
+
+    def __len__(self) -> int:
+        return min(self._count, len(self._samples))
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if not len(self):
+            return None
+        return float(np.percentile(self._samples[:len(self)], percentile))
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """httpx transport adding a circuit breaker and optional hedging.
+
+    Wraps the real connection-pool transport of one upstream client, so
+    every caller gets both without changes. Transport errors, timeouts and
+    5xx responses count as failures. With hedging enabled, a GET still
+    unanswered after the recent p95 latency, or failed before then, gets a
+    second attempt. The first usable response wins and the other attempt
+    is cancelled. A retryable 5xx is only returned, and only counts toward
+    the breaker, once every attempt has failed. Hedges are capped at
+    ``budget`` per request, and are only sent while the breaker is closed,
+    so a struggling upstream does not get double the load.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        breaker: CircuitBreaker,
+        hedge: Optional[HedgeConfig] = None,
+        latencies: Optional[LatencyTracker] = None
+    ):
+        self._transport = transport
+        self.breaker = breaker
+        self.hedge = hedge
+        self.latencies = latencies or LatencyTracker(HedgeConfig().samples)
+        self.stats = {"requests": 0, "hedges": 0, "hedge_wins": 0}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        permit = self.breaker.acquire()
+        if permit is None:
+            raise CircuitOpenError(f"Circuit for {self.breaker.name} is open", request=request)
+        self.stats["requests"] += 1
+        try:
+            delay = self._hedge_delay(request) if permit == "call" else None
+            if delay is None:
+                response = await self._attempt(request)
+            else:
+                response = await self._hedged(request, delay)
+        except asyncio.CancelledError:
+            self.breaker.release(permit)
+            raise
+        except Exception:
+            self.breaker.record(permit, False)
+            raise
+        self.breaker.record(permit, response.status_code < 500)
+        return response
+
+    async def _attempt(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        if response.status_code < 500:
+            self.latencies.add(time.perf_counter() - started)
+        return response
+
+    def _hedge_delay(self, request: httpx.Request) -> Optional[float]:
+        if self.hedge is None or request.method != "GET":
+            return None
+        if len(self.latencies) < self.hedge.min_samples:
+            return None
+        return max(self.hedge.min_delay, self.latencies.percentile(self.hedge.percentile))
+
+    async def _hedged(self, request: httpx.Request, delay: float) -> httpx.Response:
+        primary = asyncio.ensure_future(self._attempt(request))
+        attempts = {primary}
+        hedge_at = asyncio.get_running_loop().time() + delay
+        hedged = False
+        failed: Optional[httpx.Response] = None
+        error: Optional[BaseException] = None
+        try:
+            while attempts:
+                timeout = None if hedged else max(0.0, hedge_at - asyncio.get_running_loop().time())
+                done, attempts = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is not None:
+                        error = attempt.exception()
+                        continue
+                    response = attempt.result()
+                    if response.status_code in RETRYABLE_STATUS:
+                        # A loss while another attempt may still succeed
+                        if failed is not None:
+                            await failed.aclose()
+                        failed = response
+                        continue
+                    if failed is not None:
+                        await failed.aclose()
+                    if attempt is not primary:
+                        self.stats["hedge_wins"] += 1
+                    return response
+
+                # Hedge once: when the primary is slow, or has already failed
+                if not hedged and (not done or not attempts):
+                    hedged = True
+                    if self.stats["hedges"] < self.hedge.budget * self.stats["requests"]:
+                        self.stats["hedges"] += 1
+                        attempts.add(asyncio.ensure_future(self._attempt(request)))
+            if failed is not None:
+                return failed
+            raise error
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+                attempt.add_done_callback(_close_unused)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def status(self) -> Dict[str, Any]:
+        p95 = self.latencies.percentile(95.0)
+        return {
+            **self.breaker.status(),
+            **self.stats,
+            "hedging": self.hedge is not None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+def _close_unused(attempt: asyncio.Future) -> None:
+    """Close the response of a losing attempt that completed before it was cancelled"""
+    if not attempt.cancelled() and attempt.exception() is None:
+        asyncio.ensure_future(attempt.result().aclose())
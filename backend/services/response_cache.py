@@ -0,0 +1,120 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CachePolicy(NamedTuple):
+    ttl: float          # Seconds a response is served as fresh
+    stale_ttl: float    # Further seconds it may be served while a refresh runs
+
+class _Entry(NamedTuple):
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+CacheKey = Tuple[str, Hashable]
+
+class ResponseCache:
+    """Size-bounded LRU cache of upstream responses.
+
+    Each namespace (one per upstream endpoint) has its own TTL policy.
+    Fresh entries are returned directly. Stale ones are still returned
+    immediately while one background refresh runs (stale-while-revalidate),
+    and kept if that refresh fails. Concurrent misses for the same key share
+    a single upstream call (single-flight). Only successful fetches are
+    stored: ``fetch`` raising leaves the cache untouched and the error goes
+    to every waiter. Cached values are shared, so callers must not mutate
+    them.
+    """
+
+    def __init__(
+        self,
+        policies: Dict[str, CachePolicy],
+        max_entries: int = 2048,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.policies = dict(policies)
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, counter: str) -> None:
+        counters = self._stats.setdefault(namespace, {
+            "hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+            "refreshes": 0, "errors": 0, "evictions": 0
+        })
+        counters[counter] += 1
+
+    async def get_or_fetch(self, namespace: str, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        cache_key = (namespace, key)
+        entry = self._entries.get(cache_key)
+        now = self._clock()
+        if entry is not None and now <= entry.stale_until:
+            self._entries.move_to_end(cache_key)
+            if now <= entry.fresh_until:
+                self._count(namespace, "hits")
+            else:
+                self._count(namespace, "stale_hits")
+                if cache_key not in self._inflight:
+                    self._count(namespace, "refreshes")
+                    self._load(cache_key, fetch)
+            return entry.value
+
+        self._count(namespace, "misses")
+        if cache_key in self._inflight:
+            self._count(namespace, "coalesced")
+        # Shielded so a cancelled caller never cancels the shared fetch
+        return await asyncio.shield(self._load(cache_key, fetch))
+
+    def _load(self, cache_key: CacheKey, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(cache_key, fetch))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._finish(cache_key, done))
+        return task
+
+    async def _fetch_and_store(self, cache_key: CacheKey, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+        policy = self.policies[cache_key[0]]
+        now = self._clock()
+        self._entries[cache_key] = _Entry(value, now + policy.ttl, now + policy.ttl + policy.stale_ttl)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._count(evicted[0], "evictions")
+        return value
+
+    def _finish(self, cache_key: CacheKey, task: asyncio.Task) -> None:
+        self._inflight.pop(cache_key, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so background refresh failures are logged, not lost
+            self._count(cache_key[0], "errors")
+            logger.warning(f"Upstream fetch for {cache_key[0]} failed: {task.exception()}")
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            self._entries.clear()
+        else:
+            for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == namespace]:
+                del self._entries[cache_key]
+
+    def stats(self) -> Dict[str, Any]:
+        namespaces = {}
+        for namespace, counters in self._stats.items():
+            lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+            namespaces[namespace] = {
+                **counters,
+                "hit_rate": round((counters["hits"] + counters["stale_hits"]) / lookups, 3) if lookups else None
+            }
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "in_flight": len(self._inflight),
+            "namespaces": namespaces
+        }
@@ -0,0 +1,156 @@
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import os
+import logging
+import numpy as np
+from services.gazetteer import DATA_DIR, Gazetteer, gazetteer
+from services.geo_index import haversine_km_many, nearest_first
+
+logger = logging.getLogger(__name__)
+
+# Bundled outlines are coarse, simplified state polygons; point this at the
+# official state/district boundary GeoJSON for border-accurate answers
+BOUNDARIES_PATH = os.getenv("ADMIN_BOUNDARIES_PATH", os.path.join(DATA_DIR, "admin_boundaries.geojson"))
+
+# Farthest a pincode centroid may be from the point and still be reported
+MAX_PINCODE_DISTANCE_KM = 10.0
+
+class _Ring:
+    """Polygon ring as edge arrays for a vectorized even-odd crossing test"""
+
+    def __init__(self, coordinates: List[List[float]]):
+        points = np.array(coordinates, dtype=np.float64)
+        self.x, self.y = points[:, 0], points[:, 1]
+        self.next_x, self.next_y = np.roll(self.x, -1), np.roll(self.y, -1)
+
+    def crossings(self, x: float, y: float) -> int:
+        straddles = (self.y > y) != (self.next_y > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing_x = (self.next_x - self.x) * (y - self.y) / (self.next_y - self.y) + self.x
+        return int(np.count_nonzero(straddles & (x < crossing_x)))
+
+class ReverseGeocoder:
+    """Coordinates to state, district and pincode without network calls.
+
+    Boundary polygons (GeoJSON Polygon/MultiPolygon features with ``level``
+    "state" or "district") are split into parts whose bounding boxes live in
+    one (P, 4) array, so a lookup first keeps the handful of parts whose box
+    contains the point and only then runs point-in-polygon on those (holes
+    are handled by even-odd counting over all of a part's rings). Where
+    regions overlap, the smallest containing one wins, so enclaves resolve
+    correctly. Pincode (and district, when no district polygons are loaded)
+    comes from the nearest gazetteer pincode in the resolved state, by one
+    vectorized haversine over that state's pincodes.
+    """
+
+    def __init__(self, features: Iterable[Dict[str, Any]], places: Gazetteer):
+        self.names: List[str] = []
+        self.levels: List[str] = []
+        self.states: List[str] = []
+        part_rings: List[List[_Ring]] = []
+        part_features: List[int] = []
+        bounds: List[List[float]] = []
+        areas: List[float] = []
+
+        for feature in features:
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+            properties = feature.get("properties", {})
+            feature_index = len(self.names)
+            self.names.append(properties["name"])
+            self.levels.append(properties.get("level", "state"))
+            self.states.append(properties.get("state", properties["name"]))
+
+            for polygon in polygons:
+                outer = np.array(polygon[0], dtype=np.float64)
+                part_rings.append([_Ring(ring) for ring in polygon])
+                part_features.append(feature_index)
+                bounds.append([outer[:, 1].min(), outer[:, 0].min(), outer[:, 1].max(), outer[:, 0].max()])
+                # Shoelace area in square degrees, only used to rank overlaps
+                areas.append(0.5 * abs(np.dot(outer[:, 0], np.roll(outer[:, 1], -1)) - np.dot(outer[:, 1], np.roll(outer[:, 0], -1))))
+
+        self._part_rings = part_rings
+        self._part_features = np.array(part_features, dtype=np.intp)
+        # Columns: south, west, north, east
+        self._part_bounds = np.array(bounds, dtype=np.float64).reshape(-1, 4)
+        self._part_areas = np.array(areas, dtype=np.float64)
+        self.has_districts = "district" in self.levels
+
+        self.places = places
+        radians = np.radians(places.pincode_coordinates)
+        self._pincode_latitudes = radians[:, 0]
+        self._pincode_longitudes = radians[:, 1]
+        self._pincode_cos_latitudes = np.cos(radians[:, 0])
+        # Pincode rows per state, so the nearest-pincode scan only covers the
+        # state the point fell in (a couple of thousand rows at most)
+        self._pincode_rows_by_state: Dict[str, np.ndarray] = {}
+        for state in set(places.pincode_states):
+            self._pincode_rows_by_state[state] = np.array(
+                [row for row, pincode_state in enumerate(places.pincode_states) if pincode_state == state],
+                dtype=np.intp
+            )
+        logger.info(f"Loaded {len(self.names)} boundaries ({len(part_rings)} polygons) for reverse geocoding")
+
+    @classmethod
+    def from_file(cls, path: str = BOUNDARIES_PATH, places: Gazetteer = gazetteer) -> "ReverseGeocoder":
+        with open(path, encoding="utf-8") as handle:
+            return cls(json.load(handle).get("features", []), places)
+
+    def _containing(self, latitude: float, longitude: float, level: str) -> Optional[int]:
+        bounds = self._part_bounds
+        candidates = np.flatnonzero(
+            (bounds[:, 0] <= latitude) & (latitude <= bounds[:, 2])
+            & (bounds[:, 1] <= longitude) & (longitude <= bounds[:, 3])
+        )
+        best: Optional[int] = None
+        for part in candidates[np.argsort(self._part_areas[candidates], kind="stable")]:
+            feature = int(self._part_features[part])
+            if self.levels[feature] != level:
+                continue
+            if sum(ring.crossings(longitude, latitude) for ring in self._part_rings[part]) % 2:
+                best = feature
+                break
+        return best
+
+    def _nearest_pincode(self, latitude: float, longitude: float, state: Optional[str]) -> Optional[int]:
+        if state is None:
+            rows = np.arange(len(self.places.pincodes))
+        else:
+            rows = self._pincode_rows_by_state.get(state, np.empty(0, dtype=np.intp))
+        if not len(rows):
+            return None
+        distances = haversine_km_many(
+            latitude, longitude,
+            self._pincode_latitudes[rows], self._pincode_longitudes[rows], self._pincode_cos_latitudes[rows]
+        )
+        nearest = nearest_first(distances, 1)[0]
+        return int(rows[nearest]) if distances[nearest] <= MAX_PINCODE_DISTANCE_KM else None
+
+    def reverse(self, latitude: float, longitude: float) -> Dict[str, Optional[str]]:
+        """State, district, city and pincode at the point; unknown parts are None"""
+        state_feature = self._containing(latitude, longitude, "state")
+        state = self.names[state_feature] if state_feature is not None else None
+
+        district = None
+        if self.has_districts:
+            district_feature = self._containing(latitude, longitude, "district")
+            if district_feature is not None:
+                district = self.names[district_feature]
+                state = state or self.states[district_feature]
+
+        pincode_row = self._nearest_pincode(latitude, longitude, state)
+        region: Dict[str, Optional[str]] = {"state": state, "district": district, "city": None, "pincode": None}
+        if pincode_row is not None:
+            region["pincode"] = str(self.places.pincodes[pincode_row])
+            region["city"] = self.places.pincode_cities[pincode_row]
+            region["district"] = district or self.places.pincode_districts[pincode_row]
+            region["state"] = state or self.places.pincode_states[pincode_row]
+        return region
+
+# Global instance
+reverse_geocoder = ReverseGeocoder.from_file()
@@ -0,0 +1,98 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A cache of upstream answers, so it lives in the user cache directory
+# rather than next to the shipped data files
+CACHE_DIR = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "aarogya")
+RXCUI_DB_PATH = os.getenv("RXCUI_DB_PATH", os.path.join(CACHE_DIR, "rxcui.sqlite3"))
+
+# Names RxNorm did not recognise are asked about again after this long, in
+# case a newer release adds them; found mappings are kept indefinitely
+MISS_RECHECK_SECONDS = 7 * 24 * 3600
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+class RxCUIStore:
+    """Persistent drug name → RxCUI map, warmed from past RxNorm lookups.
+
+    RxNorm mappings almost never change, so every resolved name is written
+    to a small SQLite file. The whole table is loaded into memory on first
+    use, so lookups never touch disk; only newly resolved names do. Names
+    RxNorm does not know are stored as misses (``None``) and retried after
+    ``MISS_RECHECK_SECONDS``. Falls back to memory only if the file cannot
+    be opened. Methods block on disk, so async callers run them in a worker
+    thread; a lock keeps those threads off each other.
+    """
+
+    def __init__(self, path: str = RXCUI_DB_PATH):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._mappings: Optional[Dict[str, Tuple[Optional[str], float]]] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> Dict[str, Tuple[Optional[str], float]]:
+        if self._mappings is not None:
+            return self._mappings
+        self._mappings = {}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS rxcui (name TEXT PRIMARY KEY, rxcui TEXT, resolved_at REAL NOT NULL)"
+            )
+            for name, rxcui, resolved_at in self._connection.execute("SELECT name, rxcui, resolved_at FROM rxcui"):
+                self._mappings[name] = (rxcui, resolved_at)
+            logger.info(f"Loaded {len(self._mappings)} RxCUI mappings from {self.path}")
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"RxCUI store at {self.path} unavailable, keeping mappings in memory only: {e}")
+            self._connection = None
+        return self._mappings
+
+    def lookup(self, names: Iterable[str]) -> Tuple[Dict[str, Optional[str]], List[str]]:
+        """(known, unresolved): known maps each stored name to its RxCUI or
+        None for a recent miss; unresolved lists names that need RxNorm"""
+        with self._lock:
+            mappings = self._open()
+            now = time.time()
+            known, unresolved = {}, []
+            for name in names:
+                entry = mappings.get(_normalize(name))
+                if entry is None or (entry[0] is None and now - entry[1] > MISS_RECHECK_SECONDS):
+                    unresolved.append(name)
+                else:
+                    known[name] = entry[0]
+            return known, unresolved
+
+    def save(self, resolved: Dict[str, Optional[str]]) -> None:
+        """Record RxNorm answers, including misses as None"""
+        if not resolved:
+            return
+        with self._lock:
+            mappings = self._open()
+            now = time.time()
+            rows = [(_normalize(name), rxcui, now) for name, rxcui in resolved.items()]
+            for name, rxcui, resolved_at in rows:
+                mappings[name] = (rxcui, resolved_at)
+            if self._connection is None:
+                return
+            try:
+                with self._connection:
+                    self._connection.executemany("INSERT OR REPLACE INTO rxcui VALUES (?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist {len(rows)} RxCUI mappings: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._open())
+
+# Global instance
+rxcui_store = RxCUIStore()
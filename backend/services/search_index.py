@@ -0,0 +1,202 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Any
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Separator placed between indexed fields. Queries are lowercased user text and
+# never contain it, so n-grams spanning two fields can never match a query.
+FIELD_SEPARATOR = "\x00"
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def normalize_text(text: str) -> str:
+    """Lowercase text the same way the search endpoints compare it"""
+    return text.lower()
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into alphanumeric tokens"""
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+class InvertedIndex:
+    """In-memory inverted index with substring semantics.
+
+    Every document's searchable fields are lowercased once and broken into
+    character n-grams (1..ngram_size) and word tokens, each mapped to a posting
+    set of document positions. A query is answered by intersecting the posting
+    sets of its n-grams and then confirming the substring match on the few
+    surviving candidates, so results are identical to a linear ``in`` scan.
+    Exact-value filters are kept as posting sets too and intersected with the
+    text candidates.
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[Dict[str, Any]],
+        text_fields: Sequence[str],
+        filter_fields: Sequence[str] = (),
+        ngram_size: int = 3
+    ):
+        self.text_fields = list(text_fields)
+        self.filter_fields = list(filter_fields)
+        self.ngram_size = ngram_size
+        self.documents: List[Optional[Dict[str, Any]]] = []
+        self._texts: List[Optional[str]] = []
+        self._ngram_postings: Dict[str, Set[int]] = {}
+        self._token_postings: Dict[str, Set[int]] = {}
+        self._filter_postings: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in self.filter_fields}
+        self._live: Set[int] = set()
+
+        for document in documents:
+            if document is None:
+                # Keep positions aligned with a catalog that has removed slots
+                self.documents.append(None)
+                self._texts.append(None)
+            else:
+                self.add(document)
+
+        logger.info(
+            f"Built inverted index over {len(self._live)} documents "
+            f"({len(self._ngram_postings)} n-grams, {len(self._token_postings)} tokens)"
+        )
+
+    def _document_text(self, document: Dict[str, Any]) -> str:
+        parts = []
+        for field in self.text_fields:
+            value = document.get(field) or ""
+            if isinstance(value, (list, tuple)):
+                parts.extend(normalize_text(str(item)) for item in value)
+            else:
+                parts.append(normalize_text(str(value)))
+        return FIELD_SEPARATOR + FIELD_SEPARATOR.join(parts) + FIELD_SEPARATOR
+
+    def _ngrams(self, text: str, sizes: Iterable[int]) -> Set[str]:
+        grams = set()
+        for size in sizes:
+            for start in range(len(text) - size + 1):
+                gram = text[start:start + size]
+                if FIELD_SEPARATOR not in gram:
+                    grams.add(gram)
+        return grams
+
+    @staticmethod
+    def _filter_values(value: Any) -> List[Any]:
+        if isinstance(value, (list, tuple, set)):
+            return list(value)
+        return [value]
+
+    def add(self, document: Dict[str, Any]) -> int:
+        """Index a document and return its position"""
+        position = len(self.documents)
+        text = self._document_text(document)
+        self.documents.append(document)
+        self._texts.append(text)
+        self._live.add(position)
+
+        for gram in self._ngrams(text, range(1, self.ngram_size + 1)):
+            self._ngram_postings.setdefault(gram, set()).add(position)
+        for token in TOKEN_PATTERN.findall(text):
+            self._token_postings.setdefault(token, set()).add(position)
+        for field in self.filter_fields:
+            for value in self._filter_values(document.get(field)):
+                self._filter_postings[field].setdefault(value, set()).add(position)
+        return position
+
+    def remove(self, position: int) -> None:
+        """Drop a document from every posting set, leaving its slot empty"""
+        document = self.documents[position]
+        if document is None:
+            return
+        text = self._texts[position]
+
+        for gram in self._ngrams(text, range(1, self.ngram_size + 1)):
+            postings = self._ngram_postings.get(gram)
+            if postings is not None:
+                postings.discard(position)
+                if not postings:
+                    del self._ngram_postings[gram]
+        for token in TOKEN_PATTERN.findall(text):
+            postings = self._token_postings.get(token)
+            if postings is not None:
+                postings.discard(position)
+                if not postings:
+                    del self._token_postings[token]
+        for field in self.filter_fields:
+            for value in self._filter_values(document.get(field)):
+                postings = self._filter_postings[field].get(value)
+                if postings is not None:
+                    postings.discard(position)
+                    if not postings:
+                        del self._filter_postings[field][value]
+
+        self.documents[position] = None
+        self._texts[position] = None
+        self._live.discard(position)
+
+    def token_postings(self, token: str) -> Set[int]:
+        """Positions of documents containing a whole word token"""
+        return self._token_postings.get(normalize_text(token), set())
+
+    def _text_candidates(self, query: str) -> Set[int]:
+        if not query:
+            return set(self._live)
+
+        if len(query) <= self.ngram_size:
+            return set(self._ngram_postings.get(query, ()))
+
+        grams = sorted(
+            self._ngrams(query, [self.ngram_size]),
+            key=lambda gram: len(self._ngram_postings.get(gram, ()))
+        )
+        candidates: Optional[Set[int]] = None
+        for gram in grams:
+            postings = self._ngram_postings.get(gram)
+            if not postings:
+                return set()
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+
+        # n-gram overlap is necessary but not sufficient for a substring match
+        return {position for position in candidates if query in self._texts[position]}
+
+    def filter_postings(self, field: str, value: Any) -> Set[int]:
+        """Positions of documents whose filter field equals (or contains) value"""
+        return self._filter_postings.get(field, {}).get(value, set())
+
+    def filter_candidates(self, filters: Optional[Dict[str, Any]]) -> Optional[Set[int]]:
+        """Intersect filter posting sets; None means no filter is active.
+
+        ``filters`` maps a filter field to the required value; ``None`` values
+        are ignored so optional query parameters can be passed straight through.
+        """
+        active = [(field, value) for field, value in (filters or {}).items() if value is not None]
+        if not active:
+            return None
+
+        # Start from the smallest posting set so each intersection shrinks fast
+        filter_sets = sorted((self.filter_postings(field, value) for field, value in active), key=len)
+        candidates = set(filter_sets[0])
+        for postings in filter_sets[1:]:
+            candidates &= postings
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query: Optional[str], filters: Optional[Dict[str, Any]] = None) -> List[int]:
+        """Return matching document positions in insertion order"""
+        allowed = self.filter_candidates(filters)
+        if allowed is not None and not allowed:
+            return []
+
+        candidates = self._text_candidates(normalize_text(query or ""))
+        if allowed is not None:
+            candidates &= allowed
+        return sorted(candidates)
+
+    def documents_at(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Resolve positions returned by search() to documents"""
+        return [self.documents[position] for position in positions]
+
+    def __len__(self) -> int:
+        return len(self._live)
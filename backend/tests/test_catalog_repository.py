@@ -0,0 +1,31 @@
+import re
+
+import pytest
+
+import routes.location_routes  # noqa: F401
+import routes.jan_aushadhi_routes  # noqa: F401
+from routes.hospital_routes import HOSPITAL_TOOLS
+from routes.medicine_routes import MEDICINES_DB
+from services.catalog_repository import HospitalToolRepository, MedicineRepository, substring_query
+from services.search_index import InvertedIndex
+
+def _mongo_matches(query, documents):
+    """Ids matched by a substring_query, evaluated the way Mongo applies $regex
+    (a list field matches when any element does)"""
+    def matches(document, condition):
+        field, pattern = next(iter(condition.items()))
+        flags = re.IGNORECASE if "i" in pattern["$options"] else 0
+        values = document.get(field) or []
+        values = values if isinstance(values, list) else [values]
+        return any(re.search(pattern["$regex"], str(value), flags) for value in values)
+    return [document["id"] for document in documents if any(matches(document, condition) for condition in query["$or"])]
+
+@pytest.mark.parametrize("query", ["para", "PARA", "hcl", "tablet", "pain", "ct scan", "(", "a.b", "monitor", "x-ray"])
+@pytest.mark.parametrize("documents, fields", [
+    (MEDICINES_DB, MedicineRepository.text_fields),
+    (HOSPITAL_TOOLS, HospitalToolRepository.text_fields),
+])
+def test_mongo_substring_query_matches_in_memory_index(query, documents, fields):
+    index = InvertedIndex(documents, text_fields=fields)
+    expected = [documents[position]["id"] for position in index.search(query)]
+    assert _mongo_matches(substring_query(query, fields), documents) == expected
@@ -0,0 +1,34 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# medicine_routes reads the location and Jan Aushadhi catalogs at import time
+import routes.location_routes  # noqa: F401
+import routes.jan_aushadhi_routes  # noqa: F401
+from routes.medicine_routes import router
+from services.catalog_registry import catalog_registry
+
+app = FastAPI()
+app.include_router(router, prefix="/api/medicines")
+client = TestClient(app)
+
+@pytest.fixture
+def removed_paracetamol():
+    record = catalog_registry.remove_record("medicines", "med_001")
+    yield record
+    catalog_registry.add_record("medicines", record)
+
+def test_search_skips_removed_medicine(removed_paracetamol):
+    assert removed_paracetamol["id"] == "med_001"
+    response = client.get("/api/medicines/search", params={"query": "paracetamol", "fuzzy": False})
+    assert response.status_code == 200
+    assert [medicine["id"] for medicine in response.json()] == []
+
+    response = client.get("/api/medicines/search", params={"query": "metformin"})
+    assert response.status_code == 200
+    assert [medicine["id"] for medicine in response.json()] == ["med_003"]
+
+def test_interaction_check_after_removal(removed_paracetamol):
+    response = client.post("/api/medicines/interaction-check", json=["med_002", "med_003"])
+    assert response.status_code == 200
+    assert response.json()["unrecognized_ingredients"] == []
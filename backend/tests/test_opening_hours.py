@@ -0,0 +1,21 @@
+from services.opening_hours import MINUTES_PER_DAY, parse_opening_hours
+
+def _monday(text):
+    """Monday's (start, end) minutes for hours that apply every day"""
+    return parse_opening_hours(text)[0]
+
+def test_bare_range_with_earlier_end_hour_is_daytime():
+    assert _monday("9-5") == (9 * 60, 17 * 60)
+    assert _monday("Mon-Sat 10-2") == (10 * 60, 14 * 60)
+
+def test_bare_range_in_order_is_unchanged():
+    assert _monday("9-12") == (9 * 60, 12 * 60)
+    assert _monday("09:00-21:00") == (9 * 60, 21 * 60)
+
+def test_overnight_ranges_still_cross_midnight():
+    assert (22 * 60, MINUTES_PER_DAY + 6 * 60) in parse_opening_hours("22:00-06:00")
+    assert (22 * 60, MINUTES_PER_DAY + 6 * 60) in parse_opening_hours("10 PM - 6 AM")
+
+def test_meridiem_on_one_side_gives_daytime_range():
+    assert _monday("9 - 5 PM") == (9 * 60, 17 * 60)
+    assert _monday("9 AM - 5") == (9 * 60, 17 * 60)
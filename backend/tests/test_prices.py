@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from services.prices import MixedPriceUnitsError, PriceTable
+
+RECORDS = [
+    {"generic": "₹2-5 per tablet", "brand": "₹8-15 per tablet"},
+    {"generic": "₹15-25 per course", "brand": "₹50-100 per course"},
+    {"generic": "₹3-8 per tablet", "brand": "₹120 per strip"},
+]
+
+@pytest.fixture
+def table():
+    table = PriceTable(RECORDS, {
+        "generic": lambda record: record["generic"],
+        "brand": lambda record: record["brand"]
+    })
+    table.sort_keys["generic"] = table.column("generic").minimum
+    table.sort_units["generic"] = table.column("generic").unit_codes
+    return table
+
+ALL = np.arange(len(RECORDS))
+
+def test_band_and_sort_refuse_mixed_units(table):
+    with pytest.raises(MixedPriceUnitsError):
+        table.in_band(ALL, "generic", max_price=10)
+    with pytest.raises(MixedPriceUnitsError):
+        table.order_by(ALL, "generic")
+
+def test_band_and_sort_within_one_unit(table):
+    tablets = table.in_unit(ALL, "generic", "Tablet")
+    assert tablets.tolist() == [0, 2]
+    assert table.in_band(tablets, "generic", min_price=6).tolist() == [2]
+    assert table.order_by(tablets[::-1], "generic").tolist() == [0, 2]
+    assert table.in_unit(ALL, "generic", "strip").tolist() == []
+
+def test_savings_only_within_one_unit(table):
+    savings = table.savings("generic", "brand")
+    assert savings[0] == pytest.approx(1 - 3.5 / 11.5)
+    assert savings[1] == pytest.approx(1 - 20 / 75)
+    assert np.isnan(savings[2])
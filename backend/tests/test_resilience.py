@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+
+from services.resilience import BreakerConfig, CircuitBreaker, HedgeConfig, ResilientTransport
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Answers the n-th request with the n-th (delay seconds, status) pair"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    async def handle_async_request(self, request):
+        delay, status = self.script[self.calls]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return httpx.Response(status, request=request)
+
+def _hedged_get(script):
+    inner = ScriptedTransport(script)
+    transport = ResilientTransport(
+        inner,
+        CircuitBreaker("stub", BreakerConfig(window=1, min_calls=1)),
+        HedgeConfig(min_samples=1, min_delay=0.05, budget=1.0)
+    )
+    transport.latencies.add(0.05)
+    response = asyncio.run(transport.handle_async_request(httpx.Request("GET", "http://stub/")))
+    return response.status_code, inner.calls, transport
+
+def test_fast_5xx_does_not_beat_a_succeeding_hedge():
+    status, calls, transport = _hedged_get([(0.0, 503), (0.01, 200)])
+    assert (status, calls) == (200, 2)
+    assert transport.stats["hedge_wins"] == 1
+    assert transport.breaker.state == "closed"
+
+def test_5xx_hedge_does_not_beat_a_slow_success():
+    status, calls, transport = _hedged_get([(0.2, 200), (0.0, 503)])
+    assert (status, calls) == (200, 2)
+    assert transport.breaker.state == "closed"
+
+def test_breaker_counts_failure_only_when_both_attempts_fail():
+    status, calls, transport = _hedged_get([(0.0, 503), (0.0, 502)])
+    assert (status, calls) == (502, 2)
+    assert transport.breaker.state == "open"
+
+def test_non_retryable_5xx_is_final():
+    status, calls, _ = _hedged_get([(0.0, 501), (0.0, 200)])
+    assert (status, calls) == (501, 1)